@@ -0,0 +1,138 @@
+import json
+import logging
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from redis.exceptions import RedisError
+from utils.redis_client import get_redis
+from reports.facts import count_audit_entries
+from .models import AuditLog
+from .presence import valid_ip
+
+logger = logging.getLogger(__name__)
+
+AUDIT_BUFFER_KEY = 'audit:buffer'
+# Held while the buffer is flushed (and while reports.facts recounts audit facts).
+AUDIT_BUFFER_LOCK = 'audit:buffer:flush'
+
+
+def record_action(user_id, action, description, ip_address=None, user_agent=None, metadata=None):
+    """
+    Queues an audit entry on the Redis buffer once the current DB
+    transaction commits; flush_audit_buffer writes it in bulk. The entry
+    keeps the time of the action, not the time of the flush. If Redis is
+    unavailable the entry is written directly. An ip_address that is not a
+    valid address (it often comes from X-Forwarded-For) is stored as NULL.
+    """
+    entry = {
+        'user_id': user_id,
+        'action': action,
+        'description': description,
+        'ip_address': valid_ip(ip_address),
+        'user_agent': user_agent,
+        'metadata': metadata or {},
+        'timestamp': timezone.now().isoformat(),
+    }
+    transaction.on_commit(lambda: _push(entry))
+
+
+def _push(entry):
+    try:
+        get_redis().rpush(AUDIT_BUFFER_KEY, json.dumps(entry, cls=DjangoJSONEncoder))
+    except RedisError as e:
+        logger.warning('Audit buffer unavailable, writing directly: %s', e)
+        write_entries([entry])
+
+
+def write_entries(entries):
+    """
+    Inserts audit entries with bulk_create, storing user_id directly, and
+    adds them to the daily per-action counts (reports.DailyAuditFact).
+    Users deleted since the action was recorded are stored as NULL, like
+    the SET_NULL foreign key would.
+    """
+    User = get_user_model()
+    user_ids = {entry['user_id'] for entry in entries if entry.get('user_id')}
+    existing = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True)) if user_ids else set()
+
+    logs = []
+    for entry in entries:
+        timestamp = parse_datetime(entry['timestamp']) if entry.get('timestamp') else None
+        logs.append(AuditLog(
+            user_id=entry['user_id'] if entry.get('user_id') in existing else None,
+            action=entry['action'],
+            description=entry['description'],
+            ip_address=entry.get('ip_address'),
+            user_agent=entry.get('user_agent'),
+            metadata=entry.get('metadata') or {},
+            timestamp=timestamp or timezone.now(),
+        ))
+    with transaction.atomic():
+        AuditLog.objects.bulk_create(logs, batch_size=settings.AUDIT_BUFFER_BATCH_SIZE)
+        count_audit_entries(logs)
+    return len(logs)
+
+
+def write_batch(entries):
+    """
+    write_entries for a batch taken from the buffer. If the bulk insert
+    fails on bad data, the entries are written one at a time and the ones
+    that still fail are logged and dropped, so one bad entry cannot stop
+    the buffer draining. Other database errors propagate. Returns
+    (written, dropped).
+    """
+    try:
+        with transaction.atomic():
+            return write_entries(entries), 0
+    except (DataError, IntegrityError, KeyError, TypeError, ValueError):
+        logger.exception('Bulk insert of %d audit entries failed; writing them one by one', len(entries))
+    written = dropped = 0
+    for entry in entries:
+        try:
+            with transaction.atomic():
+                written += write_entries([entry])
+        except (DataError, IntegrityError, KeyError, TypeError, ValueError):
+            dropped += 1
+            logger.exception('Dropping audit buffer entry that could not be written: %r', entry)
+    return written, dropped
+
+
+def flush_buffer(batch_size=None, max_batches=None, key=AUDIT_BUFFER_KEY):
+    """
+    Drains the buffer into AuditLog, one bulk insert per batch. A batch is
+    only trimmed from the list after its insert commits, so a crash repeats
+    a batch rather than losing it; entries that cannot be written at all
+    are dropped and counted as skipped (see write_batch). Callers must make
+    sure only one flush runs at a time (see audit.tasks.flush_audit_buffer).
+    """
+    batch_size = batch_size or settings.AUDIT_BUFFER_BATCH_SIZE
+    max_batches = max_batches or settings.AUDIT_BUFFER_MAX_BATCHES
+    client = get_redis()
+    written = skipped = 0
+
+    for _ in range(max_batches):
+        raw_entries = client.lrange(key, 0, batch_size - 1)
+        if not raw_entries:
+            break
+        entries = []
+        for raw in raw_entries:
+            try:
+                entries.append(json.loads(raw))
+            except ValueError:
+                skipped += 1
+                logger.error('Dropping malformed audit buffer entry: %r', raw[:200])
+        batch_written, dropped = write_batch(entries)
+        written += batch_written
+        skipped += dropped
+        client.ltrim(key, len(raw_entries), -1)
+        if len(raw_entries) < batch_size:
+            break
+
+    return written, skipped
+
+
+def buffer_length():
+    return get_redis().llen(AUDIT_BUFFER_KEY)
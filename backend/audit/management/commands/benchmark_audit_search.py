@@ -0,0 +1,113 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from audit.filters import AuditLogFilter
+from audit.models import AuditLog
+
+BENCH_MARKER = '{"search_benchmark": true}'
+DESCRIPTIONS = [
+    'Payment completed', 'Payment failed', 'Payment initiated', 'Payout completed',
+    'Invoice created', 'Invoice sent', 'Quote created', 'Contract signed',
+    'Receipt generated', 'Document verified', 'User logged in', 'Password changed',
+]
+ACTIONS = [
+    'PAYMENT_COMPLETED', 'PAYMENT_FAILED', 'PAYMENT_INITIATED', 'PAYOUT_COMPLETED',
+    'INVOICE_CREATED', 'INVOICE_SENT', 'QUOTE_CREATED', 'CONTRACT_SIGNED',
+    'RECEIPT_GENERATED', 'DOCUMENT_VERIFIED', 'LOGIN', 'PASSWORD_CHANGED',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compares audit log search through SearchFilter (ILIKE) with the full-text search index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000, help='Synthetic audit rows to load')
+        parser.add_argument('--days', type=int, default=365, help='Spread the rows over this many days')
+        parser.add_argument('--terms', nargs='+', default=['invoice sent', 'DP4A', 'verified', 'admin'])
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per query; the best time is reported')
+        parser.add_argument('--skip-load', action='store_true', help='Reuse rows loaded by an earlier --keep run')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark rows afterwards')
+        parser.add_argument('--force', action='store_true', help='Allow running with DEBUG off')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to write benchmark audit rows with DEBUG off; pass --force.')
+        if connection.vendor != 'postgresql':
+            raise CommandError('Full-text search needs PostgreSQL.')
+
+        if not options['skip_load']:
+            self.cleanup()
+            self.load(options['rows'], options['days'])
+
+        window_start = timezone.now() - timedelta(days=30)
+        self.stdout.write(f'{"term":<16}{"ILIKE":>12}{"FTS newest":>14}{"FTS ranked":>14}{"FTS 30 days":>14}')
+        for term in options['terms']:
+            legacy = AuditLog.objects.filter(
+                Q(description__icontains=term) | Q(user__username__icontains=term) | Q(user__email__icontains=term)
+            ).defer('search_vector').order_by('-timestamp', '-pk')
+            timings = [
+                self.best_of(legacy, options['repeat']),
+                self.best_of(self.search(term).order_by('-timestamp', '-pk'), options['repeat']),
+                self.best_of(self.search(term).order_by('-search_rank', '-pk'), options['repeat']),
+                self.best_of(
+                    self.search(term, timestamp_after=window_start.isoformat()).order_by('-timestamp', '-pk'),
+                    options['repeat']
+                ),
+            ]
+            self.stdout.write(f'{term:<16}' + ''.join(f'{ms:>12.1f}ms' for ms in timings))
+
+        if not options['keep']:
+            self.cleanup()
+
+    def search(self, term, **params):
+        # The benchmark covers the whole table, so the default search window is lifted.
+        data = {'search': term, 'timestamp_after': params.get('timestamp_after', '1970-01-01T00:00:00Z')}
+        return AuditLogFilter(data=data, queryset=AuditLog.objects.defer('search_vector')).qs
+
+    def best_of(self, queryset, repeat):
+        # One page of results, as the list endpoint would fetch.
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset[:21])
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def load(self, rows, days):
+        chunk = 1_000_000
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT coalesce(array_agg(id), ARRAY[]::bigint[]) FROM users_user')
+            user_ids = cursor.fetchone()[0] or [None]
+            for offset in range(0, rows, chunk):
+                cursor.execute(
+                    f"""
+                    INSERT INTO {AuditLog._meta.db_table}
+                        (user_id, action, description, ip_address, user_agent, timestamp, is_immutable, metadata)
+                    SELECT (%(users)s::bigint[])[1 + (g %% cardinality(%(users)s::bigint[]))],
+                           (%(actions)s::text[])[1 + (g %% 12)],
+                           (%(descriptions)s::text[])[1 + (g %% 12)] || ': DP' || upper(substr(md5(g::text), 1, 8))
+                               || ' - ' || (g %% 100000)::text,
+                           '10.0.0.1', 'benchmark',
+                           now() - (random() * %(days)s * interval '1 day'),
+                           true, %(marker)s::jsonb
+                    FROM generate_series(%(start)s, %(end)s) g
+                    """,
+                    {
+                        'users': user_ids, 'actions': ACTIONS, 'descriptions': DESCRIPTIONS, 'days': days,
+                        'marker': BENCH_MARKER, 'start': offset + 1, 'end': min(offset + chunk, rows),
+                    }
+                )
+                self.stdout.write(f'Loaded {min(offset + chunk, rows)} rows')
+            cursor.execute(f'ANALYZE {AuditLog._meta.db_table}')
+        self.stdout.write(f'Load took {time.perf_counter() - started:.1f}s')
+
+    def cleanup(self):
+        # AuditLog refuses ORM deletes, so scratch rows are removed with SQL.
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {AuditLog._meta.db_table} WHERE metadata @> %s::jsonb', [BENCH_MARKER])
@@ -0,0 +1,95 @@
+import json
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.utils import timezone
+from audit.buffer import flush_buffer
+from audit.models import AuditLog
+from utils.redis_client import get_redis
+
+BENCH_KEY = 'audit:buffer:benchmark'
+BENCH_PREFIX = '[audit-benchmark]'
+
+
+class Command(BaseCommand):
+    help = 'Compares per-row audit writes (the old log_action task body) with the buffered bulk path.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=5000)
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per bulk insert (default AUDIT_BUFFER_BATCH_SIZE)')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark rows afterwards')
+        parser.add_argument('--force', action='store_true', help='Allow running with DEBUG off')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to write benchmark audit rows with DEBUG off; pass --force.')
+        user = get_user_model().objects.order_by('id').first()
+        user_id = user.id if user else None
+        count = options['entries']
+        batch_size = options['batch_size'] or settings.AUDIT_BUFFER_BATCH_SIZE
+
+        def entry(i):
+            return {
+                'user_id': user_id,
+                'action': 'UNKNOWN',
+                'description': f'{BENCH_PREFIX} entry {i}',
+                'ip_address': '127.0.0.1',
+                'user_agent': 'benchmark',
+                'metadata': {'i': i},
+                'timestamp': timezone.now().isoformat(),
+            }
+
+        self.cleanup()
+        User = get_user_model()
+
+        # Per-row path: one user lookup and one INSERT per entry. Broker
+        # round trips and task overhead are not included, so the real
+        # per-row cost is higher than this.
+        started = time.perf_counter()
+        for i in range(count):
+            data = entry(i)
+            AuditLog.objects.create(
+                user=User.objects.filter(id=data['user_id']).first(),
+                action=data['action'],
+                description=data['description'],
+                ip_address=data['ip_address'],
+                user_agent=data['user_agent'],
+                metadata=data['metadata'],
+            )
+        per_row = time.perf_counter() - started
+        self.cleanup()
+
+        # Buffered path: producers RPUSH, one consumer bulk inserts.
+        client = get_redis()
+        client.delete(BENCH_KEY)
+        started = time.perf_counter()
+        for i in range(count):
+            client.rpush(BENCH_KEY, json.dumps(entry(i), cls=DjangoJSONEncoder))
+        produce = time.perf_counter() - started
+        started = time.perf_counter()
+        written = 0
+        while client.llen(BENCH_KEY):
+            batch_written, _ = flush_buffer(batch_size=batch_size, key=BENCH_KEY)
+            written += batch_written
+        consume = time.perf_counter() - started
+        client.delete(BENCH_KEY)
+
+        self.stdout.write(f'Entries: {count}  Batch size: {batch_size}  Database: {connection.vendor}')
+        self.stdout.write(f'Per-row writes:   {per_row:.2f}s  {count / per_row:.0f} rows/s')
+        self.stdout.write(f'Buffer producers: {produce:.2f}s  {count / produce:.0f} entries/s  ({produce / count * 1e6:.0f} us per call)')
+        self.stdout.write(f'Buffer flush:     {consume:.2f}s  {written / consume:.0f} rows/s')
+        self.stdout.write(f'Flush speed-up over per-row writes: {per_row / consume:.1f}x')
+
+        if not options['keep']:
+            self.cleanup()
+
+    def cleanup(self):
+        # AuditLog refuses ORM deletes, so scratch rows are removed with SQL.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {AuditLog._meta.db_table} WHERE description LIKE %s',
+                [BENCH_PREFIX + '%']
+            )
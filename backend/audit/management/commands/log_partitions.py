@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from audit.partitions import archive_partitions, ensure_partitions, list_partitions, partitioned_tables
+
+
+class Command(BaseCommand):
+    help = 'Lists the monthly AuditLog / VerificationLog partitions; optionally creates upcoming ones and archives expired ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ensure', action='store_true', help='Create partitions for the coming months')
+        parser.add_argument('--archive', action='store_true', help='Detach, export and drop partitions past retention')
+        parser.add_argument('--dry-run', action='store_true', help='With --archive, only list what would be archived')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Log partitioning is only used on PostgreSQL.')
+
+        if options['ensure']:
+            for name in ensure_partitions():
+                self.stdout.write(f'Created {name}')
+        if options['archive']:
+            for name, rows, path in archive_partitions(dry_run=options['dry_run']):
+                if rows is None:
+                    self.stdout.write(f'Would archive {name} to {path}')
+                else:
+                    self.stdout.write(f'Archived {name}: {rows} rows to {path}')
+
+        for table, _, retention_months in partitioned_tables():
+            self.stdout.write(f'{table} (retention {retention_months} months)')
+            for name, month, attached, rows in list_partitions(table):
+                state = 'attached' if attached else 'DETACHED'
+                self.stdout.write(f'  {month:%Y-%m}  {name:<45} {state:<9} ~{rows} rows')
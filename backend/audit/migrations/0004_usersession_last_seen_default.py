@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-17 01:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0003_auditlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usersession',
+            name='last_seen',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
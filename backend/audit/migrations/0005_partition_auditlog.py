@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def partition_auditlog(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from audit.partitions import convert_to_partitioned
+    with schema_editor.connection.cursor() as cursor:
+        convert_to_partitioned(cursor, 'audit_auditlog', 'timestamp')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0004_usersession_last_seen_default'),
+    ]
+
+    operations = [
+        # Monthly range partitions on timestamp (PostgreSQL only). Not
+        # reversed: the partitioned table serves the previous schema as is.
+        migrations.RunPython(partition_auditlog, migrations.RunPython.noop),
+    ]
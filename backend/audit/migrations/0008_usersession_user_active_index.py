@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-17 01:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0007_auditlog_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', '-last_seen'], name='audit_session_user_active_idx'),
+        ),
+    ]
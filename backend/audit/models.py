@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
@@ -34,9 +36,15 @@ class AuditLog(models.Model):
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    timestamp = models.DateTimeField(default=timezone.now)
     is_immutable = models.BooleanField(default=True, editable=False)
     metadata = models.JSONField(default=dict, blank=True)
+    # Full-text search document, maintained by PostgreSQL on insert.
+    search_vector = models.GeneratedField(
+        expression=SearchVector('description', weight='A', config='simple') + SearchVector('action', weight='B', config='simple'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ['-timestamp']
@@ -44,6 +52,8 @@ class AuditLog(models.Model):
             models.Index(fields=['timestamp']),
             models.Index(fields=['user', 'timestamp']),
             models.Index(fields=['action']),
+            GinIndex(fields=['search_vector'], name='audit_search_vector_gin'),
+            BrinIndex(fields=['timestamp'], name='audit_timestamp_brin', autosummarize=True),
         ]
 
     def __str__(self):
@@ -63,11 +73,18 @@ class UserSession(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    last_seen = models.DateTimeField(auto_now=True)
+    last_seen = models.DateTimeField(default=timezone.now)
     is_active = models.BooleanField(default=True)
 
     class Meta:
         ordering = ['-last_seen']
+        indexes = [
+            # Latest active session per user (UserActiveStatusView).
+            models.Index(
+                fields=['user', '-last_seen'], condition=models.Q(is_active=True),
+                name='audit_session_user_active_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.session_key}"
\ No newline at end of file
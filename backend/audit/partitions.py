@@ -0,0 +1,265 @@
+import gzip
+import logging
+import os
+import re
+from datetime import datetime, timezone as dt_timezone
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+# Append-only logs stored as monthly range partitions (PostgreSQL only):
+# (model, partition column, retention setting in months).
+PARTITIONED_LOGS = (
+    ('audit.AuditLog', 'timestamp', 'AUDIT_LOG_RETENTION_MONTHS'),
+    ('verification.VerificationLog', 'verified_at', 'VERIFICATION_LOG_RETENTION_MONTHS'),
+)
+
+PARTITION_SUFFIX = re.compile(r'_(\d{4})_(\d{2})$')
+
+
+def month_start(value):
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(table, month):
+    return f'{table}_{month:%Y_%m}'
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT relkind FROM pg_class WHERE relname = %s AND relnamespace = current_schema()::regnamespace",
+        [table]
+    )
+    row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def stored_columns(cursor, table):
+    """
+    Quoted column list of a table without generated columns, which can be
+    neither inserted into nor are worth archiving.
+    """
+    cursor.execute(
+        """
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+        """,
+        [table]
+    )
+    return ', '.join(f'"{name}"' for (name,) in cursor.fetchall())
+
+
+def _create_partition(cursor, table, column, month):
+    """
+    Creates the partition for one month. Rows for that month that already
+    landed in the default partition are moved into it first, since
+    PostgreSQL refuses to add a partition that overlaps default rows.
+    """
+    name = partition_name(table, month)
+    start, end = month, add_months(month, 1)
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    if cursor.fetchone()[0]:
+        return False
+    bounds = [start.isoformat(), end.isoformat()]
+    default = f'{table}_default'
+    cursor.execute(
+        f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE "{column}" >= %s AND "{column}" < %s)', bounds
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)', bounds)
+        return True
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)')
+    columns = stored_columns(cursor, table)
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM "{default}" WHERE "{column}" >= %s AND "{column}" < %s RETURNING *) '
+        f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM moved', bounds
+    )
+    cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)', bounds)
+    return True
+
+
+def convert_to_partitioned(cursor, table, column):
+    """
+    Rebuilds a plain table as a monthly range-partitioned table with the
+    same columns, indexes and foreign keys, copying its rows across. The
+    primary key becomes (id, column), as PostgreSQL requires the partition
+    key in every unique constraint; ids stay unique through the sequence.
+    Used by migrations, which run it inside their transaction.
+    """
+    if is_partitioned(cursor, table):
+        return
+    legacy = f'{table}_unpartitioned'
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND schemaname = current_schema()",
+        [legacy]
+    )
+    indexes = [(name, sql) for name, sql in cursor.fetchall() if name != f'{table}_pkey']
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [legacy]
+    )
+    foreign_keys = cursor.fetchall()
+
+    cursor.execute(
+        f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED) '
+        f'PARTITION BY RANGE ("{column}")'
+    )
+    cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+    cursor.execute(f'SELECT min("{column}"), coalesce(max(id), 0) FROM "{legacy}"')
+    oldest, max_id = cursor.fetchone()
+    now = month_start(datetime.now(dt_timezone.utc))
+    month = month_start(oldest) if oldest else now
+    while month <= add_months(now, settings.LOG_PARTITION_MONTHS_AHEAD):
+        _create_partition(cursor, table, column, month)
+        month = add_months(month, 1)
+
+    columns = stored_columns(cursor, legacy)
+    cursor.execute(f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM "{legacy}"')
+    cursor.execute(f'DROP TABLE "{legacy}"')
+
+    cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id, "{column}")')
+    cursor.execute(f'CREATE SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+    cursor.execute(f"SELECT setval('\"{table}_id_seq\"', %s, true)", [max(max_id, 1)])
+    cursor.execute(f"""ALTER TABLE "{table}" ALTER COLUMN id SET DEFAULT nextval('"{table}_id_seq"')""")
+    for name, sql in indexes:
+        cursor.execute(re.sub(rf' ON (\S+\.)?"?{legacy}"? ', f' ON "{table}" ', sql))
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+
+def partitioned_tables():
+    for label, column, retention_setting in PARTITIONED_LOGS:
+        yield apps.get_model(label)._meta.db_table, column, getattr(settings, retention_setting)
+
+
+def ensure_partitions(months_ahead=None):
+    """
+    Creates partitions for the current month and the next `months_ahead`
+    months so inserts never fall into the default partition.
+    Returns the names of the partitions created.
+    """
+    if connection.vendor != 'postgresql':
+        return []
+    months_ahead = settings.LOG_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    now = month_start(datetime.now(dt_timezone.utc))
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table, column, _ in partitioned_tables():
+            if not is_partitioned(cursor, table):
+                continue
+            for offset in range(months_ahead + 1):
+                month = add_months(now, offset)
+                if _create_partition(cursor, table, column, month):
+                    created.append(partition_name(table, month))
+    return created
+
+
+def ensure_partitions_between(start, end):
+    """
+    Creates the monthly partitions for every month from `start` to `end`
+    (datetimes), for bulk loads of historical rows. Returns the names of
+    the partitions created.
+    """
+    if connection.vendor != 'postgresql':
+        return []
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table, column, _ in partitioned_tables():
+            if not is_partitioned(cursor, table):
+                continue
+            month = month_start(start)
+            while month <= end:
+                if _create_partition(cursor, table, column, month):
+                    created.append(partition_name(table, month))
+                month = add_months(month, 1)
+    return created
+
+
+def list_partitions(table):
+    """
+    Monthly partitions of a table, attached or detached, oldest first:
+    [(name, month, attached, estimated_rows)].
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, i.inhparent IS NOT NULL, c.reltuples::bigint
+            FROM pg_class c
+            LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+            WHERE c.relkind = 'r' AND c.relnamespace = current_schema()::regnamespace AND c.relname LIKE %s
+            """,
+            [f'{table}\\_%']
+        )
+        partitions = []
+        for name, attached, rows in cursor.fetchall():
+            match = PARTITION_SUFFIX.search(name)
+            if match and name == f'{table}_{match.group(1)}_{match.group(2)}':
+                month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc)
+                partitions.append((name, month, attached, max(rows, 0)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def export_partition(name, path):
+    """
+    Streams a partition to gzipped NDJSON (one JSON object per row) through
+    a server-side cursor. Written to a temporary file and renamed, so a
+    file at `path` is always complete. Returns the number of rows.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f'{path}.partial'
+    rows = 0
+    with connection.cursor() as cursor:
+        columns = stored_columns(cursor, name)
+    with transaction.atomic(), connection.chunked_cursor() as cursor, gzip.open(partial, 'wt', encoding='utf-8') as output:
+        cursor.execute(f'SELECT row_to_json(t)::text FROM (SELECT {columns} FROM "{name}") t')
+        for (line,) in cursor:
+            output.write(line)
+            output.write('\n')
+            rows += 1
+    os.replace(partial, path)
+    return rows
+
+
+def archive_partitions(dry_run=False):
+    """
+    Applies retention: monthly partitions older than the table's retention
+    are detached, exported to LOG_ARCHIVE_DIR/<table>/<partition>.ndjson.gz
+    and dropped. A partition is only dropped once its export holds every
+    row, and detached leftovers from an interrupted run are picked up again.
+    Returns [(partition, rows, path)].
+    """
+    if connection.vendor != 'postgresql':
+        return []
+    now = month_start(datetime.now(dt_timezone.utc))
+    archived = []
+    for table, _, retention_months in partitioned_tables():
+        cutoff = add_months(now, -retention_months)
+        for name, month, attached, _ in list_partitions(table):
+            if month >= cutoff:
+                continue
+            path = os.path.join(settings.LOG_ARCHIVE_DIR, table, f'{name}.ndjson.gz')
+            if dry_run:
+                archived.append((name, None, path))
+                continue
+            with connection.cursor() as cursor:
+                if attached:
+                    cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+                rows = export_partition(name, path)
+                cursor.execute(f'SELECT count(*) FROM "{name}"')
+                if cursor.fetchone()[0] != rows:
+                    logger.error('Archive of %s is incomplete; partition kept detached', name)
+                    continue
+                cursor.execute(f'DROP TABLE "{name}"')
+            logger.info('Archived %s (%d rows) to %s', name, rows, path)
+            archived.append((name, rows, path))
+    return archived
@@ -0,0 +1,232 @@
+import hashlib
+import ipaddress
+import json
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from redis.exceptions import RedisError
+from utils.redis_client import get_redis
+from .models import UserSession
+
+logger = logging.getLogger(__name__)
+
+LAST_SEEN_KEY = 'presence:last_seen'
+META_KEY = 'presence:meta'
+DIRTY_KEY = 'presence:dirty'
+USER_KEY = 'presence:user:{user_id}'
+
+# Records a hit for user:session in one round trip. Nothing is written (and
+# the session is not queued for the database) unless last_seen moved by at
+# least the resolution or the IP / user agent changed.
+TOUCH_SCRIPT = """
+local previous = redis.call('ZSCORE', KEYS[1], ARGV[1])
+local previous_meta = redis.call('HGET', KEYS[2], ARGV[1])
+local now = tonumber(ARGV[2])
+if previous and now - tonumber(previous) < tonumber(ARGV[4]) and previous_meta == ARGV[3] then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[1])
+if previous_meta ~= ARGV[3] then
+    redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+end
+redis.call('SADD', KEYS[3], ARGV[1])
+redis.call('SADD', KEYS[4], ARGV[1])
+return 1
+"""
+
+_touch_script = None
+
+
+def session_key_for(request):
+    """
+    The Django session key when there is one. API clients authenticate with
+    JWTs and have no session, so they are keyed by client IP and user agent.
+    """
+    session = getattr(request, 'session', None)
+    if session is not None and session.session_key:
+        return session.session_key
+    fingerprint = f"{client_ip(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return 'api-' + hashlib.sha1(fingerprint.encode()).hexdigest()[:36]
+
+
+def client_ip(request):
+    """
+    The first X-Forwarded-For address, else REMOTE_ADDR. None when it is not
+    a valid IP address, since the header is client-supplied and the inet
+    columns reject anything else.
+    """
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return valid_ip(x_forwarded_for.split(',')[0])
+    return valid_ip(request.META.get('REMOTE_ADDR'))
+
+
+def valid_ip(value):
+    """The normalised address, or None if `value` is not an IPv4/IPv6 address."""
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except ValueError:
+        return None
+
+
+def touch(user_id, session_key, ip_address, user_agent):
+    """
+    Marks a session as seen now. Returns True when the session was queued
+    for the next flush_presence run.
+    """
+    global _touch_script
+    client = get_redis()
+    if _touch_script is None:
+        _touch_script = client.register_script(TOUCH_SCRIPT)
+    member = f'{user_id}:{session_key}'
+    meta = json.dumps({'ip_address': ip_address, 'user_agent': (user_agent or '')[:255]}, sort_keys=True)
+    return bool(_touch_script(
+        keys=[LAST_SEEN_KEY, META_KEY, DIRTY_KEY, USER_KEY.format(user_id=user_id)],
+        args=[member, int(time.time()), meta, settings.PRESENCE_RESOLUTION_SECONDS],
+        client=client,
+    ))
+
+
+def forget_user(user_id):
+    """
+    Drops all presence for a user (on logout), so a pending flush cannot
+    mark their sessions active again.
+    """
+    client = get_redis()
+    user_key = USER_KEY.format(user_id=user_id)
+    members = list(client.smembers(user_key))
+    if not members:
+        return
+    pipe = client.pipeline()
+    pipe.zrem(LAST_SEEN_KEY, *members)
+    pipe.hdel(META_KEY, *members)
+    pipe.srem(DIRTY_KEY, *members)
+    pipe.delete(user_key)
+    pipe.execute()
+
+
+def flush_presence(batch_size=None):
+    """
+    Writes sessions seen since the last flush to UserSession: one SELECT,
+    one bulk_update and one bulk_create per batch. Sessions whose stored
+    values already match are not written. Entries older than
+    PRESENCE_RETENTION_SECONDS are pruned from Redis.
+    """
+    batch_size = batch_size or settings.PRESENCE_FLUSH_BATCH_SIZE
+    client = get_redis()
+    created = updated = unchanged = 0
+
+    while True:
+        members = [member.decode() for member in client.spop(DIRTY_KEY, batch_size) or []]
+        if not members:
+            break
+        try:
+            counts = _write_batch(client, members)
+        except Exception:
+            # Put the batch back so the next run retries it.
+            try:
+                client.sadd(DIRTY_KEY, *members)
+            except RedisError:
+                logger.exception('Could not requeue %d presence entries', len(members))
+            raise
+        created += counts[0]
+        updated += counts[1]
+        unchanged += counts[2]
+        if len(members) < batch_size:
+            break
+
+    pruned = _prune(client)
+    return {'created': created, 'updated': updated, 'unchanged': unchanged, 'pruned': pruned}
+
+
+def _write_batch(client, members):
+    pipe = client.pipeline(transaction=False)
+    for member in members:
+        pipe.zscore(LAST_SEEN_KEY, member)
+        pipe.hget(META_KEY, member)
+    values = pipe.execute()
+
+    seen = {}
+    for index, member in enumerate(members):
+        score, meta = values[index * 2], values[index * 2 + 1]
+        if score is None:
+            continue  # forgotten (logout) after it was queued
+        user_id, session_key = member.split(':', 1)
+        meta = json.loads(meta) if meta else {}
+        seen[(int(user_id), session_key)] = {
+            'last_seen': datetime.fromtimestamp(score, tz=dt_timezone.utc),
+            'ip_address': meta.get('ip_address'),
+            'user_agent': meta.get('user_agent', ''),
+        }
+    if not seen:
+        return 0, 0, 0
+
+    existing = {
+        (session.user_id, session.session_key): session
+        for session in UserSession.objects.filter(
+            user_id__in={user_id for user_id, _ in seen},
+            session_key__in={session_key for _, session_key in seen},
+        )
+    }
+    to_create, to_update = [], []
+    for (user_id, session_key), values in seen.items():
+        session = existing.get((user_id, session_key))
+        if session is None:
+            to_create.append(UserSession(user_id=user_id, session_key=session_key, is_active=True, **values))
+            continue
+        if session.is_active and all(getattr(session, field) == value for field, value in values.items()):
+            continue
+        for field, value in values.items():
+            setattr(session, field, value)
+        session.is_active = True
+        to_update.append(session)
+
+    try:
+        with transaction.atomic():
+            _save_sessions(to_create, to_update)
+        created, updated = len(to_create), len(to_update)
+    except (DataError, IntegrityError):
+        # One bad row fails the whole batch; save the rows one at a time so
+        # it is dropped instead of being requeued forever.
+        logger.exception('Bulk write of %d presence entries failed; writing them one by one', len(to_create) + len(to_update))
+        created = sum(_save_or_drop([session], []) for session in to_create)
+        updated = sum(_save_or_drop([], [session]) for session in to_update)
+    return created, updated, len(seen) - len(to_create) - len(to_update)
+
+
+def _save_or_drop(to_create, to_update):
+    """Saves one session on its own; 1 if it was written, 0 if it was dropped."""
+    session = (to_create or to_update)[0]
+    try:
+        with transaction.atomic():
+            _save_sessions(to_create, to_update)
+    except (DataError, IntegrityError):
+        logger.exception('Dropping presence entry %s:%s (ip_address=%r)', session.user_id, session.session_key, session.ip_address)
+        return 0
+    return 1
+
+
+def _save_sessions(to_create, to_update):
+    if to_update:
+        UserSession.objects.bulk_update(to_update, ['last_seen', 'ip_address', 'user_agent', 'is_active'])
+    if to_create:
+        UserSession.objects.bulk_create(to_create)
+
+
+def _prune(client):
+    cutoff = int(time.time()) - settings.PRESENCE_RETENTION_SECONDS
+    stale = client.zrangebyscore(LAST_SEEN_KEY, '-inf', cutoff)
+    if not stale:
+        return 0
+    pipe = client.pipeline()
+    pipe.zrem(LAST_SEEN_KEY, *stale)
+    pipe.hdel(META_KEY, *stale)
+    for member in stale:
+        user_id = member.decode().split(':', 1)[0]
+        pipe.srem(USER_KEY.format(user_id=user_id), member)
+    pipe.execute()
+    return len(stale)
@@ -1,3 +1,7 @@
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework import serializers
 from .models import AuditLog, UserSession
 
@@ -25,4 +29,23 @@ class UserSessionSerializer(serializers.ModelSerializer):
             'id', 'user', 'user_username', 'user_first_name', 'session_key',
             'ip_address', 'user_agent', 'created_at', 'last_seen', 'is_active'
         ]
-        read_only_fields = fields
\ No newline at end of file
+        read_only_fields = fields
+
+class UserPresenceSerializer(serializers.ModelSerializer):
+    """Reads the last_seen annotation added by UserActiveStatusView."""
+    user_id = serializers.IntegerField(source='id', read_only=True)
+    is_active = serializers.SerializerMethodField()
+    is_online = serializers.SerializerMethodField()
+    last_seen = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = get_user_model()
+        fields = ['user_id', 'username', 'first_name', 'last_name', 'role', 'is_active', 'is_online', 'last_seen']
+        read_only_fields = fields
+
+    def get_is_active(self, obj):
+        return obj.last_seen is not None
+
+    def get_is_online(self, obj):
+        cutoff = timezone.now() - timedelta(seconds=settings.PRESENCE_ONLINE_SECONDS)
+        return obj.last_seen is not None and obj.last_seen >= cutoff
@@ -1,24 +1,81 @@
 from celery import shared_task
-from .models import AuditLog
+from django.conf import settings
+from django.utils import timezone
 
 @shared_task
 def log_action(user_id, action, description, ip_address=None, user_agent=None, metadata=None):
     """
-    Asynchronously logs an action to the audit log.
+    Logs a single action to the audit log. New code uses
+    audit.buffer.record_action; this task stays for messages already queued.
     """
-    from django.contrib.auth import get_user_model
-    User = get_user_model()
-    
-    user = User.objects.filter(id=user_id).first()
-    
-    AuditLog.objects.create(
-        user=user,
-        action=action,
-        description=description,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        metadata=metadata or {}
-    )
+    from .buffer import write_entries
+
+    write_entries([{
+        'user_id': user_id,
+        'action': action,
+        'description': description,
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+        'metadata': metadata,
+        'timestamp': timezone.now().isoformat(),
+    }])
+
+@shared_task
+def flush_audit_buffer():
+    """
+    Writes buffered audit entries to AuditLog in bulk. Only one flush runs
+    at a time.
+    """
+    from utils.redis_client import get_redis, release_lock
+    from .buffer import AUDIT_BUFFER_LOCK, buffer_length, flush_buffer
+
+    lock = get_redis().lock(AUDIT_BUFFER_LOCK, timeout=settings.AUDIT_BUFFER_FLUSH_LOCK_TTL)
+    if not lock.acquire(blocking=False):
+        return {'status': 'success', 'skipped': True}
+    try:
+        written, skipped = flush_buffer()
+        return {'status': 'success', 'written': written, 'skipped': skipped, 'remaining': buffer_length()}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+    finally:
+        release_lock(lock)
+
+@shared_task
+def flush_presence():
+    """
+    Writes presence recorded by AuditMiddleware to UserSession in bulk.
+    """
+    from utils.redis_client import get_redis, release_lock
+    from .presence import flush_presence as flush
+
+    lock = get_redis().lock('presence:flush', timeout=settings.PRESENCE_FLUSH_LOCK_TTL)
+    if not lock.acquire(blocking=False):
+        return {'status': 'success', 'skipped': True}
+    try:
+        return {'status': 'success', **flush()}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+    finally:
+        release_lock(lock)
+
+@shared_task
+def maintain_log_partitions():
+    """
+    Creates the coming months' AuditLog / VerificationLog partitions and
+    archives partitions past their retention.
+    """
+    from .partitions import archive_partitions, ensure_partitions
+
+    try:
+        created = ensure_partitions()
+        archived = archive_partitions()
+        return {
+            'status': 'success',
+            'created': created,
+            'archived': [{'partition': name, 'rows': rows, 'file': path} for name, rows, path in archived],
+        }
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
 
 @shared_task
 def log_logout(user_id, ip_address=None, user_agent=None):
@@ -26,12 +83,14 @@ def log_logout(user_id, ip_address=None, user_agent=None):
     Logs a user logout action and deactivates their session.
     """
     from django.contrib.auth import get_user_model
+    from .buffer import record_action
     from .models import UserSession
+    from .presence import forget_user
     User = get_user_model()
     
     user = User.objects.filter(id=user_id).first()
     
-    log_action.delay(
+    record_action(
         user_id=user_id,
         action='LOGOUT',
         description=f'User {user.username if user else "unknown"} logged out',
@@ -39,4 +98,5 @@ def log_logout(user_id, ip_address=None, user_agent=None):
         user_agent=user_agent
     )
     
-    UserSession.objects.filter(user=user, is_active=True).update(is_active=False)
\ No newline at end of file
+    forget_user(user_id)
+    UserSession.objects.filter(user=user, is_active=True).update(is_active=False)
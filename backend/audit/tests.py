@@ -1,3 +1,58 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+from utils.benchmark import EndpointBudgetMixin
+from .buffer import write_batch
+from .models import AuditLog
+from .presence import client_ip
 
-# Create your tests here.
+User = get_user_model()
+
+
+class AuditEndpointBudgetTests(EndpointBudgetMixin, TestCase):
+    app = 'audit'
+
+
+class AuditWriteTests(TestCase):
+    def entry(self, description, ip_address=None):
+        return {
+            'user_id': None, 'action': 'LOGIN', 'description': description, 'ip_address': ip_address,
+            'user_agent': '', 'metadata': {}, 'timestamp': '2026-01-05T10:00:00+00:00',
+        }
+
+    def test_client_ip_ignores_invalid_forwarded_address(self):
+        factory = RequestFactory()
+        self.assertIsNone(client_ip(factory.get('/', HTTP_X_FORWARDED_FOR='not-an-ip, 10.0.0.1')))
+        self.assertEqual(client_ip(factory.get('/', HTTP_X_FORWARDED_FOR=' 203.0.113.7 , 10.0.0.1')), '203.0.113.7')
+
+    def test_bad_entry_is_dropped_and_rest_of_batch_written(self):
+        written, dropped = write_batch([
+            self.entry('first', '198.51.100.1'),
+            self.entry('poisoned', 'not-an-ip'),
+            self.entry('last'),
+        ])
+        self.assertEqual((written, dropped), (2, 1))
+        stored = AuditLog.objects.filter(description__in=['first', 'poisoned', 'last'])
+        self.assertEqual(set(stored.values_list('description', flat=True)), {'first', 'last'})
+
+
+class AuditSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='audit-search-admin', email='audit-search-admin@example.com', password='x', role='ADMIN',
+            phone_number='254700990101',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_relevance_ordering(self):
+        response = self.client.get('/api/audit/logs/', {'search': 'login', 'ordering': 'relevance'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_relevance_ordering_without_search_terms(self):
+        # Punctuation only: nothing to rank by, so it falls back to newest first.
+        response = self.client.get('/api/audit/logs/', {'search': '!!!', 'ordering': 'relevance'})
+        self.assertEqual(response.status_code, 200)
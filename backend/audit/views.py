@@ -1,34 +1,43 @@
 from rest_framework import generics, status
-from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
+from django.db.models import F, OuterRef, Subquery
 from django.utils import timezone
 from .models import AuditLog, UserSession
-from .serializers import AuditLogSerializer, UserSessionSerializer
+from .serializers import AuditLogSerializer, UserSessionSerializer, UserPresenceSerializer
 from .permissions import IsAdmin
+from .filters import AuditLogFilter, UserPresenceFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from utils.pagination import KeysetPagination
 
 User = get_user_model()
 
 class AuditLogListView(generics.ListAPIView):
-    queryset = AuditLog.objects.all()
+    queryset = AuditLog.objects.select_related('user').defer('search_vector')
     serializer_class = AuditLogSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['action', 'user', 'ip_address']
-    search_fields = ['description', 'user__username', 'user__email']
-    ordering_fields = ['timestamp', 'action']
-    ordering = ['-timestamp']
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = AuditLogFilter
+
+    keyset_field = 'timestamp'
+
+    def paginate_queryset(self, queryset):
+        # Newest first, or best match first with ?search=...&ordering=relevance.
+        # Taken from the filtered queryset: a search with no usable terms
+        # (e.g. only punctuation) is not ranked.
+        if self.request.query_params.get('ordering') == 'relevance' and 'search_rank' in queryset.query.annotations:
+            self.keyset_field = 'search_rank'
+        return super().paginate_queryset(queryset)
 
 class AuditLogDetailView(generics.RetrieveAPIView):
-    queryset = AuditLog.objects.all()
+    queryset = AuditLog.objects.select_related('user').defer('search_vector')
     serializer_class = AuditLogSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
 
 class UserSessionListView(generics.ListAPIView):
-    queryset = UserSession.objects.filter(is_active=True)
+    queryset = UserSession.objects.filter(is_active=True).select_related('user')
     serializer_class = UserSessionSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -37,31 +46,38 @@ class UserSessionListView(generics.ListAPIView):
     ordering_fields = ['last_seen', 'created_at']
     ordering = ['-last_seen']
 
-class UserActiveStatusView(APIView):
+class UserActiveStatusView(generics.ListAPIView):
+    """
+    Each user with the last_seen of their most recent active session, in one
+    query: the latest session comes from a correlated subquery served by the
+    (user, -last_seen) active-session index. Recently seen users come first.
+    """
+    serializer_class = UserPresenceSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UserPresenceFilter
 
-    def get(self, request):
-        users = User.objects.all()
-        data = []
-        for user in users:
-            last_session = UserSession.objects.filter(user=user, is_active=True).order_by('-last_seen').first()
-            data.append({
-                'user_id': user.id,
-                'username': user.username,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'role': user.role,
-                'is_active': last_session.is_active if last_session else False,
-                'last_seen': last_session.last_seen if last_session else None,
-            })
-        return Response(data)
+    def get_queryset(self):
+        latest_session = UserSession.objects.filter(
+            user=OuterRef('pk'), is_active=True
+        ).order_by('-last_seen').values('last_seen')[:1]
+        return User.objects.only(
+            'id', 'username', 'first_name', 'last_name', 'role'
+        ).annotate(
+            last_seen=Subquery(latest_session)
+        ).order_by(F('last_seen').desc(nulls_last=True), 'id')
 
 class MyAuditLogsView(generics.ListAPIView):
     serializer_class = AuditLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_field = 'timestamp'
     ordering = ['-timestamp']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = AuditLogFilter
 
     def get_queryset(self):
+        queryset = AuditLog.objects.select_related('user').defer('search_vector')
         if self.request.user.role == 'ADMIN':
-            return AuditLog.objects.all()
-        return AuditLog.objects.filter(user=self.request.user)
\ No newline at end of file
+            return queryset
+        return queryset.filter(user=self.request.user)
\ No newline at end of file
@@ -1,6 +1,5 @@
 import os
 from celery import Celery
-from celery.schedules import crontab
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
@@ -8,9 +7,3 @@ app = Celery('config')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
-app.conf.beat_schedule = {
-    'cleanup-expired-tokens': {
-        'task': 'contracts.tasks.cleanup_expired_tokens',
-        'schedule': crontab(hour=0, minute=0),
-    },
-}
\ No newline at end of file
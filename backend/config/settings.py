@@ -20,6 +20,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -36,9 +37,11 @@ INSTALLED_APPS = [
     'reports',
     'notifications',
     'audit',
+    'telemetry',
 ]
 
 MIDDLEWARE = [
+    'telemetry.middleware.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -158,8 +161,11 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
-CELERY_BROKER_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
-CELERY_RESULT_BACKEND = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 5))
+
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 
 _REDIS_USE_SSL = CELERY_BROKER_URL.startswith('rediss://')
 
@@ -194,6 +200,28 @@ if _REDIS_USE_SSL:
     if _ssl_ca_certs:
         CELERY_REDIS_BACKEND_USE_SSL['ssl_ca_certs'] = _ssl_ca_certs
 
+# Shared cache for all processes. Redis errors are logged and treated as
+# misses, so an outage slows requests down rather than failing them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.environ.get('CACHE_REDIS_URL', REDIS_URL),
+        'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'portal'),
+        'TIMEOUT': int(os.environ.get('CACHE_DEFAULT_TIMEOUT', 300)),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'SOCKET_CONNECT_TIMEOUT': REDIS_SOCKET_TIMEOUT,
+            'SOCKET_TIMEOUT': REDIS_SOCKET_TIMEOUT,
+            'IGNORE_EXCEPTIONS': True,
+        },
+    }
+}
+if CACHES['default']['LOCATION'].startswith('rediss://'):
+    CACHES['default']['OPTIONS']['CONNECTION_POOL_KWARGS'] = {'ssl_cert_reqs': CELERY_REDIS_SSL_CERT_REQS}
+    if os.environ.get('CELERY_REDIS_SSL_CA_CERTS'):
+        CACHES['default']['OPTIONS']['CONNECTION_POOL_KWARGS']['ssl_ca_certs'] = os.environ['CELERY_REDIS_SSL_CA_CERTS']
+DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+
 CELERY_BEAT_SCHEDULE = {
     'cleanup-expired-tokens': {
         'task': 'contracts.tasks.cleanup_expired_tokens',
@@ -215,6 +243,38 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'reports.tasks.refresh_dashboard_cache',
         'schedule': crontab(minute='*/15'),
     },
+    'process-callback-inbox': {
+        'task': 'payments.tasks.process_callback_inbox',
+        'schedule': timedelta(seconds=int(os.environ.get('CALLBACK_INBOX_POLL_SECONDS', 2))),
+    },
+    'reconcile-stale-payments': {
+        'task': 'payments.tasks.reconcile_stale_payments',
+        'schedule': timedelta(seconds=int(os.environ.get('RECONCILIATION_INTERVAL_SECONDS', 120))),
+    },
+    'maintain-log-partitions': {
+        'task': 'audit.tasks.maintain_log_partitions',
+        'schedule': crontab(hour=1, minute=30),
+    },
+    'flush-presence': {
+        'task': 'audit.tasks.flush_presence',
+        'schedule': timedelta(seconds=int(os.environ.get('PRESENCE_FLUSH_SECONDS', 30))),
+    },
+    'flush-audit-buffer': {
+        'task': 'audit.tasks.flush_audit_buffer',
+        'schedule': timedelta(seconds=int(os.environ.get('AUDIT_BUFFER_FLUSH_SECONDS', 2))),
+    },
+    'refresh-user-performance': {
+        'task': 'reports.tasks.refresh_user_performance',
+        'schedule': timedelta(seconds=int(os.environ.get('PERFORMANCE_FLUSH_SECONDS', 60))),
+    },
+    'rebuild-user-performance': {
+        'task': 'reports.tasks.rebuild_user_performance',
+        'schedule': crontab(hour=2, minute=15),
+    },
+    'rebuild-daily-facts': {
+        'task': 'reports.tasks.rebuild_daily_facts',
+        'schedule': crontab(hour=2, minute=45),
+    },
 }
 
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
@@ -233,7 +293,7 @@ MPESA_CONSUMER_KEY = os.environ.get('MPESA_CONSUMER_KEY', '')
 MPESA_CONSUMER_SECRET = os.environ.get('MPESA_CONSUMER_SECRET', '')
 MPESA_SHORTCODE = os.environ.get('MPESA_SHORTCODE', '')
 MPESA_PASSKEY = os.environ.get('MPESA_PASSKEY', '')
-MPESA_ENVIRONMENT = os.environ.get('MPESA_ENVIRONMENT', 'sandbox')
+MPESA_ENVIRONMENT = os.environ.get('MPESA_ENVIRONMENT', 'sandbox' if DEBUG else 'production')
 MPESA_CALLBACK_URL = os.environ.get('MPESA_CALLBACK_URL', f'{FRONTEND_URL.replace("http", "https")}/api/payments/mpesa/callback/')
 
 MPESA_B2C_SHORTCODE = os.environ.get('MPESA_B2C_SHORTCODE', MPESA_SHORTCODE)
@@ -241,11 +301,109 @@ MPESA_B2C_INITIATOR_NAME = os.environ.get('MPESA_B2C_INITIATOR_NAME', '')
 MPESA_B2C_SECURITY_CREDENTIAL = os.environ.get('MPESA_B2C_SECURITY_CREDENTIAL', '')
 MPESA_B2C_RESULT_URL = os.environ.get('MPESA_B2C_RESULT_URL', f'{FRONTEND_URL.replace("http", "https")}/api/payouts/mpesa/b2c/result/')
 MPESA_B2C_TIMEOUT_URL = os.environ.get('MPESA_B2C_TIMEOUT_URL', f'{FRONTEND_URL.replace("http", "https")}/api/payouts/mpesa/b2c/timeout/')
+MPESA_B2C_STATUS_RESULT_URL = os.environ.get('MPESA_B2C_STATUS_RESULT_URL', f'{FRONTEND_URL.replace("http", "https")}/api/payouts/mpesa/b2c/status/result/')
+
+MPESA_BASE_URLS = {
+    'sandbox': 'https://sandbox.safaricom.co.ke',
+    'production': 'https://api.safaricom.co.ke',
+}
+# Overrides MPESA_BASE_URLS, e.g. to point at the load-test simulator (manage.py simulate_providers).
+MPESA_BASE_URL = os.environ.get('MPESA_BASE_URL', '')
+MPESA_CONNECT_TIMEOUT = float(os.environ.get('MPESA_CONNECT_TIMEOUT', 5))
+MPESA_READ_TIMEOUT = float(os.environ.get('MPESA_READ_TIMEOUT', 30))
+MPESA_TOKEN_EXPIRY_MARGIN = int(os.environ.get('MPESA_TOKEN_EXPIRY_MARGIN', 120))
+MPESA_HTTP_POOL_SIZE = int(os.environ.get('MPESA_HTTP_POOL_SIZE', 10))
 
 PAYSTACK_SECRET_KEY = os.environ.get('PAYSTACK_SECRET_KEY', '')
 PAYSTACK_PUBLIC_KEY = os.environ.get('PAYSTACK_PUBLIC_KEY', '')
 PAYSTACK_WEBHOOK_SECRET = os.environ.get('PAYSTACK_WEBHOOK_SECRET', '')
-PAYSTACK_BASE_URL = 'https://api.paystack.co'
+PAYSTACK_BASE_URL = os.environ.get('PAYSTACK_BASE_URL', 'https://api.paystack.co')
+PAYSTACK_TIMEOUT = float(os.environ.get('PAYSTACK_TIMEOUT', 15))
+PAYSTACK_HTTP_POOL_SIZE = int(os.environ.get('PAYSTACK_HTTP_POOL_SIZE', 10))
+
+# Webhooks are written to payments.CallbackInbox and applied by a batched consumer
+PAYMENT_CALLBACK_INBOX = os.environ.get('PAYMENT_CALLBACK_INBOX', 'True') == 'True'
+CALLBACK_INBOX_BATCH_SIZE = int(os.environ.get('CALLBACK_INBOX_BATCH_SIZE', 200))
+CALLBACK_INBOX_MAX_ATTEMPTS = int(os.environ.get('CALLBACK_INBOX_MAX_ATTEMPTS', 10))
+
+# Idempotency
+IDEMPOTENCY_LOCK_TTL = int(os.environ.get('IDEMPOTENCY_LOCK_TTL', 60))
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 86400))
+CALLBACK_DEDUP_TTL = int(os.environ.get('CALLBACK_DEDUP_TTL', 7 * 86400))
+
+# Transaction / payout summaries cached in Redis; invalidated on status change
+SUMMARY_CACHE_TTL = int(os.environ.get('SUMMARY_CACHE_TTL', 300))
+
+# GET responses cached by utils.cache (see cache_response / CachedResponseMixin)
+API_CACHE_ENABLED = os.environ.get('API_CACHE_ENABLED', 'True') == 'True'
+API_CACHE_TTL = int(os.environ.get('API_CACHE_TTL', 120))
+
+# Multiplies the latency budgets in utils.benchmark (slow CI machines)
+ENDPOINT_BUDGET_LATENCY_FACTOR = float(os.environ.get('ENDPOINT_BUDGET_LATENCY_FACTOR', 1))
+
+# Audit entries are buffered in Redis and written in bulk by flush_audit_buffer
+AUDIT_BUFFER_BATCH_SIZE = int(os.environ.get('AUDIT_BUFFER_BATCH_SIZE', 500))
+AUDIT_BUFFER_MAX_BATCHES = int(os.environ.get('AUDIT_BUFFER_MAX_BATCHES', 20))
+AUDIT_BUFFER_FLUSH_LOCK_TTL = int(os.environ.get('AUDIT_BUFFER_FLUSH_LOCK_TTL', 60))
+
+# AuditLog / VerificationLog are monthly range partitions on PostgreSQL
+LOG_PARTITION_MONTHS_AHEAD = int(os.environ.get('LOG_PARTITION_MONTHS_AHEAD', 3))
+AUDIT_LOG_RETENTION_MONTHS = int(os.environ.get('AUDIT_LOG_RETENTION_MONTHS', 12))
+VERIFICATION_LOG_RETENTION_MONTHS = int(os.environ.get('VERIFICATION_LOG_RETENTION_MONTHS', 12))
+LOG_ARCHIVE_DIR = os.environ.get('LOG_ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+# Audit searches without ?timestamp_after= only look this many days back (0 = no limit)
+AUDIT_SEARCH_WINDOW_DAYS = int(os.environ.get('AUDIT_SEARCH_WINDOW_DAYS', 90))
+
+# Presence ("last seen") is kept in Redis and written to UserSession by flush_presence
+PRESENCE_RESOLUTION_SECONDS = int(os.environ.get('PRESENCE_RESOLUTION_SECONDS', 60))
+PRESENCE_RETENTION_SECONDS = int(os.environ.get('PRESENCE_RETENTION_SECONDS', 86400))
+PRESENCE_FLUSH_BATCH_SIZE = int(os.environ.get('PRESENCE_FLUSH_BATCH_SIZE', 1000))
+PRESENCE_FLUSH_LOCK_TTL = int(os.environ.get('PRESENCE_FLUSH_LOCK_TTL', 120))
+# Users seen within this many seconds count as online in /audit/active-status/
+PRESENCE_ONLINE_SECONDS = int(os.environ.get('PRESENCE_ONLINE_SECONDS', 300))
+
+# Staff leaderboard rollup (reports.UserPerformanceDaily); the nightly rebuild
+# covers the last PERFORMANCE_REBUILD_DAYS days (0 = all history)
+PERFORMANCE_FLUSH_BATCH_SIZE = int(os.environ.get('PERFORMANCE_FLUSH_BATCH_SIZE', 500))
+PERFORMANCE_FLUSH_LOCK_TTL = int(os.environ.get('PERFORMANCE_FLUSH_LOCK_TTL', 120))
+PERFORMANCE_REBUILD_DAYS = int(os.environ.get('PERFORMANCE_REBUILD_DAYS', 0))
+# Days of chart fact tables (reports.facts) rebuilt nightly; 0 = all history
+FACTS_REBUILD_DAYS = int(os.environ.get('FACTS_REBUILD_DAYS', 3))
+FACTS_REBUILD_LOCK_TTL = int(os.environ.get('FACTS_REBUILD_LOCK_TTL', 300))
+
+# Dashboard payloads precomputed into reports.DashboardCache by refresh-dashboard-cache;
+# expired entries are served for up to DASHBOARD_CACHE_MAX_STALE seconds while they refresh
+DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 900))
+DASHBOARD_CACHE_MAX_STALE = int(os.environ.get('DASHBOARD_CACHE_MAX_STALE', 3600))
+DASHBOARD_REFRESH_LOCK_TTL = int(os.environ.get('DASHBOARD_REFRESH_LOCK_TTL', 600))
+DASHBOARD_PRECOMPUTE_ACTIVE_DAYS = int(os.environ.get('DASHBOARD_PRECOMPUTE_ACTIVE_DAYS', 7))
+
+# Server-sent transaction status stream (served by the ASGI app in config/asgi.py)
+PAYMENT_STATUS_STREAM_TIMEOUT = int(os.environ.get('PAYMENT_STATUS_STREAM_TIMEOUT', 300))
+PAYMENT_STATUS_STREAM_HEARTBEAT = int(os.environ.get('PAYMENT_STATUS_STREAM_HEARTBEAT', 15))
+# Maximum references per POST /payments/status/batch/
+PAYMENT_STATUS_BATCH_MAX = int(os.environ.get('PAYMENT_STATUS_BATCH_MAX', 300))
+
+# Reconciliation sweeper for transactions stuck in PENDING and payouts stuck in PROCESSING
+RECONCILIATION_MIN_AGE_SECONDS = int(os.environ.get('RECONCILIATION_MIN_AGE_SECONDS', 120))
+RECONCILIATION_EXPIRE_AFTER_SECONDS = int(os.environ.get('RECONCILIATION_EXPIRE_AFTER_SECONDS', 86400))
+RECONCILIATION_BATCH_SIZE = int(os.environ.get('RECONCILIATION_BATCH_SIZE', 100))
+RECONCILIATION_WORKERS = int(os.environ.get('RECONCILIATION_WORKERS', 8))
+RECONCILIATION_RATE_LIMITS = {
+    # Provider calls per second, shared by all sweeper threads
+    'MPESA': float(os.environ.get('RECONCILIATION_MPESA_RATE', 5)),
+    'PAYSTACK': float(os.environ.get('RECONCILIATION_PAYSTACK_RATE', 10)),
+}
+
+# Request metrics (telemetry app): Server-Timing headers and histograms per view and role,
+# added up in Redis every METRICS_FLUSH_INTERVAL seconds and served at /metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 10))
+# Bearer token Prometheus scrapes /metrics with; ADMIN users can read it with their JWT
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Server-Timing on every response; otherwise only on responses to ADMIN users,
+# since it reveals query counts and timings
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', str(DEBUG)) == 'True'
 
 WEASYPRINT_ALLOWED_RESOURCES = ['file://', 'http://', 'https://']
 WEASYPRINT_FONT_CONFIG = None
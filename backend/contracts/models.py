@@ -39,6 +39,8 @@ class Contract(models.Model):
             models.Index(fields=['reference_code']),
             models.Index(fields=['signing_token']),
             models.Index(fields=['status']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['created_by', 'created_at']),
         ]
 
     def __str__(self):
@@ -100,6 +102,7 @@ class Invoice(models.Model):
             models.Index(fields=['reference_code']),
             models.Index(fields=['status']),
             models.Index(fields=['due_date']),
+            models.Index(fields=['created_at']),
         ]
 
     def __str__(self):
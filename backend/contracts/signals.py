@@ -1,6 +1,15 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Contract, Invoice
+from utils.cache import invalidate_cache
+
+@receiver(post_save, sender=Contract)
+def invalidate_contract_responses(sender, instance, **kwargs):
+    invalidate_cache('contracts')
+
+@receiver(post_save, sender=Invoice)
+def invalidate_invoice_responses(sender, instance, **kwargs):
+    invalidate_cache('invoices')
 
 @receiver(post_delete, sender=Contract)
 def prevent_contract_deletion(sender, instance, **kwargs):
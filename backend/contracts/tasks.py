@@ -1,4 +1,5 @@
 # tasks.py
+import logging
 from celery import shared_task
 from django.core.mail import EmailMessage
 from django.conf import settings
@@ -11,7 +12,9 @@ import base64
 from .models import Contract, Invoice
 from datetime import timedelta
 from django.utils import timezone
-from audit.tasks import log_action
+from audit.buffer import record_action
+
+logger = logging.getLogger(__name__)
 
 
 def get_director_signature_base64():
@@ -110,13 +113,14 @@ def send_contract_email(contract_id):
         # Update contract status
         contract.status = 'SENT'
         contract.save(update_fields=['status', 'updated_at'])
+        return {'status': 'success', 'contract_id': contract_id}
         
     except Contract.DoesNotExist:
-        print(f"❌ Contract {contract_id} not found for email sending")
+        logger.error('Contract %s not found for email sending', contract_id)
+        return {'status': 'error', 'message': f'Contract {contract_id} not found'}
     except Exception as e:
-        print(f"❌ Error sending contract email: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Error sending contract email %s', contract_id)
+        return {'status': 'error', 'message': str(e)}
 
 
 @shared_task
@@ -189,7 +193,7 @@ def generate_signed_contract_pdf(contract_id):
         print(f"✅ Contract PDF emailed to {contract.client_email} and {contract.created_by.email}")
         
         # --- Log success ---
-        log_action.delay(
+        record_action(
             contract.created_by.id,
             'CONTRACT_PDF_GENERATED',
             f'PDF generated and sent for signed contract: {contract.reference_code}',
@@ -200,17 +204,17 @@ def generate_signed_contract_pdf(contract_id):
                 'user_sig_included': bool(user_sig_b64)
             }
         )
+        return {'status': 'success', 'contract_id': contract_id}
         
     except Contract.DoesNotExist:
-        print(f"❌ Contract {contract_id} not found for PDF generation")
+        logger.error('Contract %s not found for PDF generation', contract_id)
+        return {'status': 'error', 'message': f'Contract {contract_id} not found'}
     except Exception as e:
-        print(f"❌ Error generating contract PDF: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Error generating contract PDF %s', contract_id)
         
         # Log error if we have contract context
         if 'contract' in locals() and hasattr(contract, 'created_by'):
-            log_action.delay(
+            record_action(
                 contract.created_by.id,
                 'CONTRACT_PDF_ERROR',
                 f'PDF generation failed: {contract.reference_code} - {str(e)}',
@@ -220,6 +224,7 @@ def generate_signed_contract_pdf(contract_id):
                     'error_type': type(e).__name__
                 }
             )
+        return {'status': 'error', 'message': str(e)}
 
 
 @shared_task
@@ -259,12 +264,13 @@ def generate_invoice_pdf(contract_id):
         email.send()
         
         # Log actions
-        log_action.delay(contract.created_by.id, 'INVOICE_CREATED', f'Invoice generated: {invoice.reference_code}')
-        log_action.delay(contract.created_by.id, 'INVOICE_SENT', f'Invoice sent: {invoice.reference_code}')
+        record_action(contract.created_by.id, 'INVOICE_CREATED', f'Invoice generated: {invoice.reference_code}')
+        record_action(contract.created_by.id, 'INVOICE_SENT', f'Invoice sent: {invoice.reference_code}')
+        return {'status': 'success', 'contract_id': contract_id, 'invoice_id': invoice.id}
         
     except Contract.DoesNotExist:
-        print(f"❌ Contract {contract_id} not found for invoice generation")
+        logger.error('Contract %s not found for invoice generation', contract_id)
+        return {'status': 'error', 'message': f'Contract {contract_id} not found'}
     except Exception as e:
-        print(f"❌ Error generating invoice PDF: {e}")
-        import traceback
-        traceback.print_exc()
\ No newline at end of file
+        logger.exception('Error generating invoice PDF for contract %s', contract_id)
+        return {'status': 'error', 'message': str(e)}
\ No newline at end of file
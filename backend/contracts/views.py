@@ -15,7 +15,10 @@ from .serializers import (
 )
 from .permissions import IsAdmin, IsOwnerOrAdmin
 from .tasks import send_contract_email, generate_signed_contract_pdf, generate_invoice_pdf
-from audit.tasks import log_action
+from audit.buffer import record_action
+from utils.idempotency import idempotent
+from utils.cache import CachedResponseMixin
+from utils.pagination import KeysetPagination
 
 User = get_user_model()
 
@@ -44,19 +47,22 @@ def get_static_image_base64(relative_path):
         return None
 
 
-class ContractListView(generics.ListAPIView):
+class ContractListView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = ContractSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_namespaces = ('contracts',)
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Contract.objects.select_related('created_by', 'invoice').order_by('-created_at')
         if user.role == 'ADMIN':
-            return Contract.objects.all().order_by('-created_at')
-        return Contract.objects.filter(created_by=user).order_by('-created_at')
+            return queryset
+        return queryset.filter(created_by=user)
 
 
 class ContractDetailView(generics.RetrieveAPIView):
-    queryset = Contract.objects.all()
+    queryset = Contract.objects.select_related('created_by', 'invoice')
     serializer_class = ContractSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
 
@@ -64,6 +70,7 @@ class ContractDetailView(generics.RetrieveAPIView):
 class ContractCreateView(views.APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent('contracts.create')
     def post(self, request):
         serializer = ContractCreateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
@@ -75,7 +82,7 @@ class ContractCreateView(views.APIView):
             # Send Email with Tokenized Link
             send_contract_email.delay(contract.id)
             
-            log_action.delay(
+            record_action(
                 request.user.id,
                 'CONTRACT_CREATED',
                 f'Contract created: {contract.reference_code} for {contract.client_name}',
@@ -156,7 +163,7 @@ class ContractSignView(views.APIView):
                 generate_signed_contract_pdf.delay(contract.id)
                 generate_invoice_pdf.delay(contract.id)
 
-                log_action.delay(
+                record_action(
                     contract.created_by.id,
                     'CONTRACT_SIGNED',
                     f'Contract signed: {contract.reference_code} by {contract.client_name}',
@@ -181,18 +188,21 @@ class ContractSignView(views.APIView):
         return ip
 
 
-class InvoiceListView(generics.ListAPIView):
+class InvoiceListView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = InvoiceSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_namespaces = ('invoices',)
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Invoice.objects.select_related('contract').order_by('-created_at')
         if user.role == 'ADMIN':
-            return Invoice.objects.all().order_by('-created_at')
-        return Invoice.objects.filter(contract__created_by=user).order_by('-created_at')
+            return queryset
+        return queryset.filter(contract__created_by=user)
 
 
 class InvoiceDetailView(generics.RetrieveAPIView):
-    queryset = Invoice.objects.all()
+    queryset = Invoice.objects.select_related('contract')
     serializer_class = InvoiceSerializer
     permission_classes = [IsAuthenticated]
\ No newline at end of file
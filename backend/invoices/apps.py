@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+class InvoicesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'invoices'
+
+    def ready(self):
+        import invoices.signals
\ No newline at end of file
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.28 on 2026-02-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference_code', models.CharField(editable=False, max_length=20, unique=True)),
+                ('client_name', models.CharField(max_length=100)),
+                ('client_email', models.EmailField(max_length=254)),
+                ('client_phone', models.CharField(max_length=15)),
+                ('client_company', models.CharField(blank=True, max_length=100, null=True)),
+                ('service_description', models.TextField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('tax_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('due_date', models.DateTimeField()),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('SENT', 'Sent'), ('PENDING', 'Pending'), ('PAID', 'Paid'), ('OVERDUE', 'Overdue'), ('CANCELLED', 'Cancelled')], default='DRAFT', max_length=20)),
+                ('pdf_file', models.FileField(blank=True, null=True, upload_to='invoices/pdfs/')),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('payment_reference', models.CharField(blank=True, max_length=100, null=True)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_immutable', models.BooleanField(default=True, editable=False)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.28 on 2026-02-18 19:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('invoices', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_invoices', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['reference_code'], name='invoices_in_referen_445753_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status'], name='invoices_in_status_cec546_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['due_date'], name='invoices_in_due_dat_6cc0ed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['created_by', 'status'], name='invoices_in_created_1b953c_idx'),
+        ),
+    ]
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Invoice
+from utils.cache import invalidate_cache
+
+@receiver(post_save, sender=Invoice)
+def invalidate_invoice_responses(sender, instance, **kwargs):
+    invalidate_cache('invoices')
+
+@receiver(post_delete, sender=Invoice)
+def prevent_invoice_deletion(sender, instance, **kwargs):
+    raise ValueError("Invoice records are immutable and cannot be deleted.")
\ No newline at end of file
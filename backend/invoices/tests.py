@@ -0,0 +1,6 @@
+from django.test import TestCase
+from utils.benchmark import EndpointBudgetMixin
+
+
+class InvoiceEndpointBudgetTests(EndpointBudgetMixin, TestCase):
+    app = 'invoices'
@@ -38,6 +38,7 @@ class Notification(models.Model):
             models.Index(fields=['recipient', 'is_read']),
             models.Index(fields=['notification_type', 'created_at']),
             models.Index(fields=['priority', 'created_at']),
+            models.Index(fields=['recipient', 'created_at']),
         ]
 
     def __str__(self):
@@ -1,6 +1,11 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Notification, AdminNotification
+from utils.cache import invalidate_cache
+
+@receiver(post_save, sender=Notification)
+def invalidate_notification_responses(sender, instance, **kwargs):
+    invalidate_cache(f'notifications:{instance.recipient_id}')
 
 @receiver(post_delete, sender=Notification)
 def log_notification_deletion(sender, instance, **kwargs):
@@ -7,18 +7,22 @@ from .models import Notification, AdminNotification
 from .serializers import NotificationSerializer, AdminNotificationSerializer, AdminNotificationCreateSerializer
 from .permissions import IsAdmin
 from .tasks import send_admin_notification_email
+from utils.cache import CachedResponseMixin, cache_response, invalidate_cache
+from utils.pagination import KeysetPagination
 
 User = get_user_model()
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_namespaces = ('notifications:{user_id}',)
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
+        return Notification.objects.filter(recipient=self.request.user).select_related('recipient')
 
 class NotificationDetailView(generics.RetrieveAPIView):
-    queryset = Notification.objects.all()
+    queryset = Notification.objects.select_related('recipient')
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
 
@@ -41,6 +45,8 @@ class NotificationMarkAllAsReadView(views.APIView):
             is_read=True,
             read_at=timezone.now()
         )
+        # update() skips post_save
+        invalidate_cache(f'notifications:{request.user.id}')
         return Response({'status': 'All notifications marked as read'})
 
 class AdminNotificationListView(generics.ListAPIView):
@@ -48,10 +54,10 @@ class AdminNotificationListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get_queryset(self):
-        return AdminNotification.objects.all()
+        return AdminNotification.objects.select_related('resolved_by')
 
 class AdminNotificationDetailView(generics.RetrieveAPIView):
-    queryset = AdminNotification.objects.all()
+    queryset = AdminNotification.objects.select_related('resolved_by')
     serializer_class = AdminNotificationSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
 
@@ -80,6 +86,7 @@ class AdminNotificationCreateView(views.APIView):
 class UnreadNotificationCountView(views.APIView):
     permission_classes = [IsAuthenticated]
 
+    @cache_response(('notifications:{user_id}',))
     def get(self, request):
         count = Notification.objects.filter(recipient=request.user, is_read=False).count()
         return Response({'unread_count': count})
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Transaction, MpesaSTKRequest, PaystackTransaction, LedgerEntry
+from .models import Transaction, MpesaSTKRequest, PaystackTransaction, LedgerEntry, LedgerAccount, CallbackInbox, ReconciliationRun
 
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
@@ -30,8 +30,8 @@ class PaystackTransactionAdmin(admin.ModelAdmin):
 
 @admin.register(LedgerEntry)
 class LedgerEntryAdmin(admin.ModelAdmin):
-    list_display = ('reference', 'transaction', 'entry_type', 'amount', 'balance_after', 'created_at')
-    list_filter = ('entry_type', 'created_at')
+    list_display = ('reference', 'account', 'transaction', 'entry_type', 'amount', 'balance_after', 'created_at')
+    list_filter = ('account', 'entry_type', 'created_at')
     search_fields = ('reference', 'description')
     readonly_fields = ('reference', 'created_at', 'is_immutable')
     ordering = ['-created_at']
@@ -40,4 +40,39 @@ class LedgerEntryAdmin(admin.ModelAdmin):
         return False
 
     def has_change_permission(self, request, obj=None):
-        return False
\ No newline at end of file
+        return False
+
+@admin.register(LedgerAccount)
+class LedgerAccountAdmin(admin.ModelAdmin):
+    list_display = ('code', 'total_credits', 'total_debits', 'net_balance', 'entry_count', 'last_entry_at')
+    readonly_fields = ('code', 'total_credits', 'total_debits', 'net_balance', 'entry_count', 'last_entry_at', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(CallbackInbox)
+class CallbackInboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'provider', 'external_id', 'received_at', 'processed_at', 'attempts')
+    list_filter = ('provider', 'received_at')
+    search_fields = ('external_id',)
+    readonly_fields = ('provider', 'external_id', 'payload', 'received_at', 'processed_at', 'attempts', 'last_error')
+    ordering = ['-id']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ReconciliationRun)
+class ReconciliationRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'duration_ms', 'transactions_checked', 'payouts_checked', 'completed', 'failed', 'expired', 'unresolved', 'errors')
+    list_filter = ('started_at',)
+    readonly_fields = [field.name for field in ReconciliationRun._meta.fields]
+    ordering = ['-started_at']
+
+    def has_add_permission(self, request):
+        return False
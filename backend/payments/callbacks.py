@@ -0,0 +1,158 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from .models import MpesaSTKRequest, PaystackTransaction, CallbackInbox
+from .tasks import create_ledger_entry
+from audit.buffer import record_action
+from utils.idempotency import claim_callback, release_callback
+
+TERMINAL_STATUSES = ['COMPLETED', 'FAILED', 'CANCELLED']
+
+
+def receive_callback(provider, external_id, payload, handler):
+    """
+    Stores (inbox mode) or applies a provider callback at most once per
+    external id. Returns 'duplicate', 'accepted' or 'applied'. If the
+    callback cannot be stored or applied the claim is released so the
+    provider's retry is processed normally.
+    """
+    if not claim_callback(provider, external_id):
+        return 'duplicate'
+    try:
+        if settings.PAYMENT_CALLBACK_INBOX:
+            try:
+                CallbackInbox.objects.create(provider=provider, external_id=external_id, payload=payload)
+            except IntegrityError:
+                return 'duplicate'
+            return 'accepted'
+        handler(payload)
+        return 'applied'
+    except Exception:
+        release_callback(provider, external_id)
+        raise
+
+
+def queue_ledger_credit(transaction):
+    """
+    Queues the ledger credit for a completed payment once the status change
+    commits, so a rolled-back callback never reaches the ledger.
+    """
+    db_transaction.on_commit(lambda: create_ledger_entry.delay(
+        transaction.id, 'CREDIT', transaction.amount, f'Payment completed: {transaction.reference_code}'
+    ))
+
+
+def apply_mpesa_stk_callback(data):
+    """
+    Applies a Daraja STK push callback to the STK request and its transaction.
+    Callbacks for transactions that are already settled are ignored, so a
+    replayed or duplicated callback never produces a second ledger entry.
+    """
+    stk_callback = data.get('Body', {}).get('stkCallback', {})
+    checkout_request_id = stk_callback.get('CheckoutRequestID')
+    result_code = str(stk_callback.get('ResultCode'))
+    result_desc = stk_callback.get('ResultDesc')
+
+    stk_request = MpesaSTKRequest.objects.select_related('transaction').get(checkout_request_id=checkout_request_id)
+    transaction = stk_request.transaction
+    if transaction.status in TERMINAL_STATUSES:
+        return
+
+    stk_request.status = 'COMPLETED' if result_code == '0' else 'FAILED'
+    stk_request.result_code = result_code
+    stk_request.result_desc = result_desc
+    stk_request.save()
+
+    if result_code == '0':
+        transaction.update_status('COMPLETED', callback_data=data)
+        queue_ledger_credit(transaction)
+        record_action(
+            transaction.user_id,
+            'PAYMENT_COMPLETED',
+            f'Payment completed: {transaction.reference_code} - {transaction.amount}',
+            metadata={'transaction_id': transaction.id}
+        )
+    else:
+        transaction.update_status('FAILED', callback_data=data, failed_reason=result_desc)
+        record_action(
+            transaction.user_id,
+            'PAYMENT_FAILED',
+            f'Payment failed: {transaction.reference_code} - {result_desc}',
+            metadata={'transaction_id': transaction.id}
+        )
+
+
+def apply_paystack_event(payload):
+    """
+    Applies a Paystack webhook event. Only charge.success and charge.failed
+    change state; other events are accepted and ignored.
+    """
+    event = payload.get('event')
+    data = payload.get('data', {})
+    if event not in ['charge.success', 'charge.failed']:
+        return
+
+    paystack_tx = PaystackTransaction.objects.select_related('transaction').get(reference=data.get('reference'))
+    transaction = paystack_tx.transaction
+    if transaction.status in TERMINAL_STATUSES:
+        return
+
+    paystack_tx.gateway_response = data.get('gateway_response', '')
+    if event == 'charge.success':
+        paystack_tx.status = 'COMPLETED'
+        paystack_tx.paid_at = timezone.now()
+        paystack_tx.channel = data.get('channel', '')
+        paystack_tx.save()
+
+        transaction.update_status('COMPLETED', callback_data=data)
+        queue_ledger_credit(transaction)
+        record_action(
+            transaction.user_id,
+            'PAYMENT_COMPLETED',
+            f'Payment completed: {transaction.reference_code} - {transaction.amount}',
+            metadata={'transaction_id': transaction.id}
+        )
+    else:
+        paystack_tx.status = 'FAILED'
+        paystack_tx.save()
+
+        transaction.update_status('FAILED', callback_data=data, failed_reason=data.get('gateway_response', 'Payment failed'))
+        record_action(
+            transaction.user_id,
+            'PAYMENT_FAILED',
+            f'Payment failed: {transaction.reference_code}',
+            metadata={'transaction_id': transaction.id}
+        )
+
+
+def inbox_stats():
+    """
+    Summarises how far the callback consumer lags behind, per provider.
+    Rows that exhausted their retries are reported as dead, not pending.
+    """
+    now = timezone.now()
+    rows = CallbackInbox.objects.filter(processed_at__isnull=True).values('provider').annotate(
+        pending=Count('id', filter=Q(attempts__lt=settings.CALLBACK_INBOX_MAX_ATTEMPTS)),
+        dead=Count('id', filter=Q(attempts__gte=settings.CALLBACK_INBOX_MAX_ATTEMPTS)),
+        oldest_pending=Min('received_at', filter=Q(attempts__lt=settings.CALLBACK_INBOX_MAX_ATTEMPTS)),
+    )
+
+    providers = {}
+    for row in rows:
+        oldest = row['oldest_pending']
+        providers[row['provider']] = {
+            'pending': row['pending'],
+            'dead': row['dead'],
+            'oldest_pending_at': oldest,
+            'lag_seconds': round((now - oldest).total_seconds(), 3) if oldest else 0,
+        }
+
+    last_processed_at = CallbackInbox.objects.filter(processed_at__isnull=False).order_by('-id').values_list('processed_at', flat=True).first()
+    return {
+        'pending': sum(p['pending'] for p in providers.values()),
+        'dead': sum(p['dead'] for p in providers.values()),
+        'lag_seconds': max([p['lag_seconds'] for p in providers.values()], default=0),
+        'last_processed_at': last_processed_at,
+        'providers': providers,
+    }
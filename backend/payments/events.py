@@ -0,0 +1,73 @@
+import json
+import logging
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction as db_transaction
+from redis.exceptions import RedisError
+from utils.redis_client import get_redis
+from .models import Transaction
+from .serializers import TransactionSerializer, MpesaSTKSerializer, PaystackTransactionSerializer
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ['COMPLETED', 'FAILED', 'CANCELLED']
+
+
+def status_channel(reference_code):
+    return f'payments:status:{reference_code}'
+
+
+def status_queryset():
+    """
+    Transactions with everything transaction_status_payload() reads, so a
+    status payload costs one query.
+    """
+    return Transaction.objects.select_related('user', 'mpesa_stk', 'paystack_tx')
+
+
+def transaction_status_payload(transaction):
+    """
+    The transaction plus its provider sub-status (mpesa_status or
+    paystack_status), as returned by the status endpoints and stream.
+    """
+    data = TransactionSerializer(transaction).data
+    if transaction.payment_method == 'MPESA':
+        stk = getattr(transaction, 'mpesa_stk', None)
+        data['mpesa_status'] = MpesaSTKSerializer(stk).data if stk else None
+    elif transaction.payment_method == 'PAYSTACK':
+        paystack = getattr(transaction, 'paystack_tx', None)
+        data['paystack_status'] = PaystackTransactionSerializer(paystack).data if paystack else None
+    return data
+
+
+def publish_transaction_statuses(transactions):
+    """
+    Publishes the current status payload of each transaction to its status
+    channel once the surrounding DB transaction commits. Channels nobody is
+    listening on are skipped before anything is read from the database.
+    """
+    references = {transaction.reference_code for transaction in transactions if transaction.reference_code}
+    if references:
+        db_transaction.on_commit(lambda: _publish(references))
+
+
+def publish_transaction_status(transaction):
+    publish_transaction_statuses([transaction])
+
+
+def _publish(references):
+    try:
+        client = get_redis()
+        subscribers = dict(client.pubsub_numsub(*[status_channel(reference) for reference in references]))
+        listened = [
+            reference for reference in references
+            if subscribers.get(status_channel(reference).encode(), 0) > 0
+        ]
+        if not listened:
+            return
+        pipe = client.pipeline(transaction=False)
+        for transaction in status_queryset().filter(reference_code__in=listened):
+            payload = json.dumps(transaction_status_payload(transaction), cls=DjangoJSONEncoder)
+            pipe.publish(status_channel(transaction.reference_code), payload)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning('Could not publish transaction status: %s', e)
@@ -0,0 +1,97 @@
+from decimal import Decimal
+from django.db import transaction as db_transaction
+from utils.helpers import generate_reference_code
+from .models import LedgerAccount, LedgerEntry
+
+DEFAULT_ACCOUNT = 'MAIN'
+
+
+def append_entries(entries, account=DEFAULT_ACCOUNT):
+    """
+    Appends a batch of ledger entries to an account in one database transaction.
+
+    Each entry is a dict with entry_type, amount and description, and optionally
+    transaction_id and reference. The account row is locked with SELECT ... FOR
+    UPDATE, so concurrent writers queue on it instead of reading the same
+    previous balance. balance_after keeps its meaning: the running total for
+    the entry's type on that account.
+
+    Entries whose reference already exists, or whose transaction already has an
+    entry of the same type, are skipped so retried tasks never double-post.
+    Returns the created LedgerEntry objects.
+    """
+    entries = list(entries)
+    if not entries:
+        return []
+
+    with db_transaction.atomic():
+        LedgerAccount.objects.get_or_create(code=account)
+        ledger_account = LedgerAccount.objects.select_for_update().get(code=account)
+
+        # Checked under the account lock, so two workers cannot both pass.
+        references = [entry['reference'] for entry in entries if entry.get('reference')]
+        transaction_ids = [entry['transaction_id'] for entry in entries if entry.get('transaction_id')]
+        seen_references = set(
+            LedgerEntry.objects.filter(reference__in=references).values_list('reference', flat=True)
+        ) if references else set()
+        seen_transactions = set(
+            LedgerEntry.objects.filter(transaction_id__in=transaction_ids).values_list('transaction_id', 'entry_type')
+        ) if transaction_ids else set()
+
+        rows = []
+        for entry in entries:
+            entry_type = entry['entry_type']
+            reference = entry.get('reference')
+            transaction_id = entry.get('transaction_id')
+            if reference in seen_references or (transaction_id, entry_type) in seen_transactions:
+                continue
+
+            amount = Decimal(str(entry['amount']))
+            if entry_type == 'CREDIT':
+                ledger_account.total_credits += amount
+                balance_after = ledger_account.total_credits
+            elif entry_type == 'DEBIT':
+                ledger_account.total_debits += amount
+                balance_after = ledger_account.total_debits
+            else:
+                raise ValueError(f"Unknown ledger entry type: {entry_type}")
+
+            rows.append(LedgerEntry(
+                account=account,
+                transaction_id=transaction_id,
+                entry_type=entry_type,
+                amount=amount,
+                balance_after=balance_after,
+                description=entry.get('description', ''),
+                reference=reference or generate_reference_code('LE'),
+            ))
+            if reference:
+                seen_references.add(reference)
+            if transaction_id:
+                seen_transactions.add((transaction_id, entry_type))
+
+        if not rows:
+            return []
+
+        LedgerEntry.objects.bulk_create(rows)
+        ledger_account.net_balance = ledger_account.total_credits - ledger_account.total_debits
+        ledger_account.entry_count += len(rows)
+        ledger_account.last_entry_at = rows[-1].created_at
+        ledger_account.save(update_fields=[
+            'total_credits', 'total_debits', 'net_balance', 'entry_count', 'last_entry_at', 'updated_at'
+        ])
+    return rows
+
+
+def append_entry(entry_type, amount, description, transaction_id=None, reference=None, account=DEFAULT_ACCOUNT):
+    """
+    Appends a single entry. Returns the LedgerEntry, or None if it was a duplicate.
+    """
+    rows = append_entries([{
+        'entry_type': entry_type,
+        'amount': amount,
+        'description': description,
+        'transaction_id': transaction_id,
+        'reference': reference,
+    }], account=account)
+    return rows[0] if rows else None
@@ -0,0 +1,101 @@
+import statistics
+import threading
+import time
+from decimal import Decimal
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Sum
+from payments.ledger import append_entries
+from payments.models import LedgerAccount, LedgerEntry
+
+BENCH_ACCOUNT = 'BENCH'
+
+
+class Command(BaseCommand):
+    help = 'Measures ledger append throughput with concurrent writers on a scratch account.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--appends', type=int, default=200, help='Appends per worker')
+        parser.add_argument('--batch-size', type=int, default=1, help='Entries per append call')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark entries afterwards')
+        parser.add_argument('--force', action='store_true', help='Allow running with DEBUG off')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to write benchmark entries with DEBUG off; pass --force.')
+        if connection.vendor == 'sqlite':
+            raise CommandError('SQLite serialises all writers; run this against PostgreSQL.')
+
+        workers, appends, batch_size = options['workers'], options['appends'], options['batch_size']
+        self.cleanup()
+        LedgerAccount.objects.create(code=BENCH_ACCOUNT)
+
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        start_gate = threading.Barrier(workers)
+
+        def worker(worker_id):
+            local = []
+            try:
+                start_gate.wait()
+                for i in range(appends):
+                    entries = [{
+                        'entry_type': 'CREDIT' if (i + j) % 3 else 'DEBIT',
+                        'amount': Decimal('1.00'),
+                        'description': f'benchmark worker {worker_id}',
+                    } for j in range(batch_size)]
+                    started = time.perf_counter()
+                    append_entries(entries, account=BENCH_ACCOUNT)
+                    local.append(time.perf_counter() - started)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+            finally:
+                with lock:
+                    latencies.extend(local)
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        account = LedgerAccount.objects.get(code=BENCH_ACCOUNT)
+        entries = LedgerEntry.objects.filter(account=BENCH_ACCOUNT)
+        credits = entries.filter(entry_type='CREDIT').aggregate(total=Sum('amount'))['total'] or 0
+        debits = entries.filter(entry_type='DEBIT').aggregate(total=Sum('amount'))['total'] or 0
+        # Every running balance must be unique per entry type if appends were serialised.
+        duplicate_balances = entries.count() - entries.values('entry_type', 'balance_after').distinct().count()
+
+        total_entries = len(latencies) * batch_size
+        self.stdout.write(f'Workers: {workers}  Appends: {len(latencies)}  Entries: {total_entries}  Errors: {len(errors)}')
+        self.stdout.write(f'Elapsed: {elapsed:.2f}s  Throughput: {total_entries / elapsed:.1f} entries/s')
+        if latencies:
+            latencies.sort()
+            self.stdout.write(
+                f'Append latency ms  p50={statistics.median(latencies) * 1000:.1f}  '
+                f'p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}  '
+                f'max={latencies[-1] * 1000:.1f}'
+            )
+        consistent = (
+            account.total_credits == credits and account.total_debits == debits
+            and account.entry_count == entries.count() and duplicate_balances == 0
+        )
+        self.stdout.write(f'Account totals consistent: {consistent}')
+        for message in errors[:5]:
+            self.stderr.write(message)
+
+        if not options['keep']:
+            self.cleanup()
+
+    def cleanup(self):
+        # LedgerEntry refuses ORM deletes, so scratch rows are removed with SQL.
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {LedgerEntry._meta.db_table} WHERE account = %s', [BENCH_ACCOUNT])
+            cursor.execute(f'DELETE FROM {LedgerAccount._meta.db_table} WHERE code = %s', [BENCH_ACCOUNT])
@@ -0,0 +1,79 @@
+import json
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from utils.loadtest import SCENARIOS, LoadTest, format_report
+from utils.simulators import STATS_PATH
+
+
+class Command(BaseCommand):
+    help = (
+        'Drives the payment flow end to end against a running server (initiate, provider callback, ledger, '
+        'receipt, email) at a fixed arrival rate and reports latency percentiles per step, task-queue lag '
+        'and broker queue depth. Run the server and workers against manage.py simulate_providers and '
+        'seed users with manage.py seed_portal first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the app')
+        parser.add_argument('--scenario', choices=SCENARIOS, default='mixed')
+        parser.add_argument('--rate', type=float, default=5, help='Iterations started per second')
+        parser.add_argument('--duration', type=float, default=60, help='Seconds to keep starting iterations')
+        parser.add_argument('--concurrency', type=int, default=100, help='Most iterations in flight at once')
+        parser.add_argument('--users', type=int, default=20, help='Seeded STAFF users to spread payments over')
+        parser.add_argument('--password', default='portal-seed', help='Password of the seeded users')
+        parser.add_argument('--admin', help='ADMIN username for payouts (default the first seeded admin)')
+        parser.add_argument('--admin-password', help='Password of --admin (default --password)')
+        parser.add_argument('--settle-timeout', type=float, default=60, help='Seconds to wait for each stage')
+        parser.add_argument('--no-receipts', action='store_true', help='Stop once the ledger entry is written')
+        parser.add_argument('--email', action='store_true', help='Also email each receipt')
+        parser.add_argument('--simulator-url', help='Base URL of a simulator, to include its counters')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+        parser.add_argument('--force', action='store_true', help='Allow running with DEBUG off')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to create load-test payments with DEBUG off; pass --force.')
+        if options['rate'] <= 0 or options['duration'] <= 0:
+            raise CommandError('--rate and --duration must be positive.')
+
+        User = get_user_model()
+        staff = list(User.objects.filter(
+            username__startswith='seed-staff-', role='STAFF', is_active=True
+        ).order_by('username').values_list('username', flat=True)[:options['users']])
+        if not staff and options['scenario'] != 'payout':
+            raise CommandError('No seeded STAFF users; run manage.py seed_portal first.')
+        admin = None
+        if options['scenario'] == 'payout':
+            username = options['admin'] or User.objects.filter(
+                username__startswith='seed-admin-', role='ADMIN', is_active=True
+            ).order_by('username').values_list('username', flat=True).first()
+            if not username:
+                raise CommandError('No ADMIN user for payouts; pass --admin or run manage.py seed_portal.')
+            admin = (username, options['admin_password'] or options['password'])
+
+        test = LoadTest(
+            options['url'], options['scenario'], options['rate'], options['duration'],
+            users=[(username, options['password']) for username in staff], admin=admin,
+            concurrency=options['concurrency'], settle_timeout=options['settle_timeout'],
+            receipts=not options['no_receipts'], email=options['email'], seed=options['seed'],
+        )
+        try:
+            report = test.run(progress=self.stderr.write)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        if options['simulator_url']:
+            try:
+                report['simulators'] = requests.get(
+                    options['simulator_url'].rstrip('/') + STATS_PATH, timeout=10
+                ).json()
+            except (requests.RequestException, ValueError) as e:
+                self.stderr.write(f'Could not read simulator counters: {e}')
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+        else:
+            self.stdout.write(format_report(report))
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from payments.models import CallbackInbox
+from payments.callbacks import inbox_stats
+from payments.tasks import process_callback_inbox
+
+
+class Command(BaseCommand):
+    help = 'Re-queues stored provider callbacks for the inbox consumer, or reports inbox lag.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--id', type=int, action='append', dest='ids', help='Inbox row id (repeatable)')
+        parser.add_argument('--provider', choices=[choice[0] for choice in CallbackInbox.PROVIDER_CHOICES])
+        parser.add_argument('--external-id', help='CheckoutRequestID, Paystack reference or OriginatorConversationID')
+        parser.add_argument('--since', help='Only rows received at or after this ISO datetime')
+        parser.add_argument('--until', help='Only rows received before this ISO datetime')
+        parser.add_argument('--dead', action='store_true', help='Only rows that exhausted their retries')
+        parser.add_argument('--now', action='store_true', help='Drain the inbox in this process instead of waiting for beat')
+        parser.add_argument('--stats', action='store_true', help='Print inbox lag and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats()
+            return
+
+        queryset = CallbackInbox.objects.all()
+        if options['ids']:
+            queryset = queryset.filter(id__in=options['ids'])
+        if options['provider']:
+            queryset = queryset.filter(provider=options['provider'])
+        if options['external_id']:
+            queryset = queryset.filter(external_id=options['external_id'])
+        for option, lookup in (('since', 'received_at__gte'), ('until', 'received_at__lt')):
+            if options[option]:
+                value = parse_datetime(options[option])
+                if value is None:
+                    raise CommandError(f'--{option} must be an ISO datetime')
+                queryset = queryset.filter(**{lookup: value})
+        if options['dead']:
+            queryset = queryset.filter(processed_at__isnull=True, last_error__isnull=False)
+
+        if not any(options[key] for key in ('ids', 'provider', 'external_id', 'since', 'until', 'dead')):
+            raise CommandError('Refusing to replay the whole inbox; pass at least one filter.')
+
+        requeued = queryset.update(processed_at=None, attempts=0, last_error=None)
+        self.stdout.write(f'Re-queued {requeued} callback(s).')
+
+        if options['now']:
+            while True:
+                result = process_callback_inbox()
+                self.stdout.write(f"Processed {result['processed']}, failed {result['failed']}")
+                # Stop once a batch makes no progress; failures are retried by beat.
+                if not result['processed']:
+                    break
+
+        self.print_stats()
+
+    def print_stats(self):
+        stats = inbox_stats()
+        self.stdout.write(
+            f"Pending: {stats['pending']}  Dead: {stats['dead']}  "
+            f"Lag: {stats['lag_seconds']}s  Last processed: {stats['last_processed_at']}"
+        )
+        for provider, row in sorted(stats['providers'].items()):
+            self.stdout.write(f"  {provider}: pending={row['pending']} dead={row['dead']} lag={row['lag_seconds']}s")
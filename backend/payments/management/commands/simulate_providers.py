@@ -0,0 +1,74 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from utils.simulators import Behaviour, STATS_PATH, parse_behaviour, start_simulators
+
+SIMULATORS = ('daraja', 'paystack', 'smtp')
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs local Daraja, Paystack and SMTP simulators for load tests until interrupted, and prints the '
+        'environment that points the app at them. Behaviour settings: ' + ', '.join(Behaviour._fields) + '.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--app-url', default='http://127.0.0.1:8000', help='Where callbacks and webhooks go')
+        for name, port in zip(SIMULATORS, (8701, 8702, 8725)):
+            parser.add_argument(f'--{name}-port', type=int, default=port)
+            parser.add_argument(
+                f'--{name}', default='', metavar='SETTINGS', help=f'{name} behaviour, e.g. latency_ms=300,error_rate=0.05'
+            )
+        parser.add_argument('--behaviour', default='', metavar='SETTINGS', help='Behaviour applied to all three')
+        parser.add_argument('--seed', type=int, help='Random seed for repeatable runs')
+
+    def handle(self, *args, **options):
+        try:
+            shared = parse_behaviour(options['behaviour'])
+            behaviours = {name: parse_behaviour(options[name], shared) for name in SIMULATORS}
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        app_url = options['app_url'].rstrip('/')
+        paystack_secret = settings.PAYSTACK_SECRET_KEY or 'sk_test_simulator'
+        simulators = start_simulators(
+            host=options['host'],
+            ports={name: options[f'{name}_port'] for name in SIMULATORS},
+            behaviours=behaviours,
+            webhook_url=f'{app_url}/api/payments/paystack/webhook/',
+            paystack_secret=paystack_secret,
+            seed=options['seed'],
+        )
+        urls = {name: url for name, (_, url) in simulators.items()}
+        smtp_host, smtp_port = urls['smtp'].rsplit('//', 1)[1].rsplit(':', 1)
+
+        for name in SIMULATORS:
+            self.stdout.write(f'{name:<9} {urls[name]}  {behaviours[name]}')
+        self.stdout.write('\nStart the web server and Celery workers with:\n')
+        for line in (
+            f'MPESA_BASE_URL={urls["daraja"]}',
+            f'MPESA_SHORTCODE={settings.MPESA_SHORTCODE or "174379"}',
+            f'MPESA_CALLBACK_URL={app_url}/api/payments/mpesa/callback/',
+            f'MPESA_B2C_RESULT_URL={app_url}/api/payouts/mpesa/b2c/result/',
+            f'MPESA_B2C_TIMEOUT_URL={app_url}/api/payouts/mpesa/b2c/timeout/',
+            f'MPESA_B2C_STATUS_RESULT_URL={app_url}/api/payouts/mpesa/b2c/status/result/',
+            f'PAYSTACK_BASE_URL={urls["paystack"]}',
+            f'PAYSTACK_SECRET_KEY={paystack_secret}',
+            f'EMAIL_HOST={smtp_host}',
+            f'EMAIL_PORT={smtp_port}',
+            'EMAIL_USE_TLS=False',
+            'EMAIL_USE_SSL=False',
+        ):
+            self.stdout.write(f'  export {line}')
+        self.stdout.write(f'\nCounters: {urls["daraja"]}{STATS_PATH}. Ctrl-C to stop.')
+
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for simulator, _ in simulators.values():
+                simulator.stop()
+            simulators['daraja'][0].dispatcher.stop()
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from django.db.models import Count, Max, Q, Sum
+from payments.models import LedgerAccount, LedgerEntry
+
+
+class Command(BaseCommand):
+    help = 'Checks LedgerAccount running totals against a full recomputation from LedgerEntry.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', help='Only check this account code')
+        parser.add_argument('--fix', action='store_true', help='Overwrite drifted totals with the recomputed values')
+
+    def handle(self, *args, **options):
+        entries = LedgerEntry.objects.all()
+        if options['account']:
+            entries = entries.filter(account=options['account'])
+
+        recomputed = {
+            row['account']: row for row in entries.values('account').annotate(
+                credits=Sum('amount', filter=Q(entry_type='CREDIT')),
+                debits=Sum('amount', filter=Q(entry_type='DEBIT')),
+                entry_count=Count('id'),
+                last_entry_at=Max('created_at'),
+            )
+        }
+        codes = set(recomputed)
+        accounts = LedgerAccount.objects.all()
+        if options['account']:
+            accounts = accounts.filter(code=options['account'])
+        codes.update(accounts.values_list('code', flat=True))
+
+        drifted = 0
+        for code in sorted(codes):
+            row = recomputed.get(code, {})
+            expected = {
+                'total_credits': row.get('credits') or 0,
+                'total_debits': row.get('debits') or 0,
+                'entry_count': row.get('entry_count') or 0,
+                'last_entry_at': row.get('last_entry_at'),
+            }
+            expected['net_balance'] = expected['total_credits'] - expected['total_debits']
+
+            account = LedgerAccount.objects.filter(code=code).first()
+            actual = {field: getattr(account, field) if account else None for field in expected}
+            mismatches = [field for field in expected if actual[field] != expected[field]]
+            if not mismatches:
+                self.stdout.write(f'{code}: OK ({expected["entry_count"]} entries, net {expected["net_balance"]})')
+                continue
+
+            drifted += 1
+            for field in mismatches:
+                self.stdout.write(f'{code}: {field} is {actual[field]}, recomputed {expected[field]}')
+            if options['fix']:
+                self.fix(code, entries.filter(account=code))
+
+        if drifted and not options['fix']:
+            raise CommandError(f'{drifted} account(s) drifted from the ledger; rerun with --fix to repair.')
+
+    def fix(self, code, entries):
+        # Recompute under the account lock so no append lands between the
+        # aggregate and the update.
+        with db_transaction.atomic():
+            LedgerAccount.objects.get_or_create(code=code)
+            account = LedgerAccount.objects.select_for_update().get(code=code)
+            totals = entries.aggregate(
+                credits=Sum('amount', filter=Q(entry_type='CREDIT')),
+                debits=Sum('amount', filter=Q(entry_type='DEBIT')),
+                entry_count=Count('id'),
+                last_entry_at=Max('created_at'),
+            )
+            account.total_credits = totals['credits'] or 0
+            account.total_debits = totals['debits'] or 0
+            account.net_balance = account.total_credits - account.total_debits
+            account.entry_count = totals['entry_count']
+            account.last_entry_at = totals['last_entry_at']
+            account.save()
+        self.stdout.write(f'{code}: repaired')
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-17 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallbackInbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('MPESA_STK', 'Mpesa STK'), ('PAYSTACK', 'Paystack'), ('MPESA_B2C_RESULT', 'Mpesa B2C Result'), ('MPESA_B2C_TIMEOUT', 'Mpesa B2C Timeout')], max_length=30)),
+                ('external_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='callback_inbox_pending_idx'), models.Index(fields=['provider', 'external_id'], name='payments_ca_provide_1ef180_idx'), models.Index(fields=['received_at'], name='payments_ca_receive_15abf0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.11 on 2026-10-17 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_callbackinbox'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='callbackinbox',
+            name='payments_ca_provide_1ef180_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='callbackinbox',
+            constraint=models.UniqueConstraint(condition=models.Q(('external_id__isnull', False)), fields=('provider', 'external_id'), name='callback_inbox_unique_event'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.11 on 2026-10-17 01:14
+
+from django.db import migrations, models
+from django.db.models import Max, Q, Sum
+
+
+def backfill_main_account(apps, schema_editor):
+    LedgerEntry = apps.get_model('payments', 'LedgerEntry')
+    LedgerAccount = apps.get_model('payments', 'LedgerAccount')
+    totals = LedgerEntry.objects.aggregate(
+        credits=Sum('amount', filter=Q(entry_type='CREDIT')),
+        debits=Sum('amount', filter=Q(entry_type='DEBIT')),
+        last_entry_at=Max('created_at'),
+    )
+    credits = totals['credits'] or 0
+    debits = totals['debits'] or 0
+    LedgerAccount.objects.update_or_create(code='MAIN', defaults={
+        'total_credits': credits,
+        'total_debits': debits,
+        'net_balance': credits - debits,
+        'entry_count': LedgerEntry.objects.count(),
+        'last_entry_at': totals['last_entry_at'],
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_callbackinbox_unique_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=30, unique=True)),
+                ('total_credits', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_debits', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('net_balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('last_entry_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ledgerentry',
+            name='account',
+            field=models.CharField(default='MAIN', max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['entry_type', 'created_at'], name='payments_le_entry_t_f71668_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['account', 'created_at'], name='payments_le_account_cef3e5_idx'),
+        ),
+        migrations.RunPython(backfill_main_account, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.11 on 2026-10-17 01:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_ledgeraccount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('transactions_checked', models.PositiveIntegerField(default=0)),
+                ('payouts_checked', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('expired', models.PositiveIntegerField(default=0)),
+                ('unresolved', models.PositiveIntegerField(default=0)),
+                ('status_queries', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('details', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='callbackinbox',
+            name='provider',
+            field=models.CharField(choices=[('MPESA_STK', 'Mpesa STK'), ('PAYSTACK', 'Paystack'), ('MPESA_B2C_RESULT', 'Mpesa B2C Result'), ('MPESA_B2C_TIMEOUT', 'Mpesa B2C Timeout'), ('MPESA_B2C_STATUS', 'Mpesa B2C Status Result')], max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['created_at'], name='transaction_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reconciliationrun',
+            index=models.Index(fields=['started_at'], name='payments_re_started_e74ddc_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.11 on 2026-10-17 02:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_brin_timestamp_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_pending_idx',
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='last_reconciled_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(models.OrderBy(models.F('last_reconciled_at'), nulls_first=True), models.F('created_at'), condition=models.Q(('status', 'PENDING')), name='transaction_pending_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
@@ -30,6 +31,8 @@ class Transaction(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     failed_reason = models.TextField(blank=True, null=True)
+    # When the reconciliation sweeper last asked the provider about it.
+    last_reconciled_at = models.DateTimeField(null=True, blank=True, editable=False)
     is_immutable = models.BooleanField(default=True, editable=False)
 
     class Meta:
@@ -39,6 +42,16 @@ class Transaction(models.Model):
             models.Index(fields=['user', 'status']),
             models.Index(fields=['created_at']),
             models.Index(fields=['status']),
+            # Reconciliation sweeps only look at the (small) PENDING set,
+            # never-checked rows first, then the least recently checked.
+            models.Index(
+                models.F('last_reconciled_at').asc(nulls_first=True), 'created_at',
+                name='transaction_pending_idx', condition=models.Q(status='PENDING'),
+            ),
+            models.Index(fields=['user', 'created_at']),
+            # Rows arrive in created_at order, so a BRIN index covers report
+            # date ranges at a fraction of the btree's size.
+            BrinIndex(fields=['created_at'], name='transaction_created_brin', autosummarize=True),
         ]
 
     def __str__(self):
@@ -119,6 +132,7 @@ class LedgerEntry(models.Model):
     )
 
     transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='ledger_entries', null=True, blank=True)
+    account = models.CharField(max_length=30, default='MAIN')
     entry_type = models.CharField(max_length=10, choices=ENTRY_TYPE_CHOICES)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     balance_after = models.DecimalField(max_digits=12, decimal_places=2, default=0)
@@ -132,6 +146,9 @@ class LedgerEntry(models.Model):
         indexes = [
             models.Index(fields=['created_at']),
             models.Index(fields=['entry_type']),
+            models.Index(fields=['entry_type', 'created_at']),
+            models.Index(fields=['account', 'created_at']),
+            BrinIndex(fields=['created_at'], name='ledger_entry_created_brin', autosummarize=True),
         ]
 
     def __str__(self):
@@ -146,4 +163,90 @@ class LedgerEntry(models.Model):
         raise ValueError("LedgerEntry records are immutable and cannot be deleted.")
 
     def update(self, *args, **kwargs):
-        raise ValueError("LedgerEntry records are immutable and cannot be updated.")
\ No newline at end of file
+        raise ValueError("LedgerEntry records are immutable and cannot be updated.")
+
+class LedgerAccount(models.Model):
+    """
+    Running totals for a ledger account. Appends lock this row, so it is
+    also the serialisation point for concurrent ledger writers.
+    """
+    code = models.CharField(max_length=30, unique=True)
+    total_credits = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_debits = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    net_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    last_entry_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['code']
+
+    def __str__(self):
+        return f"{self.code} - {self.net_balance}"
+
+
+class CallbackInbox(models.Model):
+    """
+    Append-only record of raw provider callbacks. Webhook views only insert
+    here; process_callback_inbox applies the state changes in batches.
+    """
+    PROVIDER_CHOICES = (
+        ('MPESA_STK', 'Mpesa STK'),
+        ('PAYSTACK', 'Paystack'),
+        ('MPESA_B2C_RESULT', 'Mpesa B2C Result'),
+        ('MPESA_B2C_TIMEOUT', 'Mpesa B2C Timeout'),
+        ('MPESA_B2C_STATUS', 'Mpesa B2C Status Result'),
+    )
+
+    provider = models.CharField(max_length=30, choices=PROVIDER_CHOICES)
+    external_id = models.CharField(max_length=100, blank=True, null=True)
+    payload = models.JSONField(default=dict)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['id'], name='callback_inbox_pending_idx', condition=models.Q(processed_at__isnull=True)),
+            models.Index(fields=['received_at']),
+        ]
+        constraints = [
+            # Backstop for the Redis de-duplication key: one row per provider event.
+            models.UniqueConstraint(
+                fields=['provider', 'external_id'],
+                condition=models.Q(external_id__isnull=False),
+                name='callback_inbox_unique_event',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} - {self.external_id} - {self.received_at}"
+
+
+class ReconciliationRun(models.Model):
+    """
+    One sweep of the reconciliation engine over stale transactions and payouts.
+    """
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(default=0)
+    transactions_checked = models.PositiveIntegerField(default=0)
+    payouts_checked = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    expired = models.PositiveIntegerField(default=0)
+    unresolved = models.PositiveIntegerField(default=0)
+    status_queries = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    details = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['started_at']),
+        ]
+
+    def __str__(self):
+        return f"Reconciliation {self.started_at} - {self.completed + self.failed + self.expired} resolved"
@@ -0,0 +1,181 @@
+import base64
+import os
+import requests
+from datetime import datetime
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from utils.redis_client import get_redis
+
+TOKEN_CACHE_KEY = 'mpesa:access_token'
+TOKEN_LOCK_KEY = 'mpesa:access_token:lock'
+
+
+class MpesaError(Exception):
+    pass
+
+
+class MpesaClient:
+    """
+    Thin Daraja API client shared by STK push, STK query and B2C tasks.
+
+    - The OAuth token is cached in Redis until shortly before it expires, and
+      refreshed under a Redis lock so only one worker hits /oauth at a time.
+    - HTTP calls go through a keep-alive requests.Session owned by this process.
+    """
+
+    def __init__(self):
+        self.base_url = settings.MPESA_BASE_URL or settings.MPESA_BASE_URLS.get(
+            settings.MPESA_ENVIRONMENT, settings.MPESA_BASE_URLS['sandbox']
+        )
+        self.timeout = (settings.MPESA_CONNECT_TIMEOUT, settings.MPESA_READ_TIMEOUT)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.MPESA_HTTP_POOL_SIZE,
+            pool_maxsize=settings.MPESA_HTTP_POOL_SIZE,
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get_access_token(self, force_refresh=False):
+        """
+        Returns a valid OAuth access token, fetching a new one only when the
+        cached token is missing or about to expire.
+        """
+        redis_client = get_redis()
+        if not force_refresh:
+            token = redis_client.get(TOKEN_CACHE_KEY)
+            if token:
+                return token.decode()
+
+        with redis_client.lock(TOKEN_LOCK_KEY, timeout=30, blocking_timeout=15):
+            # Another worker may have refreshed the token while we waited.
+            token = redis_client.get(TOKEN_CACHE_KEY)
+            if token and not force_refresh:
+                return token.decode()
+
+            credentials = f"{settings.MPESA_CONSUMER_KEY}:{settings.MPESA_CONSUMER_SECRET}"
+            encoded_credentials = base64.b64encode(credentials.encode()).decode()
+            response = self.session.get(
+                f'{self.base_url}/oauth/v1/generate',
+                params={'grant_type': 'client_credentials'},
+                headers={'Authorization': f'Basic {encoded_credentials}'},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            data = response.json()
+            token = data.get('access_token')
+            if not token:
+                raise MpesaError(f"Mpesa OAuth response missing access_token: {data}")
+
+            expires_in = int(data.get('expires_in', 3599))
+            ttl = max(expires_in - settings.MPESA_TOKEN_EXPIRY_MARGIN, 60)
+            redis_client.set(TOKEN_CACHE_KEY, token, ex=ttl)
+            return token
+
+    def invalidate_token(self):
+        get_redis().delete(TOKEN_CACHE_KEY)
+
+    def post(self, path, payload):
+        """
+        POSTs a JSON payload to Daraja. A 401 means our cached token was
+        revoked early, so it is dropped and the call retried once.
+        """
+        response = self._post(path, payload, self.get_access_token())
+        if response.status_code == 401:
+            self.invalidate_token()
+            response = self._post(path, payload, self.get_access_token(force_refresh=True))
+        return response.json()
+
+    def _post(self, path, payload, token):
+        return self.session.post(
+            f'{self.base_url}{path}',
+            json=payload,
+            headers={
+                'Authorization': f'Bearer {token}',
+                'Content-Type': 'application/json',
+            },
+            timeout=self.timeout,
+        )
+
+    def stk_password(self):
+        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        password = base64.b64encode(
+            f"{settings.MPESA_SHORTCODE}{settings.MPESA_PASSKEY}{timestamp}".encode()
+        ).decode()
+        return password, timestamp
+
+    def stk_push(self, phone_number, amount, account_reference, description='Payment for Portal'):
+        password, timestamp = self.stk_password()
+        return self.post('/mpesa/stkpush/v1/processrequest', {
+            "BusinessShortCode": settings.MPESA_SHORTCODE,
+            "Password": password,
+            "Timestamp": timestamp,
+            "TransactionType": "CustomerPayBillOnline",
+            "Amount": int(amount),
+            "PartyA": phone_number,
+            "PartyB": settings.MPESA_SHORTCODE,
+            "PhoneNumber": phone_number,
+            "CallBackURL": settings.MPESA_CALLBACK_URL,
+            "AccountReference": account_reference,
+            "TransactionDesc": description
+        })
+
+    def stk_query(self, checkout_request_id):
+        password, timestamp = self.stk_password()
+        return self.post('/mpesa/stkpushquery/v1/query', {
+            "BusinessShortCode": settings.MPESA_SHORTCODE,
+            "Password": password,
+            "Timestamp": timestamp,
+            "CheckoutRequestID": checkout_request_id
+        })
+
+    def b2c_payment(self, phone_number, amount, remarks, occasion='Payout', command_id='SalaryPayment'):
+        return self.post('/mpesa/b2c/v1/paymentrequest', {
+            "ShortCode": settings.MPESA_B2C_SHORTCODE,
+            "CommandID": command_id,
+            "Amount": int(amount),
+            "PartyA": settings.MPESA_B2C_SHORTCODE,
+            "PartyB": phone_number,
+            "Remarks": remarks,
+            "QueueTimeOutURL": settings.MPESA_B2C_TIMEOUT_URL,
+            "ResultURL": settings.MPESA_B2C_RESULT_URL,
+            "Occasion": occasion,
+            "SecurityCredential": settings.MPESA_B2C_SECURITY_CREDENTIAL,
+            "InitiatorName": settings.MPESA_B2C_INITIATOR_NAME
+        })
+
+    def transaction_status(self, originator_conversation_id, occasion, transaction_id=''):
+        """
+        Asks Daraja for the outcome of a B2C payment. The answer is delivered
+        asynchronously to MPESA_B2C_STATUS_RESULT_URL; `occasion` is echoed
+        back in ReferenceData so the result can be matched to the payout.
+        """
+        return self.post('/mpesa/transactionstatus/v1/query', {
+            "Initiator": settings.MPESA_B2C_INITIATOR_NAME,
+            "SecurityCredential": settings.MPESA_B2C_SECURITY_CREDENTIAL,
+            "CommandID": "TransactionStatusQuery",
+            "TransactionID": transaction_id,
+            "OriginatorConversationID": originator_conversation_id,
+            "PartyA": settings.MPESA_B2C_SHORTCODE,
+            "IdentifierType": "4",
+            "ResultURL": settings.MPESA_B2C_STATUS_RESULT_URL,
+            "QueueTimeOutURL": settings.MPESA_B2C_TIMEOUT_URL,
+            "Remarks": "Payout reconciliation",
+            "Occasion": occasion
+        })
+
+
+_clients = {}
+
+def get_mpesa_client():
+    """
+    Returns the MpesaClient for the current process, so every task in a
+    worker reuses the same pooled HTTPS connections.
+    """
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is None:
+        client = MpesaClient()
+        _clients.clear()
+        _clients[pid] = client
+    return client
@@ -0,0 +1,54 @@
+import os
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class PaystackClient:
+    """
+    Paystack API client with a keep-alive session, shared by the payment
+    tasks and the reconciliation sweeper.
+    """
+
+    def __init__(self):
+        self.base_url = settings.PAYSTACK_BASE_URL
+        self.timeout = settings.PAYSTACK_TIMEOUT
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.PAYSTACK_HTTP_POOL_SIZE,
+            pool_maxsize=settings.PAYSTACK_HTTP_POOL_SIZE,
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}',
+            'Content-Type': 'application/json',
+        })
+
+    def initialize(self, email, amount, reference, metadata=None):
+        response = self.session.post(f'{self.base_url}/transaction/initialize', json={
+            'email': email,
+            'amount': int(amount) * 100,  # Paystack expects amount in kobo
+            'reference': reference,
+            'metadata': metadata or {},
+        }, timeout=self.timeout)
+        return response.json()
+
+    def verify(self, reference):
+        response = self.session.get(f'{self.base_url}/transaction/verify/{reference}', timeout=self.timeout)
+        return response.json()
+
+
+_clients = {}
+
+def get_paystack_client():
+    """
+    Returns the PaystackClient for the current process.
+    """
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is None:
+        client = PaystackClient()
+        _clients.clear()
+        _clients[pid] = client
+    return client
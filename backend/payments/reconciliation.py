@@ -0,0 +1,291 @@
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+from audit.buffer import record_action
+from utils.cache import invalidate_cache
+from utils.summary import invalidate_summary
+from payouts.models import Payout
+from reports.performance import mark_dirty
+from .events import publish_transaction_statuses
+from .ledger import append_entries
+from .models import Transaction, MpesaSTKRequest, PaystackTransaction, ReconciliationRun
+from .mpesa import get_mpesa_client
+from .paystack import get_paystack_client
+
+logger = logging.getLogger(__name__)
+
+PAYSTACK_FAILED_STATUSES = ['failed', 'reversed']
+
+
+class RateLimiter:
+    """
+    Spaces calls to one provider at most `rate` per second across all
+    sweeper threads.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            slot = max(self.next_slot, time.monotonic())
+            self.next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def check_stk(stk_request, expired):
+    """
+    STK query: ResultCode 0 is a completed payment, any other ResultCode is a
+    final failure (cancelled, timed out, wrong PIN...). A response without a
+    ResultCode means Daraja is still processing it.
+    """
+    response = get_mpesa_client().stk_query(stk_request.checkout_request_id)
+    result_code = response.get('ResultCode')
+    if result_code is None:
+        return None, None, response
+    if str(result_code) == '0':
+        return 'COMPLETED', None, response
+    return 'FAILED', response.get('ResultDesc'), response
+
+
+def check_paystack(paystack_tx, expired):
+    """
+    Paystack verify: 'abandoned' only becomes a failure once the transaction
+    is past the expiry window, since the customer may still complete checkout.
+    """
+    response = get_paystack_client().verify(paystack_tx.reference)
+    if not response.get('status'):
+        return None, None, response
+    data = response.get('data', {})
+    status = data.get('status')
+    if status == 'success':
+        return 'COMPLETED', None, data
+    if status in PAYSTACK_FAILED_STATUSES or (status == 'abandoned' and expired):
+        return 'FAILED', data.get('gateway_response') or f'Paystack transaction {status}', data
+    return None, None, data
+
+
+def query_b2c_status(payout):
+    """
+    Daraja answers B2C status queries asynchronously (see
+    payouts.callbacks.apply_b2c_status_result), so this only reports whether
+    the query was accepted.
+    """
+    response = get_mpesa_client().transaction_status(
+        payout.b2c_request.originator_conversation_id, payout.reference_code
+    )
+    if str(response.get('ResponseCode')) != '0':
+        raise ValueError(response.get('errorMessage') or response.get('ResponseDescription') or 'Status query rejected')
+    return response
+
+
+def sweep_lock_timeout(batch_size=None):
+    """
+    Seconds a sweep may hold its lock: the time the rate limits need for a
+    full batch of provider calls (STK queries and B2C status queries share
+    the M-Pesa limit), plus one provider timeout for the calls still in
+    flight. Calls that run into timeouts can still outlast it; the writes
+    re-check status under row locks, so an overlapping sweep is harmless.
+    """
+    batch_size = batch_size or settings.RECONCILIATION_BATCH_SIZE
+    calls = {'MPESA': 2 * batch_size, 'PAYSTACK': batch_size}
+    rates = settings.RECONCILIATION_RATE_LIMITS
+    rate_limited = max((calls[provider] / rates[provider] for provider in calls if rates.get(provider, 0) > 0), default=0)
+    slowest_call = max(settings.MPESA_CONNECT_TIMEOUT + settings.MPESA_READ_TIMEOUT, settings.PAYSTACK_TIMEOUT)
+    return math.ceil(rate_limited + slowest_call)
+
+
+def run_reconciliation(batch_size=None):
+    """
+    Sweeps transactions stuck in PENDING and payouts stuck in PROCESSING.
+
+    Stale rows are read through partial indexes, never-checked rows first and
+    then the least recently checked (last_reconciled_at), so rows the
+    providers cannot resolve yet do not starve newer ones. Provider status
+    calls run on a thread pool under per-provider rate limits, and the
+    resolved transactions are written back in one bulk update together with
+    their ledger credits. Every run is recorded as a ReconciliationRun.
+    """
+    batch_size = batch_size or settings.RECONCILIATION_BATCH_SIZE
+    started_at = timezone.now()
+    started = time.perf_counter()
+    stale_before = started_at - timedelta(seconds=settings.RECONCILIATION_MIN_AGE_SECONDS)
+    expire_before = started_at - timedelta(seconds=settings.RECONCILIATION_EXPIRE_AFTER_SECONDS)
+
+    sweep_order = (F('last_reconciled_at').asc(nulls_first=True), 'created_at')
+    transactions = list(
+        Transaction.objects.filter(status='PENDING', created_at__lt=stale_before)
+        .select_related('mpesa_stk', 'paystack_tx').order_by(*sweep_order)[:batch_size]
+    )
+    payouts = list(
+        Payout.objects.filter(status='PROCESSING', created_at__lt=stale_before)
+        .select_related('b2c_request').order_by(*sweep_order)[:batch_size]
+    )
+
+    details = {
+        provider: {'checked': 0, 'completed': 0, 'failed': 0, 'unresolved': 0, 'errors': 0}
+        for provider in ('MPESA', 'PAYSTACK')
+    }
+    details['B2C'] = {'checked': 0, 'status_queries': 0, 'errors': 0}
+    outcomes = {}
+    expired_ids = set()
+    jobs = []
+
+    for transaction in transactions:
+        is_expired = transaction.created_at < expire_before
+        stk_request = getattr(transaction, 'mpesa_stk', None) if transaction.payment_method == 'MPESA' else None
+        paystack_tx = getattr(transaction, 'paystack_tx', None) if transaction.payment_method == 'PAYSTACK' else None
+        if stk_request and stk_request.checkout_request_id:
+            jobs.append(('MPESA', transaction, check_stk, stk_request, is_expired))
+        elif paystack_tx:
+            jobs.append(('PAYSTACK', transaction, check_paystack, paystack_tx, is_expired))
+        elif is_expired:
+            # The provider never acknowledged the request, so there is nothing to ask.
+            outcomes[transaction.id] = ('FAILED', 'Expired before the provider accepted the request', None)
+            expired_ids.add(transaction.id)
+
+    payout_jobs = [payout for payout in payouts if getattr(payout, 'b2c_request', None) and payout.b2c_request.originator_conversation_id]
+
+    limiters = {provider: RateLimiter(rate) for provider, rate in settings.RECONCILIATION_RATE_LIMITS.items()}
+
+    def run_job(job):
+        provider, transaction, check, provider_row, is_expired = job
+        limiters[provider].wait()
+        return check(provider_row, is_expired)
+
+    def run_payout_job(payout):
+        limiters['MPESA'].wait()
+        return query_b2c_status(payout)
+
+    with ThreadPoolExecutor(max_workers=settings.RECONCILIATION_WORKERS) as executor:
+        futures = [(job, executor.submit(run_job, job)) for job in jobs]
+        payout_futures = [(payout, executor.submit(run_payout_job, payout)) for payout in payout_jobs]
+
+        for (provider, transaction, _, _, _), future in futures:
+            details[provider]['checked'] += 1
+            try:
+                status, reason, data = future.result()
+            except Exception as e:
+                details[provider]['errors'] += 1
+                logger.warning('Reconciliation check failed for %s: %s', transaction.reference_code, e)
+                continue
+            if status is None:
+                details[provider]['unresolved'] += 1
+            else:
+                outcomes[transaction.id] = (status, reason, data)
+
+        for payout, future in payout_futures:
+            details['B2C']['checked'] += 1
+            try:
+                future.result()
+                details['B2C']['status_queries'] += 1
+            except Exception as e:
+                details['B2C']['errors'] += 1
+                logger.warning('B2C status query failed for %s: %s', payout.reference_code, e)
+
+    # update() leaves updated_at and the post_save handlers alone.
+    Transaction.objects.filter(id__in=[transaction.id for transaction in transactions]).update(last_reconciled_at=started_at)
+    Payout.objects.filter(id__in=[payout.id for payout in payouts]).update(last_reconciled_at=started_at)
+
+    completed, failed = apply_transaction_outcomes(outcomes)
+    expired = [transaction for transaction in failed if transaction.id in expired_ids]
+    for transaction in completed + failed:
+        if transaction.id not in expired_ids:
+            details[transaction.payment_method]['completed' if transaction.status == 'COMPLETED' else 'failed'] += 1
+
+    run = ReconciliationRun.objects.create(
+        started_at=started_at,
+        finished_at=timezone.now(),
+        duration_ms=int((time.perf_counter() - started) * 1000),
+        transactions_checked=len(transactions),
+        payouts_checked=len(payouts),
+        completed=len(completed),
+        failed=len(failed) - len(expired),
+        expired=len(expired),
+        unresolved=details['MPESA']['unresolved'] + details['PAYSTACK']['unresolved'],
+        status_queries=details['B2C']['status_queries'],
+        errors=details['MPESA']['errors'] + details['PAYSTACK']['errors'] + details['B2C']['errors'],
+        details=details,
+    )
+    return run
+
+
+def apply_transaction_outcomes(outcomes):
+    """
+    Writes reconciliation outcomes in bulk. Rows are re-read under
+    SELECT ... FOR UPDATE with status PENDING, so anything a callback settled
+    during the sweep is left alone and never credited twice.
+    """
+    if not outcomes:
+        return [], []
+
+    now = timezone.now()
+    with db_transaction.atomic():
+        transactions = list(
+            Transaction.objects.select_for_update().filter(id__in=list(outcomes), status='PENDING')
+        )
+        for transaction in transactions:
+            status, reason, data = outcomes[transaction.id]
+            transaction.status = status
+            transaction.updated_at = now
+            if data:
+                transaction.callback_data = data
+            if status == 'COMPLETED':
+                transaction.completed_at = now
+            else:
+                transaction.failed_reason = reason
+        Transaction.objects.bulk_update(
+            transactions, ['status', 'callback_data', 'failed_reason', 'completed_at', 'updated_at']
+        )
+
+        completed = [transaction for transaction in transactions if transaction.status == 'COMPLETED']
+        failed = [transaction for transaction in transactions if transaction.status == 'FAILED']
+        for status, rows in (('COMPLETED', completed), ('FAILED', failed)):
+            ids = [transaction.id for transaction in rows]
+            if ids:
+                MpesaSTKRequest.objects.filter(transaction_id__in=ids).update(status=status, updated_at=now)
+                PaystackTransaction.objects.filter(transaction_id__in=ids).update(
+                    status=status, updated_at=now, **({'paid_at': now} if status == 'COMPLETED' else {})
+                )
+
+        append_entries([{
+            'entry_type': 'CREDIT',
+            'amount': transaction.amount,
+            'description': f'Payment completed: {transaction.reference_code}',
+            'transaction_id': transaction.id,
+        } for transaction in completed])
+
+    # bulk_update skips post_save, so drop the cached summaries and
+    # responses, notify status streams and queue the report rollups here.
+    invalidate_summary('transactions', [transaction.user_id for transaction in transactions])
+    invalidate_cache('transactions')
+    publish_transaction_statuses(transactions)
+    for transaction in transactions:
+        mark_dirty(transaction.user_id, transaction.created_at)
+
+    for transaction in completed:
+        record_action(
+            transaction.user_id,
+            'PAYMENT_COMPLETED',
+            f'Payment completed: {transaction.reference_code} - {transaction.amount} (reconciled)',
+            metadata={'transaction_id': transaction.id}
+        )
+    for transaction in failed:
+        record_action(
+            transaction.user_id,
+            'PAYMENT_FAILED',
+            f'Payment failed: {transaction.reference_code} - {transaction.failed_reason} (reconciled)',
+            metadata={'transaction_id': transaction.id}
+        )
+    return completed, failed
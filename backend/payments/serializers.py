@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Transaction, MpesaSTKRequest, PaystackTransaction, LedgerEntry
+from django.conf import settings
+from .models import Transaction, MpesaSTKRequest, PaystackTransaction, LedgerEntry, ReconciliationRun
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -67,4 +68,21 @@ class TransactionSummarySerializer(serializers.Serializer):
     total_transactions = serializers.IntegerField()
     completed_transactions = serializers.IntegerField()
     pending_transactions = serializers.IntegerField()
-    failed_transactions = serializers.IntegerField()
\ No newline at end of file
+    failed_transactions = serializers.IntegerField()
+
+class TransactionStatusBatchSerializer(serializers.Serializer):
+    reference_codes = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        allow_empty=False,
+        max_length=settings.PAYMENT_STATUS_BATCH_MAX
+    )
+
+class ReconciliationRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReconciliationRun
+        fields = [
+            'id', 'started_at', 'finished_at', 'duration_ms', 'transactions_checked',
+            'payouts_checked', 'completed', 'failed', 'expired', 'unresolved',
+            'status_queries', 'errors', 'details'
+        ]
+        read_only_fields = fields
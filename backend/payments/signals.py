@@ -1,6 +1,9 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Transaction, LedgerEntry
+from .models import Transaction, MpesaSTKRequest, PaystackTransaction, LedgerEntry
+from .events import publish_transaction_status
+from utils.cache import invalidate_cache
+from utils.summary import invalidate_summary
 
 @receiver(post_save, sender=Transaction)
 def prevent_transaction_modification(sender, instance, created, **kwargs):
@@ -8,6 +11,22 @@ def prevent_transaction_modification(sender, instance, created, **kwargs):
         # Allow status updates via callback only
         pass
 
+@receiver(post_save, sender=Transaction)
+def invalidate_transaction_summary(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or 'status' in update_fields:
+        invalidate_summary('transactions', [instance.user_id])
+    invalidate_cache('transactions')
+
+@receiver(post_save, sender=Transaction)
+def publish_status_change(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or 'status' in update_fields):
+        publish_transaction_status(instance)
+
+@receiver(post_save, sender=MpesaSTKRequest)
+@receiver(post_save, sender=PaystackTransaction)
+def publish_provider_status_change(sender, instance, **kwargs):
+    publish_transaction_status(instance.transaction)
+
 @receiver(post_delete, sender=Transaction)
 def prevent_transaction_deletion(sender, instance, **kwargs):
     raise ValueError("Transaction records are immutable and cannot be deleted.")
@@ -0,0 +1,105 @@
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from redis.exceptions import RedisError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from utils.redis_client import get_async_redis
+from .models import Transaction
+from .events import TERMINAL_STATUSES, status_channel, status_queryset, transaction_status_payload
+
+
+def authenticate_stream(request):
+    """
+    JWT from the Authorization header, or from ?token= since the browser
+    EventSource API cannot set headers.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else request.GET.get('token', '').encode()
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def load_status(user, reference_code):
+    try:
+        transaction = status_queryset().get(reference_code=reference_code)
+    except Transaction.DoesNotExist:
+        return None, 404
+    if user.role == 'STAFF' and transaction.user_id != user.id:
+        return None, 403
+    return transaction_status_payload(transaction), 200
+
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+async def transaction_status_stream(request, reference_code):
+    """
+    Server-sent events for one transaction: the current status straight
+    away, then every change published by payments.events until the
+    transaction settles or PAYMENT_STATUS_STREAM_TIMEOUT passes. Needs an
+    ASGI server (config.asgi) so an open stream does not hold a worker.
+    """
+    user = await sync_to_async(authenticate_stream)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    client = get_async_redis()
+    pubsub = client.pubsub()
+    streaming = False
+    try:
+        # Subscribe before reading the row so no update can fall in between.
+        await pubsub.subscribe(status_channel(reference_code))
+        payload, status = await sync_to_async(load_status)(user, reference_code)
+        if payload is None:
+            detail = 'Transaction not found' if status == 404 else 'Not authorized'
+            return JsonResponse({'detail': detail}, status=status)
+
+        response = StreamingHttpResponse(status_events(client, pubsub, payload), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        streaming = True
+        return response
+    except RedisError:
+        return JsonResponse({'detail': 'Status stream unavailable'}, status=503)
+    finally:
+        # Once streaming, status_events() owns the connection.
+        if not streaming:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+async def status_events(client, pubsub, payload):
+    try:
+        yield sse_event('status', payload)
+        if payload['status'] in TERMINAL_STATUSES:
+            return
+        deadline = time.monotonic() + settings.PAYMENT_STATUS_STREAM_TIMEOUT
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                yield sse_event('timeout', {'reference_code': payload['reference_code']})
+                return
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=min(settings.PAYMENT_STATUS_STREAM_HEARTBEAT, remaining)
+            )
+            if message is None:
+                yield ': keep-alive\n\n'
+                continue
+            data = message['data'].decode() if isinstance(message['data'], bytes) else message['data']
+            yield f'event: status\ndata: {data}\n\n'
+            if json.loads(data)['status'] in TERMINAL_STATUSES:
+                return
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
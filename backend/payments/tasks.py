@@ -1,10 +1,11 @@
 from celery import shared_task
 from django.conf import settings
-import requests
-import base64
 from datetime import datetime
 from utils.helpers import generate_reference_code
-from .models import Transaction, MpesaSTKRequest, PaystackTransaction, LedgerEntry
+from .models import Transaction, MpesaSTKRequest, PaystackTransaction
+from .mpesa import get_mpesa_client
+from .paystack import get_paystack_client
+from .ledger import append_entry
 import hashlib
 import time
 
@@ -15,54 +16,11 @@ def initiate_mpesa_stk(transaction_id, phone_number, amount):
     """
     try:
         transaction = Transaction.objects.get(id=transaction_id)
-        
-        # Get Mpesa access token
-        token_url = 'https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials'
-        if settings.DEBUG == False:
-            token_url = 'https://api.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials'
-        
-        credentials = f"{settings.MPESA_CONSUMER_KEY}:{settings.MPESA_CONSUMER_SECRET}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
-        token_response = requests.get(
-            token_url,
-            headers={'Authorization': f'Basic {encoded_credentials}'}
-        )
-        access_token = token_response.json().get('access_token')
-
-        # Generate password
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        password = base64.b64encode(
-            f"{settings.MPESA_SHORTCODE}{settings.MPESA_PASSKEY}{timestamp}".encode()
-        ).decode()
-
-        # STK Push request
-        stk_url = 'https://sandbox.safaricom.co.ke/mpesa/stkpush/v1/processrequest'
-        if settings.DEBUG == False:
-            stk_url = 'https://api.safaricom.co.ke/mpesa/stkpush/v1/processrequest'
-
-        stk_payload = {
-            "BusinessShortCode": settings.MPESA_SHORTCODE,
-            "Password": password,
-            "Timestamp": timestamp,
-            "TransactionType": "CustomerPayBillOnline",
-            "Amount": int(amount),
-            "PartyA": phone_number,
-            "PartyB": settings.MPESA_SHORTCODE,
-            "PhoneNumber": phone_number,
-            "CallBackURL": "https://your-domain.com/api/payments/mpesa/callback/",
-            "AccountReference": transaction.reference_code,
-            "TransactionDesc": "Payment for Portal"
-        }
 
-        stk_response = requests.post(
-            stk_url,
-            json=stk_payload,
-            headers={'Authorization': f'Bearer {access_token}'}
+        response_data = get_mpesa_client().stk_push(
+            phone_number, amount, transaction.reference_code
         )
 
-        response_data = stk_response.json()
-
         stk_request = MpesaSTKRequest.objects.create(
             transaction=transaction,
             checkout_request_id=response_data.get('CheckoutRequestID'),
@@ -90,46 +48,12 @@ def verify_mpesa_payment(transaction_id):
     """
     try:
         transaction = Transaction.objects.get(id=transaction_id)
+        if transaction.status != 'PENDING':
+            # Already settled by a callback; don't query Daraja or credit again.
+            return {'status': 'success', 'skipped': True, 'transaction_status': transaction.status}
         stk_request = MpesaSTKRequest.objects.get(transaction=transaction)
 
-        # Get access token
-        token_url = 'https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials'
-        if settings.DEBUG == False:
-            token_url = 'https://api.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials'
-        
-        credentials = f"{settings.MPESA_CONSUMER_KEY}:{settings.MPESA_CONSUMER_SECRET}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
-        token_response = requests.get(
-            token_url,
-            headers={'Authorization': f'Basic {encoded_credentials}'}
-        )
-        access_token = token_response.json().get('access_token')
-
-        # Query STK status
-        query_url = 'https://sandbox.safaricom.co.ke/mpesa/stkpushquery/v1/query'
-        if settings.DEBUG == False:
-            query_url = 'https://api.safaricom.co.ke/mpesa/stkpushquery/v1/query'
-
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        password = base64.b64encode(
-            f"{settings.MPESA_SHORTCODE}{settings.MPESA_PASSKEY}{timestamp}".encode()
-        ).decode()
-
-        query_payload = {
-            "BusinessShortCode": settings.MPESA_SHORTCODE,
-            "Password": password,
-            "Timestamp": timestamp,
-            "CheckoutRequestID": stk_request.checkout_request_id
-        }
-
-        query_response = requests.post(
-            query_url,
-            json=query_payload,
-            headers={'Authorization': f'Bearer {access_token}'}
-        )
-
-        response_data = query_response.json()
+        response_data = get_mpesa_client().stk_query(stk_request.checkout_request_id)
         result_code = response_data.get('ResultCode')
 
         if result_code == '0':
@@ -150,28 +74,14 @@ def initiate_paystack_payment(transaction_id, email, amount):
     """
     try:
         transaction = Transaction.objects.get(id=transaction_id)
-        
-        url = 'https://api.paystack.co/transaction/initialize'
-        if settings.DEBUG == False:
-            url = 'https://api.paystack.co/transaction/initialize'
-
-        headers = {
-            'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}',
-            'Content-Type': 'application/json'
-        }
 
-        payload = {
-            'email': email,
-            'amount': int(amount) * 100,  # Paystack expects amount in kobo
-            'reference': transaction.reference_code,
-            'metadata': {
+        response_data = get_paystack_client().initialize(
+            email, amount, transaction.reference_code,
+            metadata={
                 'transaction_id': transaction.id,
-                'user_id': transaction.user.id
+                'user_id': transaction.user_id
             }
-        }
-
-        response = requests.post(url, json=payload, headers=headers)
-        response_data = response.json()
+        )
 
         if response_data.get('status'):
             paystack_tx = PaystackTransaction.objects.create(
@@ -203,20 +113,15 @@ def verify_paystack_payment(reference):
     Verifies Paystack payment status
     """
     try:
-        url = f'https://api.paystack.co/transaction/verify/{reference}'
-        headers = {
-            'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}',
-            'Content-Type': 'application/json'
-        }
+        paystack_tx = PaystackTransaction.objects.select_related('transaction').get(reference=reference)
+        if paystack_tx.transaction.status != 'PENDING':
+            return {'status': 'success', 'skipped': True, 'transaction_status': paystack_tx.transaction.status}
 
-        response = requests.get(url, headers=headers)
-        response_data = response.json()
+        response_data = get_paystack_client().verify(reference)
 
         if response_data.get('status'):
             data = response_data.get('data', {})
             status = data.get('status')
-            
-            paystack_tx = PaystackTransaction.objects.get(reference=reference)
             transaction = paystack_tx.transaction
 
             if status == 'success':
@@ -243,26 +148,91 @@ def verify_paystack_payment(reference):
         return {'status': 'error', 'message': str(e)}
 
 @shared_task
-def create_ledger_entry(transaction_id, entry_type, amount, description):
+def create_ledger_entry(transaction_id, entry_type, amount, description, reference=None):
     """
-    Creates an immutable ledger entry for a transaction
+    Creates an immutable ledger entry for a transaction (or a payout, with
+    transaction_id None and a deterministic reference)
     """
     try:
-        transaction = Transaction.objects.get(id=transaction_id)
-        
-        # Calculate balance after
-        last_entry = LedgerEntry.objects.filter(entry_type=entry_type).order_by('-created_at').first()
-        balance_after = last_entry.balance_after + amount if last_entry else amount
+        entry = append_entry(entry_type, amount, description, transaction_id=transaction_id, reference=reference)
+        return {'status': 'success', 'ledger_entry_created': entry is not None}
 
-        LedgerEntry.objects.create(
-            transaction=transaction,
-            entry_type=entry_type,
-            amount=amount,
-            balance_after=balance_after,
-            description=description
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+
+@shared_task
+def process_callback_inbox(batch_size=None):
+    """
+    Applies pending provider callbacks from the inbox in id order.
+    Rows are claimed with SKIP LOCKED so several workers can drain the inbox
+    concurrently. A failing row is retried on later runs until it reaches
+    CALLBACK_INBOX_MAX_ATTEMPTS (e.g. a callback that beat its STK row).
+    """
+    from django.db import transaction as db_transaction
+    from django.utils import timezone
+    from .callbacks import apply_mpesa_stk_callback, apply_paystack_event
+    from .models import CallbackInbox
+    from payouts.callbacks import apply_b2c_result, apply_b2c_timeout, apply_b2c_status_result
+
+    handlers = {
+        'MPESA_STK': apply_mpesa_stk_callback,
+        'PAYSTACK': apply_paystack_event,
+        'MPESA_B2C_RESULT': apply_b2c_result,
+        'MPESA_B2C_TIMEOUT': apply_b2c_timeout,
+        'MPESA_B2C_STATUS': apply_b2c_status_result,
+    }
+    batch_size = batch_size or settings.CALLBACK_INBOX_BATCH_SIZE
+    processed = failed = 0
+
+    with db_transaction.atomic():
+        entries = list(
+            CallbackInbox.objects.select_for_update(skip_locked=True).filter(
+                processed_at__isnull=True,
+                attempts__lt=settings.CALLBACK_INBOX_MAX_ATTEMPTS
+            ).order_by('id')[:batch_size]
         )
+        for entry in entries:
+            try:
+                with db_transaction.atomic():
+                    handlers[entry.provider](entry.payload)
+                entry.processed_at = timezone.now()
+                entry.last_error = None
+                processed += 1
+            except Exception as e:
+                entry.attempts += 1
+                entry.last_error = f'{type(e).__name__}: {e}'
+                failed += 1
+
+        CallbackInbox.objects.bulk_update(entries, ['processed_at', 'attempts', 'last_error'])
+
+    return {'status': 'success', 'processed': processed, 'failed': failed}
 
-        return {'status': 'success', 'ledger_entry_created': True}
+@shared_task
+def reconcile_stale_payments(batch_size=None):
+    """
+    Resolves transactions stuck in PENDING and payouts stuck in PROCESSING
+    by asking the providers. Only one sweep runs at a time.
+    """
+    from utils.redis_client import get_redis, release_lock
+    from .reconciliation import run_reconciliation, sweep_lock_timeout
 
+    lock = get_redis().lock('reconciliation:sweep', timeout=sweep_lock_timeout(batch_size))
+    if not lock.acquire(blocking=False):
+        return {'status': 'success', 'skipped': True}
+    try:
+        run = run_reconciliation(batch_size)
+        return {
+            'status': 'success',
+            'run_id': run.id,
+            'duration_ms': run.duration_ms,
+            'completed': run.completed,
+            'failed': run.failed,
+            'expired': run.expired,
+            'unresolved': run.unresolved,
+            'status_queries': run.status_queries,
+            'errors': run.errors,
+        }
     except Exception as e:
-        return {'status': 'error', 'message': str(e)}
\ No newline at end of file
+        return {'status': 'error', 'message': str(e)}
+    finally:
+        release_lock(lock)
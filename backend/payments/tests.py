@@ -1,3 +1,154 @@
-from django.test import TestCase
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from utils.benchmark import EndpointBudgetMixin
+from utils.loadtest import percentile
+from utils.simulators import STATS_PATH, parse_behaviour, start_simulators
+from .models import Transaction
+from .reconciliation import run_reconciliation
 
-# Create your tests here.
+
+class PaymentEndpointBudgetTests(EndpointBudgetMixin, TestCase):
+    app = 'payments'
+
+
+class ReconciliationSweepTests(TestCase):
+    def test_unresolved_rows_do_not_starve_newer_ones(self):
+        user = get_user_model().objects.create_user(
+            'sweep-staff', 'sweep-staff@example.com', 'x', role='STAFF', phone_number='254700990201'
+        )
+        stale = timezone.now() - timedelta(hours=1)
+        ids = []
+        for minutes in (0, 1, 2):
+            # No STK or Paystack row and not expired: nothing to resolve.
+            transaction = Transaction.objects.create(user=user, amount=100, payment_method='MPESA')
+            Transaction.objects.filter(pk=transaction.pk).update(created_at=stale + timedelta(minutes=minutes))
+            ids.append(transaction.id)
+
+        checked = []
+        for _ in ids:
+            run_reconciliation(batch_size=1)
+            checked.append(Transaction.objects.filter(id__in=ids).exclude(last_reconciled_at=None).latest('last_reconciled_at').id)
+        self.assertEqual(checked, ids)
+
+
+class CaptureHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.received.append((self.path, raw, dict(self.headers)))
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ProviderSimulatorTests(SimpleTestCase):
+    FAST = parse_behaviour('latency_ms=0,failure_rate=0,callback_delay_ms=50')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.capture = ThreadingHTTPServer(('127.0.0.1', 0), CaptureHandler)
+        threading.Thread(target=cls.capture.serve_forever, daemon=True).start()
+        cls.app_url = f'http://127.0.0.1:{cls.capture.server_address[1]}'
+        cls.simulators = start_simulators(
+            behaviours={'daraja': cls.FAST, 'paystack': cls.FAST, 'smtp': cls.FAST},
+            webhook_url=f'{cls.app_url}/webhook/', paystack_secret='sk_test_simulator', seed=1,
+        )
+        cls.urls = {name: url for name, (_, url) in cls.simulators.items()}
+
+    @classmethod
+    def tearDownClass(cls):
+        for simulator, _ in cls.simulators.values():
+            simulator.stop()
+        cls.simulators['daraja'][0].dispatcher.stop()
+        cls.capture.shutdown()
+        cls.capture.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.capture.received = []
+
+    def wait_for_callbacks(self, count):
+        deadline = time.monotonic() + 5
+        while len(self.capture.received) < count and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return self.capture.received
+
+    def test_stk_push_posts_result_to_callback_url(self):
+        daraja = self.urls['daraja']
+        token = requests.get(
+            f'{daraja}/oauth/v1/generate?grant_type=client_credentials',
+            headers={'Authorization': 'Basic ' + base64.b64encode(b'key:secret').decode()},
+        ).json()['access_token']
+        response = requests.post(f'{daraja}/mpesa/stkpush/v1/processrequest', headers={
+            'Authorization': f'Bearer {token}',
+        }, json={
+            'BusinessShortCode': '174379', 'Password': 'x', 'Timestamp': '20260101000000',
+            'TransactionType': 'CustomerPayBillOnline', 'Amount': 100, 'PartyA': '254700000001',
+            'PartyB': '174379', 'PhoneNumber': '254700000001', 'CallBackURL': f'{self.app_url}/stk/',
+            'AccountReference': 'DPTEST', 'TransactionDesc': 'Test',
+        })
+        self.assertEqual(response.status_code, 200)
+        checkout_request_id = response.json()['CheckoutRequestID']
+
+        (path, raw, _), = self.wait_for_callbacks(1)
+        callback = json.loads(raw)['Body']['stkCallback']
+        self.assertEqual(path, '/stk/')
+        self.assertEqual(callback['CheckoutRequestID'], checkout_request_id)
+        self.assertEqual(callback['ResultCode'], 0)
+        items = {item['Name']: item.get('Value') for item in callback['CallbackMetadata']['Item']}
+        self.assertEqual(items['Amount'], 100)
+
+    def test_paystack_webhook_is_signed(self):
+        response = requests.post(
+            f'{self.urls["paystack"]}/transaction/initialize',
+            headers={'Authorization': 'Bearer sk_test_simulator'},
+            json={'email': 'payer@example.com', 'amount': 10000, 'reference': 'DPTEST'},
+        )
+        self.assertTrue(response.json()['status'])
+
+        (path, raw, headers), = self.wait_for_callbacks(1)
+        self.assertEqual(json.loads(raw)['event'], 'charge.success')
+        expected = hmac.new(b'sk_test_simulator', raw, hashlib.sha512).hexdigest()
+        self.assertEqual(headers['x-paystack-signature'], expected)
+
+    def test_smtp_accepts_mail(self):
+        host, port = self.urls['smtp'].rsplit('//', 1)[1].rsplit(':', 1)
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST=host, EMAIL_PORT=int(port),
+            EMAIL_USE_TLS=False, EMAIL_USE_SSL=False, EMAIL_HOST_USER='portal', EMAIL_HOST_PASSWORD='secret',
+        ):
+            self.assertEqual(send_mail('Receipt', 'Body', 'portal@example.com', ['payer@example.com']), 1)
+        stats = requests.get(self.urls['daraja'] + STATS_PATH).json()
+        self.assertGreaterEqual(stats['smtp']['messages'], 1)
+
+    def test_error_rate_answers_unavailable(self):
+        paystack = self.simulators['paystack'][0]
+        paystack.behaviour = self.FAST._replace(error_rate=1)
+        self.addCleanup(setattr, paystack, 'behaviour', self.FAST)
+        response = requests.get(
+            f'{self.urls["paystack"]}/transaction/verify/DPTEST', headers={'Authorization': 'Bearer sk_test_simulator'}
+        )
+        self.assertEqual(response.status_code, 503)
+
+
+class LoadTestReportTests(SimpleTestCase):
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertIsNone(percentile([], 50))
@@ -1,9 +1,11 @@
 from django.urls import path
 from .views import (
     TransactionListView, TransactionDetailView, TransactionInitiateView,
-    TransactionStatusView, MpesaCallbackView, PaystackWebhookView,
-    TransactionSummaryView, LedgerEntryListView
+    TransactionStatusView, TransactionStatusBatchView, MpesaCallbackView, PaystackWebhookView,
+    TransactionSummaryView, LedgerEntryListView, CallbackInboxStatusView,
+    ReconciliationRunListView
 )
+from .streams import transaction_status_stream
 
 urlpatterns = [
     # ✅ SPECIFIC PATHS FIRST (in any order)
@@ -11,9 +13,13 @@ urlpatterns = [
     path('initiate/', TransactionInitiateView.as_view(), name='transaction-initiate'),
     path('summary/', TransactionSummaryView.as_view(), name='transaction-summary'),
     path('ledger/', LedgerEntryListView.as_view(), name='ledger-list'),
+    path('status/batch/', TransactionStatusBatchView.as_view(), name='transaction-status-batch'),
+    path('status/<str:reference_code>/stream/', transaction_status_stream, name='transaction-status-stream'),
     path('status/<str:reference_code>/', TransactionStatusView.as_view(), name='transaction-status'),
     path('mpesa/callback/', MpesaCallbackView.as_view(), name='mpesa-callback'),
     path('paystack/webhook/', PaystackWebhookView.as_view(), name='paystack-webhook'),
+    path('inbox/status/', CallbackInboxStatusView.as_view(), name='callback-inbox-status'),
+    path('reconciliation/runs/', ReconciliationRunListView.as_view(), name='reconciliation-runs'),
     
     # ❌ CATCH-ALL PATTERN LAST
     path('<str:reference_code>/', TransactionDetailView.as_view(), name='transaction-detail'),
@@ -3,39 +3,46 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
-from django.db.models import Sum, Q, Count
-from django.utils import timezone
-from .models import Transaction, MpesaSTKRequest, PaystackTransaction, LedgerEntry
+from django.db.models import Q, Count
+from .models import Transaction, MpesaSTKRequest, PaystackTransaction, LedgerEntry, ReconciliationRun
 from .serializers import (
     TransactionSerializer, TransactionInitiateSerializer,
-    MpesaSTKSerializer, PaystackTransactionSerializer,
-    LedgerEntrySerializer, TransactionSummarySerializer
+    LedgerEntrySerializer, TransactionSummarySerializer, ReconciliationRunSerializer,
+    TransactionStatusBatchSerializer
 )
 from .permissions import IsAdmin, IsOwnerOrAdmin
+from utils.cache import CachedResponseMixin
 from .tasks import (
     initiate_mpesa_stk, verify_mpesa_payment,
-    initiate_paystack_payment, verify_paystack_payment,
-    create_ledger_entry
+    initiate_paystack_payment, verify_paystack_payment
 )
-from audit.tasks import log_action
+from .events import status_queryset, transaction_status_payload
+from .callbacks import apply_mpesa_stk_callback, apply_paystack_event, inbox_stats, receive_callback
+from audit.buffer import record_action
+from utils.idempotency import idempotent
+from utils.pagination import KeysetPagination
+from utils.summary import cached_summary
 import requests
 import json
 from django.conf import settings
 
 User = get_user_model()
 
-class TransactionListView(generics.ListAPIView):
+class TransactionListView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_namespaces = ('transactions',)
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Transaction.objects.select_related('user')
         if user.role == 'ADMIN':
-            return Transaction.objects.all()
-        return Transaction.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user=user)
 
 class TransactionDetailView(generics.RetrieveAPIView):
-    queryset = Transaction.objects.all()
+    queryset = Transaction.objects.select_related('user')
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
     lookup_field = 'reference_code'
@@ -43,6 +50,7 @@ class TransactionDetailView(generics.RetrieveAPIView):
 class TransactionInitiateView(views.APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent('payments.initiate')
     def post(self, request):
         serializer = TransactionInitiateSerializer(data=request.data)
         if serializer.is_valid():
@@ -61,7 +69,7 @@ class TransactionInitiateView(views.APIView):
                 description=description
             )
 
-            log_action.delay(
+            record_action(
                 request.user.id,
                 'PAYMENT_INITIATED',
                 f'Payment initiated: {transaction.reference_code} - {amount}',
@@ -91,28 +99,39 @@ class TransactionStatusView(views.APIView):
 
     def get(self, request, reference_code):
         try:
-            transaction = Transaction.objects.get(reference_code=reference_code)
-            if request.user.role == 'STAFF' and transaction.user != request.user:
-                return Response({'detail': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
-            
-            data = TransactionSerializer(transaction).data
-            
-            if transaction.payment_method == 'MPESA':
-                try:
-                    stk = MpesaSTKRequest.objects.get(transaction=transaction)
-                    data['mpesa_status'] = MpesaSTKSerializer(stk).data
-                except MpesaSTKRequest.DoesNotExist:
-                    data['mpesa_status'] = None
-            elif transaction.payment_method == 'PAYSTACK':
-                try:
-                    paystack = PaystackTransaction.objects.get(transaction=transaction)
-                    data['paystack_status'] = PaystackTransactionSerializer(paystack).data
-                except PaystackTransaction.DoesNotExist:
-                    data['paystack_status'] = None
-            
-            return Response(data)
+            transaction = status_queryset().get(reference_code=reference_code)
         except Transaction.DoesNotExist:
             return Response({'detail': 'Transaction not found'}, status=status.HTTP_404_NOT_FOUND)
+        if request.user.role == 'STAFF' and transaction.user_id != request.user.id:
+            return Response({'detail': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(transaction_status_payload(transaction))
+
+class TransactionStatusBatchView(views.APIView):
+    """
+    Status of many transactions in one query. STAFF users only see their
+    own transactions; other references are listed under 'forbidden'.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = TransactionStatusBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reference_codes = list(dict.fromkeys(serializer.validated_data['reference_codes']))
+
+        results = {}
+        forbidden = []
+        for transaction in status_queryset().filter(reference_code__in=reference_codes):
+            if request.user.role == 'STAFF' and transaction.user_id != request.user.id:
+                forbidden.append(transaction.reference_code)
+            else:
+                results[transaction.reference_code] = transaction_status_payload(transaction)
+        found = set(results) | set(forbidden)
+
+        return Response({
+            'results': results,
+            'not_found': [reference for reference in reference_codes if reference not in found],
+            'forbidden': forbidden,
+        })
 
 class MpesaCallbackView(views.APIView):
     permission_classes = []
@@ -122,40 +141,14 @@ class MpesaCallbackView(views.APIView):
             data = request.data
             stk_callback = data.get('Body', {}).get('stkCallback', {})
             checkout_request_id = stk_callback.get('CheckoutRequestID')
-            result_code = stk_callback.get('ResultCode')
-            result_desc = stk_callback.get('ResultDesc')
+            if not checkout_request_id or stk_callback.get('ResultCode') is None:
+                return Response({'status': 'error', 'message': 'Invalid STK callback payload'}, status=status.HTTP_400_BAD_REQUEST)
 
             try:
-                stk_request = MpesaSTKRequest.objects.get(checkout_request_id=checkout_request_id)
-                transaction = stk_request.transaction
-
-                stk_request.status = 'COMPLETED' if result_code == '0' else 'FAILED'
-                stk_request.result_code = str(result_code)
-                stk_request.result_desc = result_desc
-                stk_request.callback_data = data
-                stk_request.save()
-
-                if result_code == '0':
-                    transaction.update_status('COMPLETED', callback_data=data)
-                    create_ledger_entry.delay(transaction.id, 'CREDIT', transaction.amount, f'Payment completed: {transaction.reference_code}')
-                    log_action.delay(
-                        transaction.user.id,
-                        'PAYMENT_COMPLETED',
-                        f'Payment completed: {transaction.reference_code} - {transaction.amount}',
-                        metadata={'transaction_id': transaction.id}
-                    )
-                else:
-                    transaction.update_status('FAILED', callback_data=data, failed_reason=result_desc)
-                    log_action.delay(
-                        transaction.user.id,
-                        'PAYMENT_FAILED',
-                        f'Payment failed: {transaction.reference_code} - {result_desc}',
-                        metadata={'transaction_id': transaction.id}
-                    )
-
-                return Response({'status': 'success'})
+                outcome = receive_callback('MPESA_STK', checkout_request_id, data, apply_mpesa_stk_callback)
             except MpesaSTKRequest.DoesNotExist:
                 return Response({'status': 'error', 'message': 'STK request not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'status': 'success' if outcome == 'applied' else outcome})
 
         except Exception as e:
             return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -166,82 +159,51 @@ class PaystackWebhookView(views.APIView):
     def post(self, request):
         try:
             event = request.data.get('event')
-            data = request.data.get('data', {})
-
-            if event == 'charge.success':
-                reference = data.get('reference')
-                try:
-                    paystack_tx = PaystackTransaction.objects.get(reference=reference)
-                    transaction = paystack_tx.transaction
-
-                    paystack_tx.status = 'COMPLETED'
-                    paystack_tx.gateway_response = data.get('gateway_response', '')
-                    paystack_tx.paid_at = timezone.now()
-                    paystack_tx.channel = data.get('channel', '')
-                    paystack_tx.save()
-
-                    transaction.update_status('COMPLETED', callback_data=data)
-                    create_ledger_entry.delay(transaction.id, 'CREDIT', transaction.amount, f'Payment completed: {transaction.reference_code}')
-                    log_action.delay(
-                        transaction.user.id,
-                        'PAYMENT_COMPLETED',
-                        f'Payment completed: {transaction.reference_code} - {transaction.amount}',
-                        metadata={'transaction_id': transaction.id}
-                    )
-
-                    return Response({'status': 'success'})
-                except PaystackTransaction.DoesNotExist:
-                    return Response({'status': 'error', 'message': 'Transaction not found'}, status=status.HTTP_404_NOT_FOUND)
-
-            elif event == 'charge.failed':
-                reference = data.get('reference')
-                try:
-                    paystack_tx = PaystackTransaction.objects.get(reference=reference)
-                    transaction = paystack_tx.transaction
-
-                    paystack_tx.status = 'FAILED'
-                    paystack_tx.gateway_response = data.get('gateway_response', '')
-                    paystack_tx.save()
-
-                    transaction.update_status('FAILED', callback_data=data, failed_reason=data.get('gateway_response', 'Payment failed'))
-                    log_action.delay(
-                        transaction.user.id,
-                        'PAYMENT_FAILED',
-                        f'Payment failed: {transaction.reference_code}',
-                        metadata={'transaction_id': transaction.id}
-                    )
-
-                    return Response({'status': 'success'})
-                except PaystackTransaction.DoesNotExist:
-                    return Response({'status': 'error', 'message': 'Transaction not found'}, status=status.HTTP_404_NOT_FOUND)
-
-            return Response({'status': 'ignored'})
+            reference = request.data.get('data', {}).get('reference')
+            if not event:
+                return Response({'status': 'error', 'message': 'Invalid webhook payload'}, status=status.HTTP_400_BAD_REQUEST)
+
+            if event not in ['charge.success', 'charge.failed']:
+                return Response({'status': 'ignored'})
+            if not reference:
+                return Response({'status': 'error', 'message': 'Missing reference'}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                outcome = receive_callback('PAYSTACK', reference, request.data, apply_paystack_event)
+            except PaystackTransaction.DoesNotExist:
+                return Response({'status': 'error', 'message': 'Transaction not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'status': 'success' if outcome == 'applied' else outcome})
+
         except Exception as e:
             return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+class CallbackInboxStatusView(views.APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return Response(inbox_stats())
+
+class ReconciliationRunListView(generics.ListAPIView):
+    serializer_class = ReconciliationRunSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+    queryset = ReconciliationRun.objects.all()
+
 class TransactionSummaryView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
-        
         if user.role == 'ADMIN':
-            transactions = Transaction.objects.filter(status='COMPLETED')
+            summary = cached_summary('transactions', 'all', Transaction.objects.all())
         else:
-            transactions = Transaction.objects.filter(user=user, status='COMPLETED')
-
-        total_amount = transactions.aggregate(total=Sum('amount'))['total'] or 0
-        total_count = transactions.count()
-        completed_count = transactions.filter(status='COMPLETED').count()
-        pending_count = Transaction.objects.filter(user=user, status='PENDING').count() if user.role == 'STAFF' else Transaction.objects.filter(status='PENDING').count()
-        failed_count = transactions.filter(status='FAILED').count()
+            summary = cached_summary('transactions', f'user:{user.id}', Transaction.objects.filter(user=user))
 
         serializer = TransactionSummarySerializer({
-            'total_amount': total_amount,
-            'total_transactions': total_count,
-            'completed_transactions': completed_count,
-            'pending_transactions': pending_count,
-            'failed_transactions': failed_count
+            'total_amount': summary['completed_amount'],
+            'total_transactions': summary['completed'],
+            'completed_transactions': summary['completed'],
+            'pending_transactions': summary['pending'],
+            'failed_transactions': summary['failed']
         })
 
         return Response(serializer.data)
@@ -249,6 +211,7 @@ class TransactionSummaryView(views.APIView):
 class LedgerEntryListView(generics.ListAPIView):
     serializer_class = LedgerEntrySerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = KeysetPagination
     ordering = ['-created_at']
 
     def get_queryset(self):
@@ -0,0 +1,111 @@
+from django.db import transaction
+from .models import Payout, PayoutRequest
+from audit.buffer import record_action
+
+TERMINAL_STATUSES = ['COMPLETED', 'FAILED', 'CANCELLED']
+B2C_FAILED_STATUSES = ['failed', 'cancelled', 'declined', 'expired', 'reversed']
+
+
+def apply_b2c_result(data):
+    """
+    Applies a Daraja B2C result callback to the payout request and payout.
+    Results for payouts that are already settled are ignored.
+    """
+    result = data.get('Result', {})
+    conversation_id = result.get('ConversationID')
+    originator_conversation_id = result.get('OriginatorConversationID')
+    result_code = str(result.get('ResultCode'))
+    result_desc = result.get('ResultDesc')
+
+    payout_request = PayoutRequest.objects.select_related('payout').get(originator_conversation_id=originator_conversation_id)
+    payout = payout_request.payout
+    if payout.status in TERMINAL_STATUSES:
+        return
+
+    payout_request.status = 'COMPLETED' if result_code == '0' else 'FAILED'
+    payout_request.result_code = result_code
+    payout_request.result_desc = result_desc
+    payout_request.conversation_id = conversation_id
+    payout_request.save()
+
+    if result_code == '0':
+        complete_payout(payout, conversation_id, data)
+    else:
+        fail_payout(payout, result_desc, data)
+
+
+def complete_payout(payout, provider_reference, data):
+    payout.update_status('COMPLETED', callback_data=data)
+    payout.provider_reference = provider_reference
+    payout.save(update_fields=['provider_reference'])
+
+    # Create Debit Ledger Entry, once the payout's status change commits
+    from payments.tasks import create_ledger_entry
+    transaction.on_commit(lambda: create_ledger_entry.delay(
+        None, 'DEBIT', payout.amount,
+        f'Payout completed: {payout.reference_code} to {payout.recipient_name}',
+        reference=f'LE-{payout.reference_code}'
+    ))
+
+    record_action(
+        payout.admin_user_id,
+        'PAYOUT_COMPLETED',
+        f'Payout completed: {payout.reference_code} - {payout.amount}',
+        metadata={'payout_id': payout.id}
+    )
+
+
+def fail_payout(payout, reason, data):
+    payout.update_status('FAILED', callback_data=data, failed_reason=reason)
+    record_action(
+        payout.admin_user_id,
+        'PAYOUT_FAILED',
+        f'Payout failed: {payout.reference_code} - {reason}',
+        metadata={'payout_id': payout.id}
+    )
+
+
+def apply_b2c_timeout(data):
+    """
+    Daraja queue timeouts do not tell us whether the payout went through,
+    so the payout is left in PROCESSING for reconciliation.
+    """
+    return
+
+
+def apply_b2c_status_result(data):
+    """
+    Applies a Daraja transaction status result requested by the reconciliation
+    sweeper. The payout is found through the Occasion echoed in ReferenceData.
+    A failed query (e.g. Daraja has no record yet) leaves the payout in
+    PROCESSING so the next sweep asks again.
+    """
+    result = data.get('Result', {})
+    result_code = str(result.get('ResultCode'))
+
+    reference_items = result.get('ReferenceData', {}).get('ReferenceItem', [])
+    if isinstance(reference_items, dict):
+        reference_items = [reference_items]
+    occasion = next((item.get('Value') for item in reference_items if item.get('Key') == 'Occasion'), None)
+
+    payout = Payout.objects.select_related('b2c_request').get(reference_code=occasion)
+    if payout.status in TERMINAL_STATUSES or result_code != '0':
+        return
+
+    parameters = result.get('ResultParameters', {}).get('ResultParameter', [])
+    if isinstance(parameters, dict):
+        parameters = [parameters]
+    parameters = {item.get('Key'): item.get('Value') for item in parameters}
+    transaction_status = str(parameters.get('TransactionStatus', '')).lower()
+
+    payout_request = getattr(payout, 'b2c_request', None)
+    if transaction_status == 'completed':
+        if payout_request:
+            payout_request.status = 'COMPLETED'
+            payout_request.save(update_fields=['status', 'updated_at'])
+        complete_payout(payout, parameters.get('ReceiptNo') or result.get('TransactionID'), data)
+    elif transaction_status in B2C_FAILED_STATUSES:
+        if payout_request:
+            payout_request.status = 'FAILED'
+            payout_request.save(update_fields=['status', 'updated_at'])
+        fail_payout(payout, parameters.get('ReasonType') or f'B2C transaction {transaction_status}', data)
@@ -27,6 +27,8 @@ class Payout(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     failed_reason = models.TextField(blank=True, null=True)
+    # When the reconciliation sweeper last queried its B2C status.
+    last_reconciled_at = models.DateTimeField(null=True, blank=True, editable=False)
     is_immutable = models.BooleanField(default=True, editable=False)
 
     class Meta:
@@ -36,6 +38,10 @@ class Payout(models.Model):
             models.Index(fields=['admin_user', 'status']),
             models.Index(fields=['created_at']),
             models.Index(fields=['status']),
+            models.Index(
+                models.F('last_reconciled_at').asc(nulls_first=True), 'created_at',
+                name='payout_processing_idx', condition=models.Q(status='PROCESSING'),
+            ),
         ]
 
     def __str__(self):
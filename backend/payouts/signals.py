@@ -1,6 +1,14 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Payout
+from utils.cache import invalidate_cache
+from utils.summary import invalidate_summary
+
+@receiver(post_save, sender=Payout)
+def invalidate_payout_summary(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or 'status' in update_fields:
+        invalidate_summary('payouts')
+    invalidate_cache('payouts')
 
 @receiver(post_delete, sender=Payout)
 def prevent_payout_deletion(sender, instance, **kwargs):
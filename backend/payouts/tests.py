@@ -1,3 +1,6 @@
 from django.test import TestCase
+from utils.benchmark import EndpointBudgetMixin
 
-# Create your tests here.
+
+class PayoutEndpointBudgetTests(EndpointBudgetMixin, TestCase):
+    app = 'payouts'
@@ -1,7 +1,8 @@
 from django.urls import path
 from .views import (
     PayoutListView, PayoutDetailView, PayoutInitiateView,
-    B2CResultCallbackView, B2CTimeoutCallbackView, PayoutSummaryView
+    B2CResultCallbackView, B2CTimeoutCallbackView, B2CStatusResultCallbackView,
+    PayoutSummaryView
 )
 
 urlpatterns = [
@@ -12,4 +13,5 @@ urlpatterns = [
     # Public Callbacks (Secured by IP whitelist in production server config)
     path('mpesa/b2c/result/', B2CResultCallbackView.as_view(), name='b2c-result'),
     path('mpesa/b2c/timeout/', B2CTimeoutCallbackView.as_view(), name='b2c-timeout'),
+    path('mpesa/b2c/status/result/', B2CStatusResultCallbackView.as_view(), name='b2c-status-result'),
 ]
\ No newline at end of file
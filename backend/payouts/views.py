@@ -2,32 +2,40 @@ from rest_framework import generics, status, views
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
-from django.db.models import Sum, Count
+from django.db.models import Count
 from .models import Payout, PayoutRequest
 from .serializers import PayoutSerializer, PayoutInitiateSerializer, PayoutRequestSerializer, PayoutSummarySerializer
 from .permissions import IsAdmin
 from .tasks import initiate_b2c_payment
-from audit.tasks import log_action
+from .callbacks import apply_b2c_result, apply_b2c_timeout, apply_b2c_status_result
+from audit.buffer import record_action
+from utils.idempotency import idempotent
 from payments.models import LedgerEntry
+from payments.callbacks import receive_callback
+from utils.cache import CachedResponseMixin
+from utils.summary import cached_summary
 
 User = get_user_model()
 
-class PayoutListView(generics.ListAPIView):
+class PayoutListView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = PayoutSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
     ordering = ['-created_at']
+    cache_namespaces = ('payouts',)
+    cache_scope = 'role'
 
     def get_queryset(self):
-        return Payout.objects.all()
+        return Payout.objects.select_related('admin_user')
 
 class PayoutDetailView(generics.RetrieveAPIView):
-    queryset = Payout.objects.all()
+    queryset = Payout.objects.select_related('admin_user')
     serializer_class = PayoutSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
 
 class PayoutInitiateView(views.APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
+    @idempotent('payouts.initiate')
     def post(self, request):
         serializer = PayoutInitiateSerializer(data=request.data)
         if serializer.is_valid():
@@ -44,7 +52,7 @@ class PayoutInitiateView(views.APIView):
                 reason=reason
             )
 
-            log_action.delay(
+            record_action(
                 request.user.id,
                 'PAYOUT_INITIATED',
                 f'Payout initiated: {payout.reference_code} - {amount} to {recipient_name}',
@@ -68,49 +76,15 @@ class B2CResultCallbackView(views.APIView):
         try:
             data = request.data
             result = data.get('Result', {})
-            conversation_id = result.get('ConversationID')
             originator_conversation_id = result.get('OriginatorConversationID')
-            result_code = result.get('ResultCode')
-            result_desc = result.get('ResultDesc')
+            if not originator_conversation_id or result.get('ResultCode') is None:
+                return Response({'ResultCode': 1, 'ResultDesc': 'Invalid result payload'}, status=status.HTTP_400_BAD_REQUEST)
 
             try:
-                payout_request = PayoutRequest.objects.get(originator_conversation_id=originator_conversation_id)
-                payout = payout_request.payout
-
-                payout_request.status = 'COMPLETED' if result_code == '0' else 'FAILED'
-                payout_request.result_code = str(result_code)
-                payout_request.result_desc = result_desc
-                payout_request.conversation_id = conversation_id
-                payout_request.callback_data = data
-                payout_request.save()
-
-                if result_code == '0':
-                    payout.update_status('COMPLETED', callback_data=data)
-                    payout.provider_reference = conversation_id
-                    payout.save(update_fields=['provider_reference'])
-                    
-                    # Create Debit Ledger Entry
-                    from payments.tasks import create_ledger_entry
-                    create_ledger_entry.delay(None, 'DEBIT', payout.amount, f'Payout completed: {payout.reference_code} to {payout.recipient_name}')
-                    
-                    log_action.delay(
-                        payout.admin_user.id,
-                        'PAYOUT_COMPLETED',
-                        f'Payout completed: {payout.reference_code} - {payout.amount}',
-                        metadata={'payout_id': payout.id}
-                    )
-                else:
-                    payout.update_status('FAILED', callback_data=data, failed_reason=result_desc)
-                    log_action.delay(
-                        payout.admin_user.id,
-                        'PAYOUT_FAILED',
-                        f'Payout failed: {payout.reference_code} - {result_desc}',
-                        metadata={'payout_id': payout.id}
-                    )
-
-                return Response({'ResultCode': 0, 'ResultDesc': 'Accept'})
+                receive_callback('MPESA_B2C_RESULT', originator_conversation_id, data, apply_b2c_result)
             except PayoutRequest.DoesNotExist:
                 return Response({'ResultCode': 1, 'ResultDesc': 'Payout request not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'ResultCode': 0, 'ResultDesc': 'Accept'})
 
         except Exception as e:
             return Response({'ResultCode': 1, 'ResultDesc': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -121,29 +95,44 @@ class B2CTimeoutCallbackView(views.APIView):
     def post(self, request):
         try:
             data = request.data
-            # Handle timeout logic similar to result callback
-            # For brevity, marking as failed
+            originator_conversation_id = data.get('Result', {}).get('OriginatorConversationID')
+            receive_callback('MPESA_B2C_TIMEOUT', originator_conversation_id, data, apply_b2c_timeout)
             return Response({'ResultCode': 0, 'ResultDesc': 'Accept'})
         except Exception as e:
             return Response({'ResultCode': 1, 'ResultDesc': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+class B2CStatusResultCallbackView(views.APIView):
+    permission_classes = []
+
+    def post(self, request):
+        try:
+            data = request.data
+            result = data.get('Result', {})
+            originator_conversation_id = result.get('OriginatorConversationID')
+            if not originator_conversation_id or result.get('ResultCode') is None:
+                return Response({'ResultCode': 1, 'ResultDesc': 'Invalid result payload'}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                receive_callback('MPESA_B2C_STATUS', originator_conversation_id, data, apply_b2c_status_result)
+            except Payout.DoesNotExist:
+                return Response({'ResultCode': 1, 'ResultDesc': 'Payout not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'ResultCode': 0, 'ResultDesc': 'Accept'})
+
+        except Exception as e:
+            return Response({'ResultCode': 1, 'ResultDesc': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
 class PayoutSummaryView(views.APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        payouts = Payout.objects.filter(status='COMPLETED')
-        total_amount = payouts.aggregate(total=Sum('amount'))['total'] or 0
-        total_count = payouts.count()
-        completed_count = payouts.filter(status='COMPLETED').count()
-        pending_count = Payout.objects.filter(status='PENDING').count()
-        failed_count = Payout.objects.filter(status='FAILED').count()
+        summary = cached_summary('payouts', 'all', Payout.objects.all())
 
         serializer = PayoutSummarySerializer({
-            'total_amount': total_amount,
-            'total_payouts': total_count,
-            'completed_payouts': completed_count,
-            'pending_payouts': pending_count,
-            'failed_payouts': failed_count
+            'total_amount': summary['completed_amount'],
+            'total_payouts': summary['completed'],
+            'completed_payouts': summary['completed'],
+            'pending_payouts': summary['pending'],
+            'failed_payouts': summary['failed']
         })
 
         return Response(serializer.data)
\ No newline at end of file
@@ -32,6 +32,8 @@ class Quote(models.Model):
         indexes = [
             models.Index(fields=['reference_code']),
             models.Index(fields=['status']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['created_by', 'created_at']),
         ]
 
     def __str__(self):
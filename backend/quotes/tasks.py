@@ -1,3 +1,4 @@
+import logging
 from celery import shared_task
 from django.core.mail import EmailMessage
 from django.conf import settings
@@ -6,6 +7,8 @@ from weasyprint import HTML
 from .models import Quote
 import os
 
+logger = logging.getLogger(__name__)
+
 @shared_task
 def send_quote_email(quote_id):
     try:
@@ -33,6 +36,8 @@ def send_quote_email(quote_id):
         email.send()
         
         quote.mark_sent()
+        return {'status': 'success', 'quote_id': quote_id}
         
     except Exception as e:
-        print(f"Error sending quote email: {e}")
\ No newline at end of file
+        logger.exception('Error sending quote email %s', quote_id)
+        return {'status': 'error', 'message': str(e)}
@@ -6,22 +6,25 @@ from .models import Quote
 from .serializers import QuoteSerializer, QuoteCreateSerializer
 from .permissions import IsAdmin, IsOwnerOrAdmin
 from .tasks import send_quote_email
-from audit.tasks import log_action
+from audit.buffer import record_action
+from utils.pagination import KeysetPagination
 
 User = get_user_model()
 
 class QuoteListView(generics.ListAPIView):
     serializer_class = QuoteSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Quote.objects.select_related('created_by')
         if user.role == 'ADMIN':
-            return Quote.objects.all()
-        return Quote.objects.filter(created_by=user)
+            return queryset
+        return queryset.filter(created_by=user)
 
 class QuoteDetailView(generics.RetrieveAPIView):
-    queryset = Quote.objects.all()
+    queryset = Quote.objects.select_related('created_by')
     serializer_class = QuoteSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
 
@@ -39,7 +42,7 @@ class QuoteCreateView(views.APIView):
             # Generate PDF and Send Email
             send_quote_email.delay(quote.id)
             
-            log_action.delay(
+            record_action(
                 request.user.id,
                 'QUOTE_CREATED',
                 f'Quote created: {quote.reference_code} for {quote.client_name}',
@@ -26,6 +26,7 @@ class Receipt(models.Model):
             models.Index(fields=['reference_code']),
             models.Index(fields=['transaction']),
             models.Index(fields=['status']),
+            models.Index(fields=['generated_at']),
         ]
 
     def __str__(self):
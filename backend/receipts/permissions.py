@@ -8,4 +8,4 @@ class IsOwnerOrAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.user.role == 'ADMIN':
             return True
-        return obj.transaction.user == request.user
\ No newline at end of file
+        return obj.transaction.user_id == request.user.id
\ No newline at end of file
@@ -1,3 +1,4 @@
+import logging
 from celery import shared_task
 from django.core.mail import EmailMessage
 from django.conf import settings
@@ -7,6 +8,8 @@ from .models import Receipt
 import os
 import base64
 
+logger = logging.getLogger(__name__)
+
 @shared_task
 def generate_receipt_pdf(receipt_id):
     try:
@@ -33,7 +36,7 @@ def generate_receipt_pdf(receipt_id):
         return {'status': 'success', 'receipt_id': receipt_id}
         
     except Exception as e:
-        print(f"Error generating receipt PDF: {e}")
+        logger.exception('Error generating receipt PDF %s', receipt_id)
         return {'status': 'error', 'message': str(e)}
 
 @shared_task
@@ -70,5 +73,5 @@ def send_receipt_email(receipt_id):
         return {'status': 'success', 'receipt_id': receipt_id}
         
     except Exception as e:
-        print(f"Error sending receipt email: {e}")
+        logger.exception('Error sending receipt email %s', receipt_id)
         return {'status': 'error', 'message': str(e)}
\ No newline at end of file
@@ -10,23 +10,27 @@ from .models import Receipt
 from .serializers import ReceiptSerializer, ReceiptGenerateSerializer
 from .permissions import IsAdmin, IsOwnerOrAdmin
 from .tasks import generate_receipt_pdf, send_receipt_email
-from audit.tasks import log_action
+from audit.buffer import record_action
 from payments.models import Transaction
+from utils.pagination import KeysetPagination
 
 User = get_user_model()
 
 class ReceiptListView(generics.ListAPIView):
     serializer_class = ReceiptSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_field = 'generated_at'
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Receipt.objects.select_related('transaction', 'downloaded_by')
         if user.role == 'ADMIN':
-            return Receipt.objects.all()
-        return Receipt.objects.filter(transaction__user=user)
+            return queryset
+        return queryset.filter(transaction__user=user)
 
 class ReceiptDetailView(generics.RetrieveAPIView):
-    queryset = Receipt.objects.all()
+    queryset = Receipt.objects.select_related('transaction', 'downloaded_by')
     serializer_class = ReceiptSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
 
@@ -42,7 +46,7 @@ class ReceiptGenerateView(views.APIView):
                 transaction = Transaction.objects.get(id=transaction_id)
                 
                 # Check permissions
-                if request.user.role == 'STAFF' and transaction.user != request.user:
+                if request.user.role == 'STAFF' and transaction.user_id != request.user.id:
                     return Response({'detail': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
                 
                 if transaction.status != 'COMPLETED':
@@ -59,7 +63,7 @@ class ReceiptGenerateView(views.APIView):
                 receipt = Receipt.objects.create(transaction=transaction)
                 generate_receipt_pdf.delay(receipt.id)
                 
-                log_action.delay(
+                record_action(
                     request.user.id,
                     'RECEIPT_GENERATED',
                     f'Receipt generated: {receipt.reference_code} for transaction {transaction.reference_code}',
@@ -90,7 +94,7 @@ class ReceiptDownloadView(views.APIView):
             # Mark as downloaded
             receipt.mark_downloaded(request.user)
             
-            log_action.delay(
+            record_action(
                 request.user.id,
                 'RECEIPT_DOWNLOADED',
                 f'Receipt downloaded: {receipt.reference_code}',
@@ -137,11 +141,11 @@ class TransactionReceiptView(views.APIView):
             transaction = Transaction.objects.get(id=transaction_id)
             
             # Check permissions
-            if request.user.role == 'STAFF' and transaction.user != request.user:
+            if request.user.role == 'STAFF' and transaction.user_id != request.user.id:
                 return Response({'detail': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
             
             try:
-                receipt = Receipt.objects.get(transaction=transaction)
+                receipt = Receipt.objects.select_related('transaction', 'downloaded_by').get(transaction=transaction)
                 return Response(ReceiptSerializer(receipt).data)
             except Receipt.DoesNotExist:
                 return Response({'detail': 'Receipt not yet generated for this transaction'}, status=status.HTTP_404_NOT_FOUND)
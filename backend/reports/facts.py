@@ -0,0 +1,138 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from utils.redis_client import get_redis
+from utils.timewindow import day_bounds
+from .models import DailyAuditFact, DailyTransactionFact
+
+
+def _write_transaction_facts(first, last, keys=None):
+    """
+    Recomputes DailyTransactionFact between two local dates, for every user
+    or only the (user_id, day) pairs in `keys`. Groups that no longer exist
+    (a day's last PENDING transaction completed) are deleted.
+    """
+    from payments.models import Transaction
+
+    start, end = day_bounds(first, last)
+    queryset = Transaction.objects.filter(created_at__gte=start, created_at__lt=end)
+    if keys is not None:
+        queryset = queryset.filter(user_id__in={user_id for user_id, _ in keys})
+    rows = queryset.annotate(day=TruncDate('created_at')).values(
+        'user_id', 'day', 'payment_method', 'status'
+    ).annotate(total_amount=Sum('amount'), count=Count('id')).order_by()
+
+    facts = [
+        DailyTransactionFact(
+            date=row['day'], user_id=row['user_id'], payment_method=row['payment_method'],
+            status=row['status'], total_amount=row['total_amount'] or 0, count=row['count'],
+        )
+        for row in rows if keys is None or (row['user_id'], row['day']) in keys
+    ]
+    started = timezone.now()
+    with transaction.atomic():
+        DailyTransactionFact.objects.bulk_create(
+            facts,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['date', 'user', 'payment_method', 'status'],
+            update_fields=['total_amount', 'count', 'updated_at'],
+        )
+        # Every group that still exists was just upserted with a new updated_at.
+        stale = DailyTransactionFact.objects.filter(date__gte=first, date__lte=last, updated_at__lt=started)
+        if keys is not None:
+            stale = stale.filter(user_id__in={user_id for user_id, _ in keys})
+            stale_ids = [pk for pk, user_id, day in stale.values_list('id', 'user_id', 'date') if (user_id, day) in keys]
+            stale = DailyTransactionFact.objects.filter(id__in=stale_ids)
+        deleted = stale.delete()[0]
+    return len(facts), deleted
+
+
+def refresh_transaction_facts(keys):
+    """Recomputes the fact rows of each (user_id, local date) in `keys`."""
+    if not keys:
+        return 0, 0
+    return _write_transaction_facts(min(day for _, day in keys), max(day for _, day in keys), keys=set(keys))
+
+
+def rebuild_transaction_facts(first, last):
+    return _write_transaction_facts(first, last)
+
+
+def count_audit_entries(logs):
+    """
+    Adds newly inserted AuditLog rows to DailyAuditFact in one
+    INSERT ... ON CONFLICT DO UPDATE SET count = count + EXCLUDED.count.
+    Runs in the transaction that inserted them, so the counts match the rows.
+    """
+    counts = Counter((timezone.localdate(log.timestamp), log.action) for log in logs)
+    if not counts:
+        return
+    table = DailyAuditFact._meta.db_table
+    values = ', '.join(['(%s, %s, %s)'] * len(counts))
+    params = [value for (day, action), count in counts.items() for value in (day, action, count)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (date, action, count) VALUES {values} '
+            f'ON CONFLICT (date, action) DO UPDATE SET count = {table}.count + EXCLUDED.count',
+            params
+        )
+
+
+def rebuild_audit_facts(first, last):
+    """
+    Recounts DailyAuditFact from AuditLog between two local dates. Days
+    whose log partitions were archived have no rows left and keep their
+    counts.
+    """
+    from audit.models import AuditLog
+
+    start, end = day_bounds(first, last)
+    rows = AuditLog.objects.filter(timestamp__gte=start, timestamp__lt=end).annotate(
+        day=TruncDate('timestamp')
+    ).values('day', 'action').annotate(count=Count('id')).order_by()
+    facts = [DailyAuditFact(date=row['day'], action=row['action'], count=row['count']) for row in rows]
+    DailyAuditFact.objects.bulk_create(
+        facts, batch_size=1000, update_conflicts=True, unique_fields=['date', 'action'], update_fields=['count']
+    )
+    return len(facts)
+
+
+def rebuild_facts(days, chunk_days=31):
+    """
+    Rebuilds the transaction and audit facts for the last `days` local
+    days, or for all history when `days` is 0, a chunk at a time.
+    Returns (transaction fact rows, audit fact rows).
+    """
+    from audit.buffer import AUDIT_BUFFER_LOCK
+    from audit.models import AuditLog
+    from payments.models import Transaction
+
+    today = timezone.localdate()
+    if days:
+        first = today - timedelta(days=days - 1)
+    else:
+        candidates = (
+            Transaction.objects.aggregate(oldest=Min('created_at'))['oldest'],
+            AuditLog.objects.aggregate(oldest=Min('timestamp'))['oldest'],
+        )
+        oldest = [moment for moment in candidates if moment is not None]
+        first = timezone.localdate(min(oldest)) if oldest else today
+
+    transaction_rows = audit_rows = 0
+    while first <= today:
+        last = min(first + timedelta(days=chunk_days - 1), today)
+        transaction_rows += rebuild_transaction_facts(first, last)[0]
+        # Recounting while the buffer flush adds to the same days would drop
+        # the entries it inserts in between, so flushes wait for the recount.
+        with get_redis().lock(
+            AUDIT_BUFFER_LOCK, timeout=settings.FACTS_REBUILD_LOCK_TTL,
+            blocking_timeout=settings.AUDIT_BUFFER_FLUSH_LOCK_TTL
+        ):
+            audit_rows += rebuild_audit_facts(first, last)
+        first = last + timedelta(days=1)
+    return transaction_rows, audit_rows
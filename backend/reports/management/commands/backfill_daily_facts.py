@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from reports.facts import rebuild_facts
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily transaction and audit fact tables behind the dashboard charts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=0, help='Only rebuild the last N days (default: all history)')
+
+    def handle(self, *args, **options):
+        transaction_rows, audit_rows = rebuild_facts(options['days'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {transaction_rows} transaction fact rows and {audit_rows} audit fact rows'
+        ))
@@ -0,0 +1,66 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from utils.benchmark import (
+    ENDPOINTS, budget_failures, format_table, load_results, measure_endpoints, seed_endpoint_data
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Calls every read endpoint as ADMIN and STAFF and prints queries, time and rows per call. '
+        'Everything runs in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--staff', type=int, default=5, help='Staff users to seed')
+        parser.add_argument('--per-user', type=int, default=200, help='Rows of each model to seed per staff user')
+        parser.add_argument('--days', type=int, default=180, help='Spread seeded timestamps over this many days')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for comparable runs')
+        parser.add_argument(
+            '--existing', nargs=2, metavar=('ADMIN', 'STAFF'),
+            help='Skip seeding and call the endpoints as these existing usernames'
+        )
+        parser.add_argument('--app', action='append', help='Only endpoints of this app (repeatable)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per call; the median is reported')
+        parser.add_argument('--json', dest='json_path', help='Write the results to this file')
+        parser.add_argument('--compare', help='Show changes against results written earlier with --json')
+        parser.add_argument('--check', action='store_true', help='Exit with an error if any budget is exceeded')
+
+    def handle(self, *args, **options):
+        endpoints = [item for item in ENDPOINTS if not options['app'] or item.app in options['app']]
+        if not endpoints:
+            raise CommandError(f'No endpoints for {", ".join(options["app"])}.')
+        baseline = load_results(options['compare']) if options['compare'] else None
+
+        with transaction.atomic():
+            if options['existing']:
+                admin, staff = self.existing_users(*options['existing'])
+            else:
+                admin, staff = seed_endpoint_data(
+                    options['staff'], options['per_user'], options['days'], options['seed']
+                )
+            results = measure_endpoints(admin, staff, endpoints, options['repeat'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(format_table(results, baseline))
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f'Results written to {options["json_path"]}')
+
+        failures = budget_failures(results)
+        for row, reason in failures:
+            self.stderr.write(f'{row["endpoint"]} as {row["role"]} ({row["path"]}): {reason}')
+        if failures and options['check']:
+            raise CommandError(f'{len(failures)} endpoint calls exceeded their budget.')
+
+    def existing_users(self, admin_username, staff_username):
+        User = get_user_model()
+        try:
+            admin = User.objects.get(username=admin_username, role='ADMIN')
+            staff = User.objects.get(username=staff_username, role='STAFF')
+        except User.DoesNotExist:
+            raise CommandError('--existing takes the username of an ADMIN and of a STAFF user.')
+        return admin, staff
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from reports.performance import rebuild_performance
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the staff leaderboard rollup (UserPerformanceDaily) from transactions, contracts and quotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Only rebuild the last N days (default PERFORMANCE_REBUILD_DAYS; 0 = all history)'
+        )
+
+    def handle(self, *args, **options):
+        written, deleted = rebuild_performance(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} rows, deleted {deleted} stale rows'))
@@ -0,0 +1,60 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.dateparse import parse_date
+from utils.seeding import PortalSeeder, VOLUMES, rebuild_rollups, volumes
+
+
+class Command(BaseCommand):
+    help = (
+        'Loads synthetic users, payments, ledger entries, documents, audit logs, sessions and notifications '
+        'for benchmarking. One unit of --scale adds about '
+        + ', '.join(f'{count:,} {name.replace("_", " ")}' for name, count in VOLUMES.items()) + '.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1, help='Multiplies every volume; 0.01 for a quick run')
+        parser.add_argument('--days', type=int, default=365, help='Spread the rows over this many days')
+        parser.add_argument('--end', help='Last day of the window, YYYY-MM-DD (default yesterday)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same rows')
+        parser.add_argument('--password', default='portal-seed', help='Password of the seeded users')
+        parser.add_argument('--skip-rollups', action='store_true', help='Do not rebuild the daily facts and rollups')
+        parser.add_argument('--force', action='store_true', help='Allow running with DEBUG off')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to load synthetic data with DEBUG off; pass --force.')
+        if connection.vendor != 'postgresql':
+            raise CommandError('seed_portal loads rows with COPY; run it against PostgreSQL.')
+        if options['scale'] <= 0 or options['days'] < 1:
+            raise CommandError('--scale and --days must be positive.')
+        end = None
+        if options['end']:
+            end = parse_date(options['end'])
+            if end is None:
+                raise CommandError('--end takes a date as YYYY-MM-DD.')
+
+        planned = volumes(options['scale'])
+        self.stdout.write('Seeding ' + ', '.join(f'{count:,} {name}' for name, count in planned.items()))
+        started = time.monotonic()
+        seeder = PortalSeeder(
+            scale=options['scale'], days=options['days'], end=end, seed=options['seed'], password=options['password']
+        )
+        written = seeder.run(progress=self.stdout.write)
+        elapsed = time.monotonic() - started
+        total = sum(written.values())
+        for name, count in written.items():
+            self.stdout.write(f'  {name:<18} {count:>12,}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 0.001):,.0f} rows/s). '
+            f'Seeded users log in with the password "{options["password"]}".'
+        ))
+
+        if not options['skip_rollups']:
+            started = time.monotonic()
+            rebuilt = rebuild_rollups(seeder.timeline.days[0])
+            self.stdout.write(
+                'Rebuilt ' + ', '.join(f'{count:,} {name.replace("_", " ")}' for name, count in rebuilt.items())
+                + f' in {time.monotonic() - started:.1f}s'
+            )
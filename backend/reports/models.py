@@ -25,4 +25,80 @@ class DashboardCache(models.Model):
 
     def is_expired(self):
         from django.utils import timezone
-        return timezone.now() > self.expires_at
\ No newline at end of file
+        return timezone.now() > self.expires_at
+
+class UserPerformanceDaily(models.Model):
+    """
+    Per-user, per-day rollup behind the staff leaderboard. Rows are
+    recomputed (never incremented) by reports.performance, so replaying an
+    update is harmless.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='performance_days')
+    date = models.DateField()
+    revenue = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    transactions_completed = models.PositiveIntegerField(default=0)
+    contracts_signed = models.PositiveIntegerField(default=0)
+    quotes_sent = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='reports_performance_user_date_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date}"
+
+
+class DailyTransactionFact(models.Model):
+    """
+    Transactions per local creation day, user, payment method and status.
+    The rows for a (user, day) are recomputed by reports.facts whenever one
+    of that day's transactions is created or changes status.
+    """
+    date = models.DateField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='transaction_facts')
+    payment_method = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    total_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'user', 'payment_method', 'status'], name='reports_txfact_day_user_method_status_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'date']),
+            models.Index(fields=['user', 'status', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.user_id} - {self.payment_method} - {self.status}"
+
+
+class DailyAuditFact(models.Model):
+    """
+    Audit entries per local day and action, incremented by
+    audit.buffer.write_entries as entries are inserted.
+    """
+    date = models.DateField()
+    action = models.CharField(max_length=50)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'action'], name='reports_auditfact_day_action_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.action}"
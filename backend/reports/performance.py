@@ -0,0 +1,174 @@
+import logging
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from redis.exceptions import RedisError
+from utils.redis_client import get_redis
+from utils.timewindow import day_bounds
+from .facts import refresh_transaction_facts
+from .models import UserPerformanceDaily
+
+logger = logging.getLogger(__name__)
+
+PERFORMANCE_DIRTY_KEY = 'performance:dirty'
+EMPTY_METRICS = {
+    'revenue': 0, 'transactions_completed': 0, 'contracts_signed': 0, 'quotes_sent': 0, 'last_activity_at': None,
+}
+
+
+def mark_dirty(user_id, moment):
+    """
+    Queues the (user, local day of `moment`) rollup and transaction fact
+    rows for recomputation once the current transaction commits; flush_dirty
+    picks them up. If Redis is unavailable they are recomputed directly.
+    """
+    if not user_id or moment is None:
+        return
+    day = timezone.localdate(moment)
+    transaction.on_commit(lambda: _push(user_id, day))
+
+
+def _push(user_id, day):
+    try:
+        get_redis().sadd(PERFORMANCE_DIRTY_KEY, f'{user_id}:{day.isoformat()}')
+    except RedisError as e:
+        logger.warning('Performance queue unavailable, refreshing directly: %s', e)
+        refresh_days({(user_id, day)})
+
+
+def aggregate_days(first, last, user_ids=None):
+    """
+    Metrics per (user_id, day) between two local dates, inclusive: three
+    GROUP BY queries (completed transactions, signed contracts, quotes).
+    """
+    from contracts.models import Contract
+    from payments.models import Transaction
+    from quotes.models import Quote
+
+    start, end = day_bounds(first, last)
+    sources = (
+        (Transaction.objects.filter(status='COMPLETED'), 'user_id', 'created_at',
+         {'revenue': Sum('amount'), 'transactions_completed': Count('id')}),
+        (Contract.objects.filter(status='SIGNED'), 'created_by_id', 'signed_at',
+         {'contracts_signed': Count('id')}),
+        (Quote.objects.all(), 'created_by_id', 'created_at',
+         {'quotes_sent': Count('id')}),
+    )
+    metrics = {}
+    for queryset, user_field, date_field, aggregates in sources:
+        queryset = queryset.filter(**{f'{date_field}__gte': start, f'{date_field}__lt': end})
+        if user_ids is not None:
+            queryset = queryset.filter(**{f'{user_field}__in': user_ids})
+        rows = queryset.annotate(day=TruncDate(date_field)).values(user_field, 'day').annotate(
+            last_activity_at=Max(date_field), **aggregates
+        ).order_by()
+        for row in rows:
+            values = metrics.setdefault((row[user_field], row['day']), dict(EMPTY_METRICS))
+            for name in aggregates:
+                values[name] = row[name] or 0
+            if values['last_activity_at'] is None or row['last_activity_at'] > values['last_activity_at']:
+                values['last_activity_at'] = row['last_activity_at']
+    return metrics
+
+
+def upsert_days(metrics):
+    """
+    Writes rollup rows with INSERT ... ON CONFLICT (user, date) DO UPDATE,
+    so concurrent refreshes of the same row cannot collide.
+    """
+    rows = [UserPerformanceDaily(user_id=user_id, date=day, **values) for (user_id, day), values in metrics.items()]
+    UserPerformanceDaily.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['user', 'date'],
+        update_fields=list(EMPTY_METRICS) + ['updated_at'],
+    )
+    return len(rows)
+
+
+def refresh_days(keys):
+    """
+    Recomputes the rollup rows for a set of (user_id, date) pairs. Pairs
+    with no activity left are written as zeros. The same days' transaction
+    facts (reports.facts) are refreshed along with them.
+    """
+    if not keys:
+        return 0
+    refresh_transaction_facts(keys)
+    metrics = aggregate_days(
+        min(day for _, day in keys), max(day for _, day in keys),
+        user_ids={user_id for user_id, _ in keys}
+    )
+    return upsert_days({key: metrics.get(key, EMPTY_METRICS) for key in keys})
+
+
+def flush_dirty(batch_size=None):
+    """
+    Recomputes the rows queued by mark_dirty, one batch at a time. A failed
+    batch is put back for the next run.
+    """
+    batch_size = batch_size or settings.PERFORMANCE_FLUSH_BATCH_SIZE
+    client = get_redis()
+    refreshed = 0
+    while True:
+        members = [member.decode() for member in client.spop(PERFORMANCE_DIRTY_KEY, batch_size) or []]
+        if not members:
+            break
+        keys = set()
+        for member in members:
+            user_id, day = member.split(':', 1)
+            keys.add((int(user_id), datetime.strptime(day, '%Y-%m-%d').date()))
+        try:
+            with transaction.atomic():
+                refreshed += refresh_days(keys)
+        except Exception:
+            try:
+                client.sadd(PERFORMANCE_DIRTY_KEY, *members)
+            except RedisError:
+                logger.exception('Could not requeue %d performance entries', len(members))
+            raise
+        if len(members) < batch_size:
+            break
+    return refreshed
+
+
+def rebuild_performance(days=None, chunk_days=90):
+    """
+    Recomputes every rollup row for the last `days` days (all history when
+    0), PERFORMANCE_REBUILD_DAYS by default, and deletes rows whose activity
+    has gone. Catches anything the incremental path missed.
+    Returns (rows written, rows deleted).
+    """
+    from contracts.models import Contract
+    from payments.models import Transaction
+    from quotes.models import Quote
+
+    days = settings.PERFORMANCE_REBUILD_DAYS if days is None else days
+    today = timezone.localdate()
+    if days:
+        first = today - timedelta(days=days - 1)
+    else:
+        candidates = (
+            Transaction.objects.filter(status='COMPLETED').aggregate(oldest=Min('created_at'))['oldest'],
+            Contract.objects.filter(status='SIGNED').aggregate(oldest=Min('signed_at'))['oldest'],
+            Quote.objects.aggregate(oldest=Min('created_at'))['oldest'],
+        )
+        oldest = [moment for moment in candidates if moment is not None]
+        first = timezone.localdate(min(oldest)) if oldest else today
+
+    written = deleted = 0
+    while first <= today:
+        last = min(first + timedelta(days=chunk_days - 1), today)
+        started = timezone.now()
+        with transaction.atomic():
+            written += upsert_days(aggregate_days(first, last))
+            # Every row still active was just upserted with a new updated_at.
+            deleted += UserPerformanceDaily.objects.filter(
+                date__gte=first, date__lte=last, updated_at__lt=started
+            ).delete()[0]
+        first = last + timedelta(days=1)
+    return written, deleted
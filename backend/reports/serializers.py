@@ -30,4 +30,17 @@ class FinancialSummarySerializer(serializers.Serializer):
     total_credits = serializers.DecimalField(max_digits=15, decimal_places=2)
     total_debits = serializers.DecimalField(max_digits=15, decimal_places=2)
     net_balance = serializers.DecimalField(max_digits=15, decimal_places=2)
-    last_updated = serializers.DateTimeField()
\ No newline at end of file
+    last_updated = serializers.DateTimeField()
+
+class UserPerformanceSerializer(serializers.Serializer):
+    """Reads the totals annotated by UserPerformanceView."""
+    user_id = serializers.IntegerField(source='id')
+    username = serializers.CharField()
+    first_name = serializers.CharField()
+    last_name = serializers.CharField()
+    total_revenue = serializers.DecimalField(max_digits=15, decimal_places=2)
+    transaction_count = serializers.IntegerField()
+    contracts_signed = serializers.IntegerField()
+    quotes_sent = serializers.IntegerField()
+    last_activity = serializers.DateTimeField(allow_null=True)
+    last_login = serializers.DateTimeField(allow_null=True)
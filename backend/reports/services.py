@@ -0,0 +1,223 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+from redis.exceptions import RedisError
+from utils.redis_client import get_redis
+from utils.timewindow import days_ago
+from .models import DailyTransactionFact, DashboardCache
+from .serializers import DashboardSummarySerializer, RevenueChartSerializer, TransactionTrendSerializer
+
+logger = logging.getLogger(__name__)
+
+# Admin payloads are the same for every admin and are cached once under
+# this scope; staff payloads are cached per user.
+ADMIN_SCOPE = 'admin'
+
+
+def dashboard_summary(user):
+    """Dashboard totals. `user` is a staff user, or None for the admin view."""
+    from audit.models import UserSession
+    from contracts.models import Contract, Invoice
+    from payments.models import Transaction
+    from payouts.models import Payout
+
+    if user is None:
+        transaction_filter = Q(status='COMPLETED')
+        payout_filter = Q(status='COMPLETED')
+        contracts = Contract.objects.all()
+        invoices = Invoice.objects.all()
+    else:
+        transaction_filter = Q(status='COMPLETED', user=user)
+        payout_filter = Q()  # Staff can't see payouts
+        contracts = Contract.objects.filter(created_by=user)
+        invoices = Invoice.objects.filter(contract__created_by=user)
+
+    data = {
+        'total_revenue': Transaction.objects.filter(transaction_filter).aggregate(total=Sum('amount'))['total'] or 0,
+        'total_transactions': Transaction.objects.filter(transaction_filter).count(),
+        'total_payouts': Payout.objects.filter(payout_filter).aggregate(total=Sum('amount'))['total'] or 0,
+        'active_users': UserSession.objects.filter(is_active=True).values('user').distinct().count(),
+        'pending_contracts': contracts.filter(status__in=['SENT', 'VIEWED']).count(),
+        'overdue_invoices': invoices.filter(status='PENDING', due_date__lt=timezone.now()).count(),
+    }
+    return DashboardSummarySerializer(data).data
+
+
+def revenue_chart(user, days):
+    """Completed revenue per day for the last `days` days, from DailyTransactionFact."""
+    facts = DailyTransactionFact.objects.filter(status='COMPLETED', date__gte=days_ago(days))
+    if user is not None:
+        facts = facts.filter(user=user)
+
+    revenue_data = facts.values('date').annotate(
+        amount=Sum('total_amount'),
+        transaction_count=Sum('count')
+    ).order_by('date')
+    return RevenueChartSerializer(revenue_data, many=True).data
+
+
+def weekly_trend(user, weeks):
+    """
+    Completed revenue for the latest `weeks` weeks with data, oldest first,
+    each with the change from the week before it.
+    """
+    facts = DailyTransactionFact.objects.filter(status='COMPLETED')
+    if user is not None:
+        facts = facts.filter(user=user)
+
+    # One week more than shown, for the first shown week's change.
+    weekly_data = list(facts.annotate(
+        week=TruncWeek('date')
+    ).values('week').annotate(
+        amount=Sum('total_amount')
+    ).order_by('-week')[:weeks + 1])
+    weekly_data.reverse()
+
+    # Calculate percentage change
+    data = []
+    prev_amount = None
+    for item in weekly_data:
+        percentage_change = 0
+        if prev_amount and prev_amount > 0:
+            percentage_change = ((item['amount'] - prev_amount) / prev_amount) * 100
+        data.append({
+            'label': item['week'].strftime('%Y-%m-%d'),
+            'value': item['amount'] or 0,
+            'percentage_change': round(percentage_change, 2)
+        })
+        prev_amount = item['amount']
+    return TransactionTrendSerializer(data[-weeks:], many=True).data
+
+
+# kind -> (compute(user, param), default param precomputed by the beat task)
+DASHBOARD_KINDS = {
+    'summary': (lambda user, param: dashboard_summary(user), None),
+    'revenue_chart': (revenue_chart, 7),
+    'weekly_trend': (weekly_trend, 4),
+}
+
+
+def dashboard_scope(user):
+    return ADMIN_SCOPE if user is None or user.role == 'ADMIN' else f'user:{user.id}'
+
+
+def dashboard_key(kind, scope, param=None):
+    key = f'dashboard:{scope}:{kind}'
+    return key if param is None else f'{key}:{param}'
+
+
+def parse_dashboard_key(key):
+    """(kind, scope user or None, param) for a key made by dashboard_key."""
+    parts = key.split(':')
+    if parts[1] == ADMIN_SCOPE:
+        user, rest = None, parts[2:]
+    else:
+        user, rest = get_user_model().objects.get(id=int(parts[2])), parts[3:]
+    kind = rest[0]
+    param = int(rest[1]) if len(rest) > 1 else None
+    return kind, user, param
+
+
+def compute_entry(kind, user, param=None):
+    compute, _ = DASHBOARD_KINDS[kind]
+    return compute(None if user is None or user.role == 'ADMIN' else user, param)
+
+
+def store_entries(entries):
+    """
+    Saves {key: (scope user or None, data)} with one
+    INSERT ... ON CONFLICT (cache_key) DO UPDATE.
+    """
+    expires_at = timezone.now() + timedelta(seconds=settings.DASHBOARD_CACHE_TTL)
+    DashboardCache.objects.bulk_create(
+        [
+            DashboardCache(cache_key=key, user=user, cache_data=data, expires_at=expires_at, is_valid=True)
+            for key, (user, data) in entries.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['cache_key'],
+        update_fields=['user', 'cache_data', 'expires_at', 'is_valid'],
+    )
+
+
+def get_dashboard_data(kind, user, param=None):
+    """
+    Serves a dashboard payload from DashboardCache. A fresh entry is
+    returned as is. An expired one is still returned for up to
+    DASHBOARD_CACHE_MAX_STALE seconds while a background task recomputes it
+    (stale-while-revalidate). Anything older, missing or invalidated is
+    computed in the request.
+    """
+    scope = dashboard_scope(user)
+    key = dashboard_key(kind, scope, param)
+    entry = DashboardCache.objects.filter(cache_key=key, is_valid=True).only('cache_data', 'expires_at').first()
+    now = timezone.now()
+    if entry is not None:
+        if entry.expires_at > now:
+            return entry.cache_data
+        if now - entry.expires_at <= timedelta(seconds=settings.DASHBOARD_CACHE_MAX_STALE):
+            schedule_refresh(key)
+            return entry.cache_data
+
+    scope_user = None if scope == ADMIN_SCOPE else user
+    data = compute_entry(kind, scope_user, param)
+    store_entries({key: (scope_user, data)})
+    return data
+
+
+def refresh_lock_key(key):
+    return f'dashboard:refresh:{key}'
+
+
+def schedule_refresh(key):
+    """
+    Queues one background recomputation per stale entry; the Redis lock
+    keeps concurrent requests from queueing duplicates.
+    """
+    from .tasks import refresh_dashboard_entry
+
+    try:
+        acquired = get_redis().set(refresh_lock_key(key), 1, nx=True, ex=settings.DASHBOARD_REFRESH_LOCK_TTL)
+    except RedisError as e:
+        # The stale entry is still served; the beat task refreshes it.
+        logger.warning('Could not schedule dashboard refresh for %s: %s', key, e)
+        return
+    if acquired:
+        transaction.on_commit(lambda: refresh_dashboard_entry.delay(key))
+
+
+def refresh_entry(key):
+    try:
+        kind, user, param = parse_dashboard_key(key)
+        store_entries({key: (user, compute_entry(kind, user, param))})
+    finally:
+        try:
+            get_redis().delete(refresh_lock_key(key))
+        except RedisError:
+            pass
+
+
+def precompute_dashboards():
+    """
+    Computes the default payload of every dashboard kind for the admin
+    scope and for each staff user who logged in within
+    DASHBOARD_PRECOMPUTE_ACTIVE_DAYS. Returns the number of entries written.
+    """
+    User = get_user_model()
+    since = timezone.now() - timedelta(days=settings.DASHBOARD_PRECOMPUTE_ACTIVE_DAYS)
+    scopes = [None] + list(User.objects.filter(role='STAFF', is_active=True, last_login__gte=since))
+
+    written = 0
+    for user in scopes:
+        entries = {}
+        for kind, (_, default) in DASHBOARD_KINDS.items():
+            key = dashboard_key(kind, dashboard_scope(user), default)
+            entries[key] = (user, compute_entry(kind, user, default))
+        store_entries(entries)
+        written += len(entries)
+    return written
@@ -1,8 +1,28 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from .models import DashboardCache
+from .performance import mark_dirty
+from contracts.models import Contract
+from payments.models import Transaction
+from quotes.models import Quote
 
 @receiver(post_delete, sender=DashboardCache)
 def log_cache_deletion(sender, instance, **kwargs):
     # Optional: Log cache invalidation
-    pass
\ No newline at end of file
+    pass
+
+@receiver(post_save, sender=Transaction)
+def refresh_transaction_performance(sender, instance, created, update_fields=None, **kwargs):
+    # Any status change moves the day's transaction facts, not only completion.
+    if created or update_fields is None or 'status' in update_fields:
+        mark_dirty(instance.user_id, instance.created_at)
+
+@receiver(post_save, sender=Contract)
+def refresh_contract_performance(sender, instance, created, update_fields=None, **kwargs):
+    if instance.status == 'SIGNED' and (update_fields is None or 'status' in update_fields):
+        mark_dirty(instance.created_by_id, instance.signed_at)
+
+@receiver(post_save, sender=Quote)
+def refresh_quote_performance(sender, instance, created, **kwargs):
+    if created:
+        mark_dirty(instance.created_by_id, instance.created_at)
@@ -8,16 +8,33 @@ from users.models import User
 @shared_task
 def refresh_dashboard_cache():
     """
-    Periodically refreshes dashboard cache for performance.
+    Precomputes the admin dashboard and each recently active staff user's
+    dashboard into DashboardCache. Only one refresh runs at a time.
     """
+    from django.conf import settings
+    from utils.redis_client import get_redis, release_lock
+    from .services import precompute_dashboards
+
+    lock = get_redis().lock('dashboard:precompute', timeout=settings.DASHBOARD_REFRESH_LOCK_TTL)
+    if not lock.acquire(blocking=False):
+        return {'status': 'success', 'skipped': True}
+    try:
+        return {'status': 'success', 'entries': precompute_dashboards()}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+    finally:
+        release_lock(lock)
+
+@shared_task
+def refresh_dashboard_entry(cache_key):
+    """
+    Recomputes one stale dashboard entry in the background.
+    """
+    from .services import refresh_entry
+
     try:
-        # Invalidate old caches
-        DashboardCache.objects.filter(expires_at__lt=timezone.now()).update(is_valid=False)
-        
-        # Could pre-compute common queries here
-        # For now, we compute on-demand in views
-        
-        return {'status': 'success', 'message': 'Dashboard cache refreshed'}
+        refresh_entry(cache_key)
+        return {'status': 'success', 'cache_key': cache_key}
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
@@ -31,4 +48,51 @@ def cleanup_old_cache():
         deleted, _ = DashboardCache.objects.filter(expires_at__lt=cutoff).delete()
         return {'status': 'success', 'deleted_count': deleted}
     except Exception as e:
-        return {'status': 'error', 'message': str(e)}
\ No newline at end of file
+        return {'status': 'error', 'message': str(e)}
+@shared_task
+def refresh_user_performance():
+    """
+    Recomputes the staff leaderboard rows queued by status changes. Only one
+    refresh runs at a time.
+    """
+    from django.conf import settings
+    from utils.redis_client import get_redis, release_lock
+    from .performance import flush_dirty
+
+    lock = get_redis().lock('performance:flush', timeout=settings.PERFORMANCE_FLUSH_LOCK_TTL)
+    if not lock.acquire(blocking=False):
+        return {'status': 'success', 'skipped': True}
+    try:
+        return {'status': 'success', 'refreshed': flush_dirty()}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+    finally:
+        release_lock(lock)
+
+@shared_task
+def rebuild_user_performance(days=None):
+    """
+    Nightly rebuild of the staff leaderboard rollup from the source tables.
+    """
+    from .performance import rebuild_performance
+
+    try:
+        written, deleted = rebuild_performance(days)
+        return {'status': 'success', 'written': written, 'deleted': deleted}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+
+@shared_task
+def rebuild_daily_facts(days=None):
+    """
+    Nightly rebuild of the recent days of the chart fact tables, which
+    repairs any update the incremental path missed.
+    """
+    from django.conf import settings
+    from .facts import rebuild_facts
+
+    try:
+        transaction_rows, audit_rows = rebuild_facts(settings.FACTS_REBUILD_DAYS if days is None else days)
+        return {'status': 'success', 'transaction_rows': transaction_rows, 'audit_rows': audit_rows}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
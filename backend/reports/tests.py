@@ -1,3 +1,249 @@
-from django.test import TestCase
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import skipUnless
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction as db_transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from audit.models import AuditLog
+from audit.partitions import ensure_partitions_between, is_partitioned, partition_name
+from payments.models import LedgerAccount, LedgerEntry, Transaction
+from utils.benchmark import EndpointBudgetMixin
+from utils.helpers import validate_reference_code
+from utils.seeding import PortalSeeder
+from utils.timewindow import date_window, day_bounds, filter_window, positive_int
+from .models import DailyTransactionFact
+from .services import weekly_trend
 
-# Create your tests here.
+User = get_user_model()
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+class TimeWindowTests(SimpleTestCase):
+    def test_day_bounds_are_local_days(self):
+        # Africa/Nairobi is UTC+3.
+        start, end = day_bounds(date(2026, 9, 1), date(2026, 9, 2))
+        self.assertEqual(start, datetime(2026, 8, 31, 21, tzinfo=dt_timezone.utc))
+        self.assertEqual(end, datetime(2026, 9, 2, 21, tzinfo=dt_timezone.utc))
+
+    def test_day_bounds_open_ends(self):
+        self.assertEqual(day_bounds(None, None), (None, None))
+        self.assertIsNone(day_bounds(date(2026, 9, 1), None)[1])
+
+    def test_date_window(self):
+        self.assertEqual(
+            date_window({'start_date': '2026-09-01', 'end_date': '2026-09-30'}),
+            (date(2026, 9, 1), date(2026, 9, 30))
+        )
+        self.assertEqual(date_window({}), (None, None))
+        with self.assertRaises(ValidationError):
+            date_window({'start_date': '01/09/2026'})
+        with self.assertRaises(ValidationError):
+            date_window({'start_date': '2026-09-30', 'end_date': '2026-09-01'})
+
+    def test_positive_int(self):
+        self.assertEqual(positive_int({}, 'days', 7, maximum=366), 7)
+        self.assertEqual(positive_int({'days': '30'}, 'days', 7, maximum=366), 30)
+        for value in ('abc', '0', '367'):
+            with self.assertRaises(ValidationError):
+                positive_int({'days': value}, 'days', 7, maximum=366)
+
+
+@override_settings(API_CACHE_ENABLED=False)
+class TransactionReportWindowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            'report-staff', 'report-staff@example.com', 'x', role='STAFF', phone_number='254700000901'
+        )
+        tz = timezone.get_current_timezone()
+        for moment in (
+            datetime(2026, 8, 31, 23, 30),  # previous local day
+            datetime(2026, 9, 1, 0, 15),
+            datetime(2026, 9, 1, 23, 45),
+            datetime(2026, 9, 2, 0, 5),  # next local day
+        ):
+            transaction = Transaction.objects.create(
+                user=cls.staff, amount=100, payment_method='MPESA', status='COMPLETED'
+            )
+            Transaction.objects.filter(pk=transaction.pk).update(created_at=timezone.make_aware(moment, tz))
+
+    def test_report_counts_whole_local_days(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get('/api/reports/reports/transactions/', {
+            'start_date': '2026-09-01', 'end_date': '2026-09-01'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_count'], 2)
+
+    def test_report_rejects_bad_dates(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get('/api/reports/reports/transactions/', {'start_date': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+class WeeklyTrendTests(TestCase):
+    def test_returns_latest_weeks(self):
+        user = User.objects.create_user(
+            'trend-staff', 'trend-staff@example.com', 'x', role='STAFF', phone_number='254700990301'
+        )
+        # Six Mondays of facts, 100, 200, ... 600.
+        for index in range(6):
+            DailyTransactionFact.objects.create(
+                date=date(2026, 8, 3) + timedelta(weeks=index), user=user, payment_method='MPESA',
+                status='COMPLETED', total_amount=100 * (index + 1), count=1,
+            )
+        data = weekly_trend(user, 4)
+        self.assertEqual([row['label'] for row in data], ['2026-08-17', '2026-08-24', '2026-08-31', '2026-09-07'])
+        self.assertEqual(data[0]['percentage_change'], 50.0)
+        self.assertEqual(data[-1]['percentage_change'], 20.0)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN checks need PostgreSQL')
+class TimeWindowIndexTests(TestCase):
+    """
+    EXPLAIN the report filters with sequential scans disabled: a window
+    on the raw column must become an index condition, which the
+    __date lookups it replaces never can.
+    """
+    window = (date(2026, 9, 1), date(2026, 9, 30))
+    # Local days in Africa/Nairobi (UTC+3): the window starts on 31 August UTC.
+    window_months = (
+        datetime(2026, 8, 1, tzinfo=dt_timezone.utc),
+        datetime(2026, 9, 1, tzinfo=dt_timezone.utc),
+    )
+    models = (
+        (Transaction, 'created_at'),
+        (LedgerEntry, 'created_at'),
+        (AuditLog, 'timestamp'),
+    )
+
+    def explain(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain(format='json')
+        return json.loads(plan)[0]['Plan'] if isinstance(plan, str) else plan[0]['Plan']
+
+    def index_conditions(self, plan):
+        return [
+            node.get('Index Cond', '') for node in plan_nodes(plan)
+            if node['Node Type'] in ('Index Scan', 'Index Only Scan', 'Bitmap Index Scan')
+        ]
+
+    def test_window_uses_an_index(self):
+        for model, field in self.models:
+            with self.subTest(model=model.__name__):
+                plan = self.explain(filter_window(model.objects.all(), field, *self.window))
+                self.assertTrue(any(field in cond for cond in self.index_conditions(plan)), plan)
+
+    def test_date_lookup_cannot_use_an_index(self):
+        for model, field in self.models:
+            with self.subTest(model=model.__name__):
+                plan = self.explain(model.objects.filter(**{f'{field}__date__gte': self.window[0]}))
+                self.assertFalse(any(field in cond for cond in self.index_conditions(plan)), plan)
+
+    def test_window_uses_brin_index(self):
+        # The window's months get their own partitions (rolled back with the
+        # test transaction), as ensure_partitions provides in production.
+        ensure_partitions_between(*day_bounds(*self.window))
+        for model, field in self.models:
+            with self.subTest(model=model.__name__):
+                table = model._meta.db_table
+                # With the btree indexes on the column dropped (rolled back
+                # with the test transaction) the BRIN index must serve it.
+                with connection.cursor() as cursor:
+                    partitioned = is_partitioned(cursor, table)
+                    cursor.execute(
+                        "SELECT indexname FROM pg_indexes WHERE tablename = %s AND indexdef ~ %s "
+                        "AND indexname NOT IN (SELECT conname FROM pg_constraint)",
+                        [table, rf'USING btree .*\m{field}\M']
+                    )
+                    for (name,) in cursor.fetchall():
+                        cursor.execute(f'DROP INDEX "{name}"')
+                plan = self.explain(filter_window(model.objects.all(), field, *self.window))
+                if partitioned:
+                    # Pruning to the window's months is what serves it; within
+                    # them the planner may pick BRIN or the (id, timestamp) key.
+                    scanned = {node['Relation Name'] for node in plan_nodes(plan) if 'Relation Name' in node}
+                    self.assertEqual(scanned, {partition_name(table, month) for month in self.window_months}, plan)
+                    continue
+                names = [node['Index Name'] for node in plan_nodes(plan) if 'Index Name' in node]
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT DISTINCT am.amname FROM pg_class c JOIN pg_am am ON am.oid = c.relam "
+                        "WHERE c.relname = ANY(%s)",
+                        [names]
+                    )
+                    methods = [row[0] for row in cursor.fetchall()]
+                self.assertEqual(methods, ['brin'], plan)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'seed_portal loads rows with COPY')
+class SeedPortalTests(TestCase):
+    window = (date(2026, 9, 1), date(2026, 9, 30))
+
+    def seed(self, seed=3):
+        return PortalSeeder(scale=0.002, days=30, end=self.window[1], seed=seed).run()
+
+    def seeded(self, model):
+        # The test database may hold rows of its own; the seeded ones belong to seed- users.
+        return model.objects.filter(user__username__startswith='seed-')
+
+    def test_ledger_is_consistent(self):
+        before, _ = LedgerAccount.objects.get_or_create(code='MAIN')
+        existing = LedgerEntry.objects.values_list('id', flat=True)
+        last_id = max(existing, default=0)
+        written = self.seed()
+        self.assertEqual(written['transactions'], 200)
+        account = LedgerAccount.objects.get(code='MAIN')
+        entries = LedgerEntry.objects.filter(id__gt=last_id).order_by('id')
+        self.assertEqual(entries.count(), written['ledger_entries'])
+        self.assertEqual(account.entry_count, before.entry_count + written['ledger_entries'])
+        running = {'CREDIT': before.total_credits, 'DEBIT': before.total_debits}
+        for entry in entries:
+            running[entry.entry_type] += entry.amount
+            self.assertEqual(entry.balance_after, running[entry.entry_type])
+        self.assertEqual((account.total_credits, account.total_debits), (running['CREDIT'], running['DEBIT']))
+        self.assertEqual(account.net_balance, account.total_credits - account.total_debits)
+        completed = self.seeded(Transaction).filter(status='COMPLETED')
+        self.assertEqual(entries.filter(transaction__in=completed).count(), completed.count())
+
+    def test_codes_are_unique_and_well_formed(self):
+        self.seed()
+        self.seed(seed=4)
+        codes = list(self.seeded(Transaction).values_list('reference_code', flat=True))
+        self.assertEqual(len(codes), 400)
+        self.assertEqual(len(set(codes)), len(codes))
+        self.assertTrue(all(validate_reference_code(code, 'DP') for code in codes))
+
+    def test_timestamps_fall_in_the_window(self):
+        self.seed()
+        start, end = day_bounds(*self.window)
+        for model, field in ((Transaction, 'created_at'), (AuditLog, 'timestamp')):
+            queryset = self.seeded(model)
+            self.assertTrue(queryset.exists())
+            self.assertFalse(queryset.exclude(**{f'{field}__gte': start, f'{field}__lt': end}).exists())
+
+    def test_same_seed_same_rows(self):
+        def rows():
+            with db_transaction.atomic():
+                self.seed()
+                data = list(self.seeded(Transaction).order_by('created_at').values_list(
+                    'user__username', 'reference_code', 'amount', 'status', 'created_at'
+                ))
+                db_transaction.set_rollback(True)
+            return data
+        self.assertEqual(rows(), rows())
+
+
+class ReportEndpointBudgetTests(EndpointBudgetMixin, TestCase):
+    app = 'reports'
@@ -2,7 +2,7 @@ from django.urls import path
 from .views import (
     DashboardSummaryView, RevenueChartView, WeeklyTrendView,
     UserActivityChartView, FinancialSummaryView, TransactionReportView,
-    UserPerformanceView
+    UserPerformanceView, CacheStatsView
 )
 
 urlpatterns = [
@@ -13,4 +13,5 @@ urlpatterns = [
     path('financial/summary/', FinancialSummaryView.as_view(), name='financial-summary'),
     path('reports/transactions/', TransactionReportView.as_view(), name='transaction-report'),
     path('reports/user-performance/', UserPerformanceView.as_view(), name='user-performance'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
 ]
\ No newline at end of file
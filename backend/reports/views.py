@@ -2,21 +2,19 @@ from rest_framework import views, status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum, Count, Q, F, Max, Value, DecimalField
 from django.utils import timezone
-from datetime import timedelta, datetime
-from .serializers import (
-    DashboardSummarySerializer, RevenueChartSerializer,
-    TransactionTrendSerializer, UserActivitySerializer,
-    FinancialSummarySerializer
-)
+from datetime import datetime
+from rest_framework.filters import OrderingFilter
+from .serializers import UserActivitySerializer, FinancialSummarySerializer, UserPerformanceSerializer
+from .services import get_dashboard_data
+from utils.cache import cache_response, cache_stats, reset_cache_stats
+from utils.timewindow import date_window, days_ago, filter_window, positive_int
+from .models import DailyAuditFact, DailyTransactionFact
 from .permissions import IsAdmin, IsStaff
-from payments.models import Transaction, LedgerEntry
-from payouts.models import Payout
-from contracts.models import Contract, Invoice
-from users.models import User
-from audit.models import AuditLog, UserSession
-from django.db.models.functions import TruncDate, TruncWeek
+from payments.models import Transaction, LedgerAccount
+from payments.ledger import DEFAULT_ACCOUNT
+from django.db.models.functions import Coalesce
 
 User = get_user_model()
 
@@ -24,154 +22,47 @@ class DashboardSummaryView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        today = timezone.now().date()
-        start_of_week = today - timedelta(days=today.weekday())
-
-        # Role-based filtering
-        if user.role == 'ADMIN':
-            transaction_filter = Q(status='COMPLETED')
-            payout_filter = Q(status='COMPLETED')
-            user_filter = Q()
-        else:
-            transaction_filter = Q(status='COMPLETED', user=user)
-            payout_filter = Q()  # Staff can't see payouts
-            user_filter = Q(id=user.id)
-
-        # Calculate metrics
-        total_revenue = Transaction.objects.filter(transaction_filter).aggregate(total=Sum('amount'))['total'] or 0
-        total_transactions = Transaction.objects.filter(transaction_filter).count()
-        total_payouts = Payout.objects.filter(payout_filter).aggregate(total=Sum('amount'))['total'] or 0
-        active_users = UserSession.objects.filter(is_active=True).values('user').distinct().count()
-        pending_contracts = Contract.objects.filter(status__in=['SENT', 'VIEWED']).count() if user.role == 'ADMIN' else Contract.objects.filter(created_by=user, status__in=['SENT', 'VIEWED']).count()
-        overdue_invoices = Invoice.objects.filter(status='PENDING', due_date__lt=timezone.now()).count() if user.role == 'ADMIN' else Invoice.objects.filter(contract__created_by=user, status='PENDING', due_date__lt=timezone.now()).count()
-
-        data = {
-            'total_revenue': total_revenue,
-            'total_transactions': total_transactions,
-            'total_payouts': total_payouts,
-            'active_users': active_users,
-            'pending_contracts': pending_contracts,
-            'overdue_invoices': overdue_invoices,
-        }
-
-        return Response(DashboardSummarySerializer(data).data)
+        # Precomputed by reports.tasks.refresh_dashboard_cache; see reports.services.
+        return Response(get_dashboard_data('summary', request.user))
 
 class RevenueChartView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        days = int(request.query_params.get('days', 7))
-        start_date = timezone.now().date() - timedelta(days=days)
-
-        if user.role == 'ADMIN':
-            transaction_filter = Q(status='COMPLETED', created_at__date__gte=start_date)
-        else:
-            transaction_filter = Q(status='COMPLETED', user=user, created_at__date__gte=start_date)
-
-        revenue_data = Transaction.objects.filter(transaction_filter).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            amount=Sum('amount'),
-            transaction_count=Count('id')
-        ).order_by('date')
-
-        serializer = RevenueChartSerializer(revenue_data, many=True)
-        return Response(serializer.data)
+        days = positive_int(request.query_params, 'days', 7, maximum=366)
+        return Response(get_dashboard_data('revenue_chart', request.user, days))
 
 class WeeklyTrendView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        weeks = int(request.query_params.get('weeks', 4))
-
-        if user.role == 'ADMIN':
-            transaction_filter = Q(status='COMPLETED')
-        else:
-            transaction_filter = Q(status='COMPLETED', user=user)
-
-        weekly_data = Transaction.objects.filter(transaction_filter).annotate(
-            week=TruncWeek('created_at')
-        ).values('week').annotate(
-            amount=Sum('amount')
-        ).order_by('week')[:weeks]
-
-        # Calculate percentage change
-        data = []
-        prev_amount = None
-        for item in weekly_data:
-            percentage_change = 0
-            if prev_amount and prev_amount > 0:
-                percentage_change = ((item['amount'] - prev_amount) / prev_amount) * 100
-            data.append({
-                'label': item['week'].strftime('%Y-%m-%d'),
-                'value': item['amount'] or 0,
-                'percentage_change': round(percentage_change, 2)
-            })
-            prev_amount = item['amount']
-
-        serializer = TransactionTrendSerializer(data, many=True)
-        return Response(serializer.data)
+        weeks = positive_int(request.query_params, 'weeks', 4, maximum=104)
+        return Response(get_dashboard_data('weekly_trend', request.user, weeks))
 
 class UserActivityChartView(views.APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        days = int(request.query_params.get('days', 7))
-        start_date = timezone.now().date() - timedelta(days=days)
-
-        # Login activity
-        login_data = AuditLog.objects.filter(
-            action='LOGIN',
-            timestamp__date__gte=start_date
-        ).annotate(
-            date=TruncDate('timestamp')
-        ).values('date').annotate(
-            logins=Count('id')
-        ).order_by('date')
-
-        # Transaction activity
-        transaction_data = Transaction.objects.filter(
-            created_at__date__gte=start_date
-        ).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            transactions=Count('id')
-        ).order_by('date')
-
-        # Contract signing activity
-        contract_data = AuditLog.objects.filter(
-            action='CONTRACT_SIGNED',
-            timestamp__date__gte=start_date
-        ).annotate(
-            date=TruncDate('timestamp')
-        ).values('date').annotate(
-            contracts_signed=Count('id')
-        ).order_by('date')
-
-        # Merge data by date
-        all_dates = set()
-        for item in login_data:
-            all_dates.add(item['date'])
-        for item in transaction_data:
-            all_dates.add(item['date'])
-        for item in contract_data:
-            all_dates.add(item['date'])
-
-        data = []
-        for date in sorted(all_dates):
-            logins = next((item['logins'] for item in login_data if item['date'] == date), 0)
-            transactions = next((item['transactions'] for item in transaction_data if item['date'] == date), 0)
-            contracts_signed = next((item['contracts_signed'] for item in contract_data if item['date'] == date), 0)
-            data.append({
-                'date': date,
-                'logins': logins,
-                'transactions': transactions,
-                'contracts_signed': contracts_signed
-            })
-
+        days = positive_int(request.query_params, 'days', 7, maximum=366)
+        start_date = days_ago(days)
+
+        # Read from the daily fact tables maintained by reports.facts.
+        activity = {}
+        audit_facts = DailyAuditFact.objects.filter(
+            date__gte=start_date, action__in=['LOGIN', 'CONTRACT_SIGNED']
+        ).values_list('date', 'action', 'count')
+        for date, action, count in audit_facts:
+            day = activity.setdefault(date, {'date': date, 'logins': 0, 'transactions': 0, 'contracts_signed': 0})
+            day['logins' if action == 'LOGIN' else 'contracts_signed'] += count
+
+        transaction_facts = DailyTransactionFact.objects.filter(
+            date__gte=start_date
+        ).values('date').annotate(transactions=Sum('count')).order_by()
+        for item in transaction_facts:
+            day = activity.setdefault(item['date'], {'date': item['date'], 'logins': 0, 'transactions': 0, 'contracts_signed': 0})
+            day['transactions'] = item['transactions']
+
+        data = [activity[date] for date in sorted(activity)]
         serializer = UserActivitySerializer(data, many=True)
         return Response(serializer.data)
 
@@ -179,16 +70,15 @@ class FinancialSummaryView(views.APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        total_credits = LedgerEntry.objects.filter(entry_type='CREDIT').aggregate(total=Sum('amount'))['total'] or 0
-        total_debits = LedgerEntry.objects.filter(entry_type='DEBIT').aggregate(total=Sum('amount'))['total'] or 0
-        net_balance = total_credits - total_debits
-        last_updated = LedgerEntry.objects.order_by('-created_at').values_list('created_at', flat=True).first()
+        # Totals are maintained by payments.ledger on every append; audit them
+        # with `manage.py verify_ledger_totals`.
+        account = LedgerAccount.objects.filter(code=DEFAULT_ACCOUNT).first()
 
         data = {
-            'total_credits': total_credits,
-            'total_debits': total_debits,
-            'net_balance': net_balance,
-            'last_updated': last_updated or timezone.now()
+            'total_credits': account.total_credits if account else 0,
+            'total_debits': account.total_debits if account else 0,
+            'net_balance': account.net_balance if account else 0,
+            'last_updated': (account.last_entry_at if account else None) or timezone.now()
         }
 
         return Response(FinancialSummarySerializer(data).data)
@@ -196,10 +86,10 @@ class FinancialSummaryView(views.APIView):
 class TransactionReportView(views.APIView):
     permission_classes = [IsAuthenticated]
 
+    @cache_response(('transactions',))
     def get(self, request):
         user = request.user
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
+        start_date, end_date = date_window(request.query_params)
         status_filter = request.query_params.get('status')
         payment_method = request.query_params.get('payment_method')
 
@@ -208,10 +98,8 @@ class TransactionReportView(views.APIView):
         else:
             queryset = Transaction.objects.filter(user=user)
 
-        if start_date:
-            queryset = queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(created_at__date__lte=end_date)
+        # Local days as created_at ranges, so the created_at indexes apply.
+        queryset = filter_window(queryset, 'created_at', start_date, end_date)
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         if payment_method:
@@ -237,30 +125,50 @@ class TransactionReportView(views.APIView):
 
         return Response(data)
 
-class UserPerformanceView(views.APIView):
+class UserPerformanceView(generics.ListAPIView):
+    """
+    Staff leaderboard read from the UserPerformanceDaily rollup in one
+    grouped query. ?start_date= / ?end_date= (YYYY-MM-DD) limit the window;
+    ?ordering= sorts by any total.
+    """
+    serializer_class = UserPerformanceSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+    filter_backends = [OrderingFilter]
+    ordering_fields = [
+        'total_revenue', 'transaction_count', 'contracts_signed', 'quotes_sent',
+        'last_activity', 'last_login', 'username',
+    ]
+    ordering = ['-total_revenue', 'id']
+
+    def get_queryset(self):
+        first, last = date_window(self.request.query_params)
+        window = Q()
+        if first:
+            window &= Q(performance_days__date__gte=first)
+        if last:
+            window &= Q(performance_days__date__lte=last)
+
+        zero = Value(0)
+        return User.objects.filter(role='STAFF').annotate(
+            total_revenue=Coalesce(
+                Sum('performance_days__revenue', filter=window), Value(0), output_field=DecimalField()
+            ),
+            transaction_count=Coalesce(Sum('performance_days__transactions_completed', filter=window), zero),
+            contracts_signed=Coalesce(Sum('performance_days__contracts_signed', filter=window), zero),
+            quotes_sent=Coalesce(Sum('performance_days__quotes_sent', filter=window), zero),
+            last_activity=Max('performance_days__last_activity_at', filter=window),
+        )
+
+class CacheStatsView(views.APIView):
+    """
+    Hit and miss counts of the cached API responses (utils.cache), in total
+    and per view. DELETE resets the counters.
+    """
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        users = User.objects.filter(role='STAFF')
-        data = []
-
-        for user in users:
-            transactions = Transaction.objects.filter(user=user, status='COMPLETED')
-            contracts = Contract.objects.filter(created_by=user, status='SIGNED')
-            quotes = Quote.objects.filter(created_by=user)
-
-            data.append({
-                'user_id': user.id,
-                'username': user.username,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'total_revenue': transactions.aggregate(total=Sum('amount'))['total'] or 0,
-                'transaction_count': transactions.count(),
-                'contracts_signed': contracts.count(),
-                'quotes_sent': quotes.count(),
-                'last_login': user.last_login
-            })
-
-        return Response(data)
+        return Response(cache_stats())
 
-from quotes.models import Quote
\ No newline at end of file
+    def delete(self, request):
+        reset_cache_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+class TelemetryConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'telemetry'
+
+    def ready(self):
+        from telemetry import task_timing, timing
+        timing.install()
+        task_timing.install()
@@ -0,0 +1,73 @@
+import json
+from django.core.management.base import BaseCommand
+from config.celery import app
+from telemetry.metrics import reset_metrics, stored_values
+from telemetry.task_timing import broker_queue_depths, task_stats
+
+SORT_KEYS = {
+    'task': lambda stats: stats['task'],
+    'runs': lambda stats: -stats['runs'],
+    'wait': lambda stats: -(stats['wait_p95'] or 0),
+    'runtime': lambda stats: -(stats['runtime_p95'] or 0),
+    'errors': lambda stats: -sum(
+        count for outcome, count in stats['outcomes'].items() if outcome in ('soft_error', 'failure')
+    ),
+}
+
+
+def seconds(value):
+    if value is None:
+        return '-'
+    return f'{value * 1000:.0f}ms' if value < 1 else f'{value:.1f}s'
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarises Celery task metrics from all workers since the last reset: runs by outcome (soft_error is a '
+        "returned {'status': 'error'}), queue wait and runtime percentiles, and current broker queue depth."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', choices=SORT_KEYS, default='wait')
+        parser.add_argument(
+            '--slow-start', type=float, default=5,
+            help='Flag tasks whose p95 queue wait is at least this many seconds'
+        )
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+        parser.add_argument('--reset', action='store_true', help='Clear all metrics (including request metrics) afterwards')
+
+    def handle(self, *args, **options):
+        stats = sorted(task_stats(stored_values()), key=SORT_KEYS[options['sort']])
+        queues = sorted({queue for row in stats for queue in row['queues']} | {app.conf.task_default_queue})
+        depths = broker_queue_depths(queues)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'tasks': stats, 'queue_depths': depths}, indent=2))
+        elif not stats:
+            self.stdout.write('No task metrics recorded yet.')
+        else:
+            self.stdout.write(
+                f'{"task":<52} {"runs":>7} {"ok":>7} {"soft err":>8} {"failed":>7} {"retried":>7} '
+                f'{"wait p50":>9} {"wait p95":>9} {"run p50":>9} {"run p95":>9}'
+            )
+            for row in stats:
+                outcomes = row['outcomes']
+                line = (
+                    f'{row["task"]:<52} {row["runs"]:>7} {outcomes.get("success", 0):>7} '
+                    f'{outcomes.get("soft_error", 0):>8} {outcomes.get("failure", 0):>7} {outcomes.get("retry", 0):>7} '
+                    f'{seconds(row["wait_p50"]):>9} {seconds(row["wait_p95"]):>9} '
+                    f'{seconds(row["runtime_p50"]):>9} {seconds(row["runtime_p95"]):>9}'
+                )
+                if (row['wait_p95'] or 0) >= options['slow_start']:
+                    line = self.style.WARNING(line + '  slow to start')
+                elif outcomes.get('failure') or outcomes.get('soft_error'):
+                    line = self.style.ERROR(line)
+                self.stdout.write(line)
+            if depths is None:
+                self.stdout.write('\nBroker unreachable; queue depth unknown.')
+            else:
+                self.stdout.write('\nQueued now: ' + ', '.join(f'{name} {count}' for name, count in depths.items()))
+
+        if options['reset']:
+            reset_metrics()
+            self.stdout.write('Metrics reset.')
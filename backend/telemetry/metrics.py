@@ -0,0 +1,205 @@
+"""
+Histograms and counters served at /metrics, shared by every web and
+Celery process through Redis.
+
+Observations are added up in process memory and written to one Redis hash
+every METRICS_FLUSH_INTERVAL seconds in a single pipeline, so recording one
+costs a dict update. render_metrics() returns the totals in the Prometheus
+text format.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from django.conf import settings
+from redis.exceptions import RedisError
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = 'metrics:values'
+# Upper bounds of the histogram buckets; +Inf is implied.
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+REGISTRY = {}
+
+
+class Metric:
+    """A histogram (with `buckets`) or a counter, with fixed label names."""
+
+    def __init__(self, name, help_text, labels, buckets=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) if buckets is not None else None
+
+    @property
+    def kind(self):
+        return 'counter' if self.buckets is None else 'histogram'
+
+    def observe(self, value, *labels):
+        """Records one value; labels in the order of `labels`."""
+        slot = bisect_left(self.buckets, value)
+        with _lock:
+            _pending[(self.name, labels, slot)] += 1
+            _pending[(self.name, labels, 'sum')] += value
+            _pending[(self.name, labels, 'count')] += 1
+
+    def inc(self, *labels, amount=1):
+        with _lock:
+            _pending[(self.name, labels, 'total')] += amount
+
+
+def histogram(name, help_text, labels, buckets=SECONDS):
+    return REGISTRY.setdefault(name, Metric(name, help_text, labels, buckets))
+
+
+def counter(name, help_text, labels):
+    return REGISTRY.setdefault(name, Metric(name, help_text, labels))
+
+
+_lock = threading.Lock()
+_pending = defaultdict(float)
+_last_flush = time.monotonic()
+
+
+def collect():
+    """Takes the observations recorded since the last call."""
+    global _pending
+    with _lock:
+        values, _pending = _pending, defaultdict(float)
+    return values
+
+
+def flush():
+    """Adds this process's pending observations to the shared totals."""
+    global _last_flush
+    _last_flush = time.monotonic()
+    values = collect()
+    if not values:
+        return 0
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for (name, labels, slot), value in values.items():
+            field = json.dumps([name, labels, slot])
+            if slot == 'sum':
+                pipe.hincrbyfloat(METRICS_KEY, field, value)
+            else:
+                pipe.hincrby(METRICS_KEY, field, int(value))
+        pipe.execute()
+    except RedisError as e:
+        # Dropped rather than kept, so an outage cannot grow memory.
+        logger.debug('Could not flush %d metric values: %s', len(values), e)
+        return 0
+    return len(values)
+
+
+def flush_due():
+    return time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL
+
+
+def maybe_flush():
+    """Flushes once METRICS_FLUSH_INTERVAL has passed since the last flush."""
+    if flush_due():
+        flush()
+
+
+def stored_values():
+    """The shared totals as {(name, labels, slot): value}."""
+    flush()
+    try:
+        raw = get_redis().hgetall(METRICS_KEY)
+    except RedisError as e:
+        logger.warning('Could not read metrics: %s', e)
+        return {}
+    values = {}
+    for field, value in raw.items():
+        name, labels, slot = json.loads(field)
+        values[(name, tuple(labels), slot)] = float(value)
+    return values
+
+
+def quantile(q, buckets, slots):
+    """
+    Estimated q-quantile (0..1) of a histogram, interpolating within the
+    bucket it falls in as Prometheus' histogram_quantile() does. None when
+    empty; the highest bound when it falls in the +Inf bucket.
+    """
+    counts = [slots.get(index, 0) for index in range(len(buckets) + 1)]
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    lower = 0
+    for bound, count in zip(buckets, counts):
+        if count and cumulative + count >= rank:
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = bound
+    return buckets[-1]
+
+
+def reset_metrics():
+    collect()
+    get_redis().delete(METRICS_KEY)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def format_metrics(values, metrics=None):
+    """Prometheus text exposition of {(name, labels, slot): value}."""
+    series = defaultdict(lambda: defaultdict(dict))
+    for (name, labels, slot), value in values.items():
+        series[name][tuple(labels)][slot] = value
+    lines = []
+    for name, metric in sorted((metrics or REGISTRY).items()):
+        if name not in series:
+            continue
+        lines.append(f'# HELP {name} {metric.help_text}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for labels, slots in sorted(series[name].items()):
+            if metric.kind == 'counter':
+                lines.append(f'{name}{_label_text(metric.labels, labels)} {_number(slots.get("total", 0))}')
+                continue
+            cumulative = 0
+            for index, bound in enumerate(metric.buckets + ('+Inf',)):
+                cumulative += slots.get(index, 0)
+                le = f'le="{bound if bound == "+Inf" else _number(bound)}"'
+                lines.append(f'{name}_bucket{_label_text(metric.labels, labels, le)} {_number(cumulative)}')
+            lines.append(f'{name}_sum{_label_text(metric.labels, labels)} {_number(slots.get("sum", 0))}')
+            lines.append(f'{name}_count{_label_text(metric.labels, labels)} {_number(slots.get("count", 0))}')
+    return '\n'.join(lines) + '\n'
+
+
+def render_metrics():
+    return format_metrics(stored_values())
+
+
+def _after_fork():
+    # Observations copied from the parent were recorded (and are flushed) there.
+    global _lock, _pending
+    _lock = threading.Lock()
+    _pending = defaultdict(float)
+
+
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(flush)
@@ -0,0 +1,123 @@
+from time import perf_counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.functional import LazyObject, empty
+from .metrics import QUERIES, counter, flush, flush_due, histogram, maybe_flush
+from .timing import RequestTiming, current_timing
+
+LABELS = ('view', 'role')
+
+REQUEST_SECONDS = histogram('portal_http_request_duration_seconds', 'Time from the first middleware to the response.', LABELS)
+VIEW_SECONDS = histogram('portal_http_view_duration_seconds', 'Time in the view, including rendering the response.', LABELS)
+DB_QUERIES = histogram('portal_http_db_queries', 'SQL queries run per request.', LABELS, buckets=QUERIES)
+DB_SECONDS = histogram('portal_http_db_duration_seconds', 'Time spent running SQL queries per request.', LABELS)
+SERIALIZER_SECONDS = histogram(
+    'portal_http_serializer_duration_seconds', 'Time in DRF serializers (.data and .is_valid) per request.', LABELS
+)
+PUBLISH_SECONDS = histogram(
+    'portal_http_celery_publish_duration_seconds', 'Time spent publishing Celery tasks, for requests that queue any.', LABELS
+)
+RESPONSES = counter('portal_http_responses_total', 'Responses by status class.', LABELS + ('status',))
+
+
+def request_role(request):
+    """
+    The user's role, without loading a user nobody has asked for (the
+    lazy session user of non-DRF views; DRF replaces it with the user it
+    authenticated).
+    """
+    user = getattr(request, 'user', None)
+    if user is None or (isinstance(user, LazyObject) and user._wrapped is empty):
+        return 'unknown'
+    if not user.is_authenticated:
+        return 'anonymous'
+    return getattr(user, 'role', None) or 'unknown'
+
+
+def ms(seconds):
+    return f'{seconds * 1000:.1f}'
+
+
+class TimingMiddleware:
+    """
+    Times each request and the SQL queries, serializers and Celery
+    publishes in it. Adds a Server-Timing header for ADMIN users (for everyone
+    with SERVER_TIMING_ENABLED) and records histograms per URL name and role
+    for /metrics. Goes first in
+    MIDDLEWARE so the total covers the other middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django runs a sync process_view in a thread under ASGI.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        self.finish(request, response, timing)
+        maybe_flush()
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        self.finish(request, response, timing)
+        if flush_due():
+            await sync_to_async(flush)()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = current_timing.get()
+        if timing is not None:
+            timing.view_started = perf_counter()
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        TimingMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    def finish(self, request, response, timing):
+        now = perf_counter()
+        total = now - timing.started
+        if timing.view_started is not None:
+            timing.view = now - timing.view_started
+        match = request.resolver_match
+        labels = (match.view_name if match else 'unmatched', request_role(request))
+
+        REQUEST_SECONDS.observe(total, *labels)
+        VIEW_SECONDS.observe(timing.view, *labels)
+        DB_QUERIES.observe(timing.queries, *labels)
+        DB_SECONDS.observe(timing.db, *labels)
+        SERIALIZER_SECONDS.observe(timing.serializer, *labels)
+        if timing.publishes:
+            PUBLISH_SECONDS.observe(timing.publish, *labels)
+        RESPONSES.inc(*labels, f'{response.status_code // 100}xx')
+
+        if settings.SERVER_TIMING_ENABLED or labels[1] == 'ADMIN':
+            entries = [
+                f'total;dur={ms(total)}',
+                f'view;dur={ms(timing.view)}',
+                f'db;dur={ms(timing.db)};desc="{timing.queries} queries"',
+                f'serializer;dur={ms(timing.serializer)}',
+            ]
+            if timing.publishes:
+                entries.append(f'celery;dur={ms(timing.publish)};desc="{timing.publishes} published"')
+            response['Server-Timing'] = ', '.join(entries)
@@ -0,0 +1,145 @@
+"""
+Celery task metrics from Celery signals: time spent queued (publish to
+start), runtime and outcome per task.
+
+Publishers stamp each message with the wall-clock publish time in a
+header, so the wait is measured across processes and hosts (clock skew
+between them shows up in it). A task with an ETA or countdown is counted
+as waiting from its ETA. Tasks that catch their own exceptions and return
+{'status': 'error', ...} are counted as soft errors rather than successes.
+"""
+import time
+from datetime import datetime
+from celery.signals import before_task_publish, task_postrun, task_prerun, task_revoked, worker_process_shutdown
+from .metrics import counter, flush, histogram, maybe_flush, quantile
+
+PUBLISHED_AT_HEADER = 'portal_published_at'
+
+QUEUE_WAIT = histogram(
+    'portal_celery_task_queue_wait_seconds', 'Time from publishing a task (or its ETA) to a worker starting it.',
+    ('task', 'queue'), buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+RUNTIME = histogram(
+    'portal_celery_task_runtime_seconds', 'Time a worker spent running a task.',
+    ('task',), buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+OUTCOMES = counter(
+    'portal_celery_task_outcomes_total', 'Finished tasks by outcome: success, soft_error, failure, retry, revoked.',
+    ('task', 'outcome'),
+)
+
+# perf_counter() at task_prerun, by task id, for the tasks running in this process.
+_started = {}
+
+
+def outcome(state, retval):
+    if state == 'SUCCESS':
+        if isinstance(retval, dict) and retval.get('status') == 'error':
+            return 'soft_error'
+        return 'success'
+    return (state or 'unknown').lower()
+
+
+def stamp_publish_time(headers=None, **kwargs):
+    # Overwritten on retries, which are published again.
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+def ready_at(request):
+    """When the task could first have started: its publish time or ETA."""
+    published = request.get(PUBLISHED_AT_HEADER)
+    if published is None:
+        return None
+    eta = request.get('eta')
+    if eta:
+        try:
+            eta = eta if isinstance(eta, datetime) else datetime.fromisoformat(eta)
+            published = max(published, eta.timestamp())
+        except (TypeError, ValueError):
+            pass
+    return published
+
+
+def task_started(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+    ready = ready_at(task.request)
+    if ready is not None:
+        queue = (task.request.delivery_info or {}).get('routing_key') or 'unknown'
+        QUEUE_WAIT.observe(max(0.0, time.time() - ready), task.name, queue)
+
+
+def task_finished(task_id=None, task=None, retval=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is not None:
+        RUNTIME.observe(time.perf_counter() - started, task.name)
+    OUTCOMES.inc(task.name, outcome(state, retval))
+    maybe_flush()
+
+
+def task_discarded(request=None, expired=False, sender=None, **kwargs):
+    OUTCOMES.inc(getattr(sender, 'name', None) or 'unknown', 'expired' if expired else 'revoked')
+
+
+def worker_stopping(**kwargs):
+    flush()
+
+
+def install():
+    before_task_publish.connect(stamp_publish_time, dispatch_uid='telemetry.stamp_publish_time')
+    task_prerun.connect(task_started, dispatch_uid='telemetry.task_started')
+    task_postrun.connect(task_finished, dispatch_uid='telemetry.task_finished')
+    task_revoked.connect(task_discarded, dispatch_uid='telemetry.task_discarded')
+    worker_process_shutdown.connect(worker_stopping, dispatch_uid='telemetry.worker_stopping')
+
+
+def task_stats(values):
+    """
+    Per-task summary of the stored metrics ({(name, labels, slot): value}
+    as from metrics.stored_values()): outcome counts and queue-wait and
+    runtime estimates in seconds, by task name.
+    """
+    tasks = {}
+
+    def row(task):
+        return tasks.setdefault(task, {
+            'task': task, 'runs': 0, 'outcomes': {}, 'queues': [],
+            'wait': {}, 'runtime': {}, 'wait_p50': None, 'wait_p95': None,
+            'runtime_p50': None, 'runtime_p95': None, 'runtime_mean': None,
+        })
+
+    for (name, labels, slot), value in values.items():
+        if name == OUTCOMES.name:
+            task, result = labels
+            row(task)['outcomes'][result] = row(task)['outcomes'].get(result, 0) + int(value)
+            row(task)['runs'] += int(value)
+        elif name == QUEUE_WAIT.name:
+            task, queue = labels
+            wait = row(task)['wait']
+            wait[slot] = wait.get(slot, 0) + value
+            if queue not in row(task)['queues']:
+                row(task)['queues'].append(queue)
+        elif name == RUNTIME.name:
+            row(labels[0])['runtime'][slot] = value
+
+    for stats in tasks.values():
+        wait, runtime = stats.pop('wait'), stats.pop('runtime')
+        stats['wait_p50'] = quantile(0.5, QUEUE_WAIT.buckets, wait)
+        stats['wait_p95'] = quantile(0.95, QUEUE_WAIT.buckets, wait)
+        stats['runtime_p50'] = quantile(0.5, RUNTIME.buckets, runtime)
+        stats['runtime_p95'] = quantile(0.95, RUNTIME.buckets, runtime)
+        if runtime.get('count'):
+            stats['runtime_mean'] = runtime['sum'] / runtime['count']
+    return sorted(tasks.values(), key=lambda stats: stats['task'])
+
+
+def broker_queue_depths(queues):
+    """Messages waiting in each named queue, or None if the broker is unreachable."""
+    from config.celery import app
+
+    try:
+        with app.connection_for_read() as connection:
+            channel = connection.default_channel
+            return {name: channel.queue_declare(queue=name, passive=True).message_count for name in queues}
+    except Exception:
+        return None
@@ -0,0 +1,128 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+from celery.app.task import Context
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from receipts.tasks import generate_receipt_pdf
+from telemetry.metrics import Metric, collect, format_metrics
+from telemetry.task_timing import task_started, task_stats
+
+User = get_user_model()
+
+
+# The user-019 response cache would answer repeat requests without queries.
+@override_settings(API_CACHE_ENABLED=False)
+class TimingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='telemetry-admin', email='telemetry-admin@example.com', password='x', role='ADMIN',
+            phone_number='254700990001',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        collect()
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/payments/list/')
+        self.assertEqual(response.status_code, 200)
+        entries = {entry.split(';')[0]: entry for entry in response['Server-Timing'].split(', ')}
+        self.assertEqual(set(entries), {'total', 'view', 'db', 'serializer'})
+        self.assertRegex(entries['db'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"$')
+
+    @override_settings(
+        API_CACHE_ENABLED=True,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'telemetry-tests'}},
+    )
+    def test_server_timing_header_on_cached_hit(self):
+        self.assertEqual(self.client.get('/api/payments/list/')['X-Cache'], 'MISS')
+        response = self.client.get('/api/payments/list/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        entries = {entry.split(';')[0]: entry for entry in response['Server-Timing'].split(', ')}
+        self.assertEqual(entries['db'], 'db;dur=0.0;desc="0 queries"')
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_server_timing_only_for_admins(self):
+        self.assertIn('Server-Timing', self.client.get('/api/payments/list/'))
+        self.assertNotIn('Server-Timing', APIClient().get('/api/payments/list/'))
+
+    def test_records_histograms_per_view_and_role(self):
+        self.client.get('/api/payments/list/')
+        values = collect()
+        labels = ('transaction-list', 'ADMIN')
+        self.assertEqual(values[('portal_http_request_duration_seconds', labels, 'count')], 1)
+        self.assertGreaterEqual(values[('portal_http_db_queries', labels, 'sum')], 1)
+        self.assertEqual(values[('portal_http_responses_total', labels + ('2xx',), 'total')], 1)
+
+    def test_metrics_requires_token_or_admin(self):
+        anonymous = APIClient()
+        self.assertEqual(anonymous.get('/metrics').status_code, 401)
+        with override_settings(METRICS_TOKEN='scrape-token'):
+            self.assertEqual(anonymous.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-token').status_code, 200)
+            self.assertEqual(anonymous.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        token = RefreshToken.for_user(self.admin).access_token
+        self.assertEqual(anonymous.get('/metrics', HTTP_AUTHORIZATION=f'Bearer {token}').status_code, 200)
+
+
+class MetricsFormatTests(SimpleTestCase):
+    def test_histogram_exposition(self):
+        metric = Metric('test_seconds', 'Test.', ('view',), buckets=(0.1, 1))
+        values = {
+            ('test_seconds', ('a',), 0): 2, ('test_seconds', ('a',), 2): 1,
+            ('test_seconds', ('a',), 'sum'): 5.25, ('test_seconds', ('a',), 'count'): 3,
+        }
+        self.assertEqual(format_metrics(values, {'test_seconds': metric}).splitlines(), [
+            '# HELP test_seconds Test.',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{view="a",le="0.1"} 2',
+            'test_seconds_bucket{view="a",le="1"} 2',
+            'test_seconds_bucket{view="a",le="+Inf"} 3',
+            'test_seconds_sum{view="a"} 5.25',
+            'test_seconds_count{view="a"} 3',
+        ])
+
+
+class TaskTelemetryTests(TestCase):
+    def setUp(self):
+        collect()
+
+    def test_returned_error_dict_is_a_soft_error(self):
+        generate_receipt_pdf.apply(args=(0,))
+        values = collect()
+        self.assertEqual(
+            values[('portal_celery_task_outcomes_total', ('receipts.tasks.generate_receipt_pdf', 'soft_error'), 'total')], 1
+        )
+        self.assertEqual(values[('portal_celery_task_runtime_seconds', ('receipts.tasks.generate_receipt_pdf',), 'count')], 1)
+
+    def test_queue_wait_counts_from_publish_or_eta(self):
+        task = SimpleNamespace(name='payments.tasks.create_ledger_entry', request=Context(
+            delivery_info={'routing_key': 'celery'}, portal_published_at=time.time() - 30,
+        ))
+        task_started(task_id='1', task=task)
+        task.request.eta = datetime.fromtimestamp(time.time() - 2, dt_timezone.utc).isoformat()
+        task_started(task_id='2', task=task)
+        values = collect()
+        labels = ('payments.tasks.create_ledger_entry', 'celery')
+        self.assertEqual(values[('portal_celery_task_queue_wait_seconds', labels, 'count')], 2)
+        self.assertAlmostEqual(values[('portal_celery_task_queue_wait_seconds', labels, 'sum')], 32, delta=1)
+
+    def test_task_stats(self):
+        task = 'invoices.tasks.send_invoice_email'
+        values = {
+            ('portal_celery_task_outcomes_total', (task, 'success'), 'total'): 8,
+            ('portal_celery_task_outcomes_total', (task, 'soft_error'), 'total'): 2,
+            # Ten waits between 10 and 30 seconds.
+            ('portal_celery_task_queue_wait_seconds', (task, 'celery'), 7): 10,
+            ('portal_celery_task_runtime_seconds', (task,), 'sum'): 5.0,
+            ('portal_celery_task_runtime_seconds', (task,), 'count'): 10,
+        }
+        stats, = task_stats(values)
+        self.assertEqual(stats['runs'], 10)
+        self.assertEqual(stats['outcomes'], {'success': 8, 'soft_error': 2})
+        self.assertEqual(stats['wait_p50'], 20)
+        self.assertEqual(stats['runtime_mean'], 0.5)
@@ -0,0 +1,104 @@
+"""
+Where a request's time goes: SQL queries, DRF serializers and Celery
+publishes, recorded into the RequestTiming of the request being served
+(set by TimingMiddleware). The hooks are installed once at startup and only
+read a context variable when no request is being timed, such as in Celery
+workers and management commands.
+"""
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from celery.signals import after_task_publish, before_task_publish
+from django.db.backends.signals import connection_created
+
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    """Durations in seconds."""
+    __slots__ = (
+        'started', 'view_started', 'view', 'db', 'queries', 'serializer', 'serializer_depth',
+        'publish', 'publishes', 'publish_started',
+    )
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.view_started = None
+        self.view = 0.0
+        self.db = 0.0
+        self.queries = 0
+        self.serializer = 0.0
+        self.serializer_depth = 0
+        self.publish = 0.0
+        self.publishes = 0
+        self.publish_started = None
+
+
+def record_query(execute, sql, params, many, context):
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.db += perf_counter() - started
+        timing.queries += 1
+
+
+def add_query_wrapper(sender, connection, **kwargs):
+    # Inserted first so connection.execute_wrapper() blocks, which pop the
+    # last wrapper, still remove their own.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def timed_serializer(method):
+    """Adds the outermost call of a serializer method to the request's serializer time."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        timing = current_timing.get()
+        if timing is None or timing.serializer_depth:
+            return method(self, *args, **kwargs)
+        timing.serializer_depth += 1
+        started = perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            timing.serializer += perf_counter() - started
+            timing.serializer_depth -= 1
+    wrapper.telemetry_timed = True
+    return wrapper
+
+
+def publish_started(**kwargs):
+    timing = current_timing.get()
+    if timing is not None:
+        timing.publish_started = perf_counter()
+
+
+def publish_finished(**kwargs):
+    timing = current_timing.get()
+    if timing is not None and timing.publish_started is not None:
+        timing.publish += perf_counter() - timing.publish_started
+        timing.publishes += 1
+        timing.publish_started = None
+
+
+def install():
+    """
+    Hooks every database connection, DRF's BaseSerializer (.data, which
+    Serializer and ListSerializer build on, and .is_valid) and Celery's
+    publish signals. Safe to call more than once.
+    """
+    from django.db import connections
+    from rest_framework.serializers import BaseSerializer
+
+    connection_created.connect(add_query_wrapper, dispatch_uid='telemetry.record_query')
+    for connection in connections.all(initialized_only=True):
+        add_query_wrapper(None, connection)
+    if not getattr(BaseSerializer.is_valid, 'telemetry_timed', False):
+        BaseSerializer.is_valid = timed_serializer(BaseSerializer.is_valid)
+        BaseSerializer.data = property(timed_serializer(BaseSerializer.data.fget))
+    before_task_publish.connect(publish_started, dispatch_uid='telemetry.publish_started')
+    after_task_publish.connect(publish_finished, dispatch_uid='telemetry.publish_finished')
@@ -0,0 +1,26 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .metrics import render_metrics
+
+
+def authorised(request):
+    """The METRICS_TOKEN bearer token (for Prometheus) or an ADMIN's JWT."""
+    header = request.headers.get('Authorization', '')
+    if settings.METRICS_TOKEN and hmac.compare_digest(header.encode(), f'Bearer {settings.METRICS_TOKEN}'.encode()):
+        return True
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return bool(result) and result[0].role == 'ADMIN'
+
+
+@require_GET
+def metrics_view(request):
+    if not authorised(request):
+        return HttpResponse('Authentication required.\n', status=401, content_type='text/plain')
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
 from django.utils import timezone
 from datetime import timedelta
@@ -42,6 +43,13 @@ class User(AbstractUser):
     
     # Define the manager
     objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Trigram indexes serve the ILIKE '%term%' user matches of audit search.
+            GinIndex(OpClass('username', name='gin_trgm_ops'), name='users_username_trgm'),
+            GinIndex(OpClass('email', name='gin_trgm_ops'), name='users_email_trgm'),
+        ]
     
     def __str__(self):
         return self.username
@@ -8,7 +8,7 @@ from .models import LoginAttempt, PasswordResetRequest
 from .serializers import UserSerializer, UserCreateSerializer, LoginSerializer, PasswordResetRequestSerializer, ChangePasswordSerializer
 from .permissions import IsAdmin, IsOwnerOrAdmin
 from .tasks import send_welcome_email, send_password_reset_email
-from audit.tasks import log_action
+from audit.buffer import record_action
 
 User = get_user_model()
 
@@ -34,7 +34,7 @@ class CustomLoginView(views.APIView):
             if user_auth:
                 user.reset_login_attempts()
                 LoginAttempt.objects.create(user=user, success=True, ip_address=self.get_client_ip(request))
-                log_action.delay(user.id, "LOGIN", "User logged in successfully")
+                record_action(user.id, "LOGIN", "User logged in successfully")
                 
                 refresh = RefreshToken.for_user(user)
                 return Response({
@@ -71,7 +71,7 @@ class UserListView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         user = serializer.save()
         send_welcome_email.delay(user.id, user.email)
-        log_action.delay(self.request.user.id, "USER_CREATED", f"Created user {user.username}")
+        record_action(self.request.user.id, "USER_CREATED", f"Created user {user.username}")
 
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.all()
@@ -79,7 +79,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
 
     def perform_destroy(self, instance):
-        log_action.delay(self.request.user.id, "USER_DELETED", f"Deleted user {instance.username}")
+        record_action(self.request.user.id, "USER_DELETED", f"Deleted user {instance.username}")
         super().perform_destroy(instance)
 
 class ProfileView(generics.RetrieveUpdateAPIView):
@@ -98,7 +98,7 @@ class PasswordResetRequestView(generics.CreateAPIView):
         # Notify admins via task
         from notifications.tasks import notify_admins_password_reset
         notify_admins_password_reset.delay(self.request.user.id)
-        log_action.delay(self.request.user.id, "PASSWORD_RESET_REQUEST", "Requested password reset")
+        record_action(self.request.user.id, "PASSWORD_RESET_REQUEST", "Requested password reset")
 
 class AdminResetPasswordView(generics.UpdateAPIView):
     queryset = PasswordResetRequest.objects.all()
@@ -115,7 +115,7 @@ class AdminResetPasswordView(generics.UpdateAPIView):
         # Generate temp password and email user
         from users.tasks import send_admin_reset_password_email
         send_admin_reset_password_email.delay(instance.user.id)
-        log_action.delay(request.user.id, "PASSWORD_RESET_ADMIN", f"Reset password for {instance.user.username}")
+        record_action(request.user.id, "PASSWORD_RESET_ADMIN", f"Reset password for {instance.user.username}")
         
         return Response({'status': 'Password reset initiated'})
 
@@ -135,7 +135,7 @@ class ChangePasswordView(generics.UpdateAPIView):
             user.set_password(serializer.validated_data['new_password'])
             user.must_change_password = False
             user.save()
-            log_action.delay(user.id, "PASSWORD_CHANGED", "Password changed successfully")
+            record_action(user.id, "PASSWORD_CHANGED", "Password changed successfully")
             return Response({'status': 'Password updated'})
         else:
             return Response({'detail': 'Old password is incorrect'}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
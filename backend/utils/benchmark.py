@@ -0,0 +1,348 @@
+"""
+Query-count and latency budgets for the API's read endpoints.
+
+ENDPOINTS lists every GET endpoint with the most SQL queries one request
+may run and how long it may take. The query budgets do not grow with the
+page size, so an N+1 (a serializer field reaching through a relation that
+was not select_related) breaks them as soon as a page holds more rows than
+the budget allows.
+
+measure_endpoints() calls each endpoint as ADMIN and as STAFF and returns
+one row per call (queries, ms, rows). Each app's tests.py asserts the
+budgets through EndpointBudgetMixin on a small seeded data set, and
+`manage.py benchmark_endpoints` prints the same table for larger volumes
+and compares it with a saved run.
+"""
+import json
+import random
+import statistics
+import time
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+# path is formatted with the fixtures from endpoint_fixtures(); roles the
+# endpoint answers with 200 (the others are expected to get 403). Endpoints
+# with side effects are measured without a warm-up call (warm=False).
+Endpoint = namedtuple('Endpoint', 'app name path max_queries max_ms roles warm')
+BOTH = ('ADMIN', 'STAFF')
+ADMIN = ('ADMIN',)
+
+
+def endpoint(app, name, path, max_queries, max_ms=500, roles=BOTH, warm=True):
+    return Endpoint(app, name, path, max_queries, max_ms, roles, warm)
+
+
+ENDPOINTS = [
+    endpoint('users', 'user-list', '/api/users/list/', 2, roles=ADMIN),
+    endpoint('users', 'user-detail', '/api/users/{staff_id}/', 1, roles=ADMIN),
+    endpoint('users', 'profile', '/api/users/profile/', 0),
+    endpoint('audit', 'audit-logs', '/api/audit/logs/', 2, roles=ADMIN),
+    endpoint('audit', 'audit-log-detail', '/api/audit/logs/{audit_log_id}/', 1, roles=ADMIN),
+    endpoint('audit', 'sessions', '/api/audit/sessions/', 2, roles=ADMIN),
+    endpoint('audit', 'active-status', '/api/audit/active-status/', 2, roles=ADMIN),
+    endpoint('audit', 'my-logs', '/api/audit/my-logs/', 1),
+    endpoint('payments', 'transaction-list', '/api/payments/list/', 1),
+    endpoint('payments', 'transaction-detail', '/api/payments/{transaction_ref}/', 1),
+    endpoint('payments', 'transaction-status', '/api/payments/status/{transaction_ref}/', 1),
+    endpoint('payments', 'transaction-summary', '/api/payments/summary/', 1),
+    endpoint('payments', 'ledger', '/api/payments/ledger/', 1, roles=ADMIN),
+    endpoint('payments', 'inbox-status', '/api/payments/inbox/status/', 2, roles=ADMIN),
+    endpoint('payments', 'reconciliation-runs', '/api/payments/reconciliation/runs/', 2, roles=ADMIN),
+    endpoint('payouts', 'payout-list', '/api/payouts/list/', 2, roles=ADMIN),
+    endpoint('payouts', 'payout-detail', '/api/payouts/{payout_id}/', 1, roles=ADMIN),
+    endpoint('payouts', 'payout-summary', '/api/payouts/summary/', 1, roles=ADMIN),
+    endpoint('quotes', 'quote-list', '/api/quotes/list/', 1),
+    endpoint('quotes', 'quote-detail', '/api/quotes/{quote_id}/', 1),
+    endpoint('contracts', 'contract-list', '/api/contracts/list/', 1),
+    endpoint('contracts', 'contract-detail', '/api/contracts/{contract_id}/', 1),
+    endpoint('contracts', 'contract-invoice-list', '/api/contracts/invoices/', 1),
+    endpoint('contracts', 'contract-invoice-detail', '/api/contracts/invoices/{contract_invoice_id}/', 1),
+    endpoint('invoices', 'invoice-list', '/api/invoices/list/', 1),
+    endpoint('invoices', 'invoice-detail', '/api/invoices/{invoice_id}/', 1),
+    # Marks the invoices it returns OVERDUE.
+    endpoint('invoices', 'overdue-invoices', '/api/invoices/overdue/', 2, warm=False),
+    endpoint('receipts', 'receipt-list', '/api/receipts/list/', 1),
+    endpoint('receipts', 'receipt-detail', '/api/receipts/{receipt_id}/', 1),
+    endpoint('receipts', 'transaction-receipt', '/api/receipts/transaction/{transaction_id}/', 2),
+    endpoint('verification', 'verification-logs', '/api/verification/logs/', 2),
+    endpoint('notifications', 'notification-list', '/api/notifications/list/', 1),
+    endpoint('notifications', 'notification-detail', '/api/notifications/{notification_id}/', 1),
+    endpoint('notifications', 'unread-count', '/api/notifications/unread-count/', 1),
+    endpoint('notifications', 'admin-notification-list', '/api/notifications/admin/list/', 2, roles=ADMIN),
+    endpoint(
+        'notifications', 'admin-notification-detail', '/api/notifications/admin/{admin_notification_id}/', 1,
+        roles=ADMIN
+    ),
+    endpoint('reports', 'dashboard-summary', '/api/reports/dashboard/summary/', 1),
+    endpoint('reports', 'revenue-chart', '/api/reports/dashboard/revenue-chart/', 1),
+    endpoint('reports', 'weekly-trend', '/api/reports/dashboard/weekly-trend/', 1),
+    endpoint('reports', 'user-activity', '/api/reports/dashboard/user-activity/', 2, roles=ADMIN),
+    endpoint('reports', 'financial-summary', '/api/reports/financial/summary/', 1, roles=ADMIN),
+    endpoint('reports', 'transaction-report', '/api/reports/reports/transactions/', 4),
+    endpoint('reports', 'user-performance', '/api/reports/reports/user-performance/', 2, roles=ADMIN),
+]
+
+
+def seed_endpoint_data(staff_count=3, per_user=25, days=60, seed=0):
+    """
+    Creates an admin, `staff_count` staff users and `per_user` rows of every
+    listed model for each staff user, spread over the last `days` days.
+    Returns (admin, staff user the endpoints are called as).
+    """
+    from audit.models import AuditLog, UserSession
+    from contracts.models import Contract, Invoice as ContractInvoice
+    from invoices.models import Invoice
+    from notifications.models import AdminNotification, Notification
+    from payments.ledger import append_entries
+    from payments.models import ReconciliationRun, Transaction
+    from payouts.models import Payout
+    from quotes.models import Quote
+    from receipts.models import Receipt
+    from reports.facts import rebuild_audit_facts, rebuild_transaction_facts
+    from reports.performance import rebuild_performance
+    from verification.models import VerificationLog
+
+    User = get_user_model()
+    rng = random.Random(seed)
+    now = timezone.now()
+    base = User.objects.count()
+
+    def user(role, index):
+        name = f'bench-{role.lower()}-{base + index}'
+        return User.objects.create_user(
+            name, f'{name}@example.com', 'x', role=role, phone_number=f'2549{base + index:08d}',
+            first_name=role.title(), last_name=str(index)
+        )
+
+    def moment():
+        return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+    def amount():
+        return Decimal(rng.randint(100, 50_000))
+
+    admin = user('ADMIN', 0)
+    staff_users = [user('STAFF', index) for index in range(1, staff_count + 1)]
+
+    for staff in staff_users:
+        completed = []
+        for index in range(per_user):
+            transaction = Transaction.objects.create(
+                user=staff, amount=amount(), payment_method=rng.choice(['MPESA', 'PAYSTACK']),
+                status=rng.choice(['COMPLETED', 'COMPLETED', 'COMPLETED', 'PENDING', 'FAILED']),
+                phone_number='254700000000', description=f'Benchmark payment {index}',
+            )
+            Transaction.objects.filter(pk=transaction.pk).update(created_at=moment())
+            if transaction.status == 'COMPLETED':
+                completed.append(transaction)
+                Receipt.objects.create(transaction=transaction, downloaded_by=rng.choice([None, staff]))
+        append_entries([
+            {'entry_type': 'CREDIT', 'amount': transaction.amount, 'transaction_id': transaction.id,
+             'description': f'Payment completed: {transaction.reference_code}'}
+            for transaction in completed
+        ])
+
+        for index in range(per_user):
+            Quote.objects.create(
+                created_by=staff, client_name=f'Client {index}', client_email='client@example.com',
+                client_phone='254700000000', service_description='Benchmark quote', amount=amount(),
+            )
+            contract = Contract.objects.create(
+                created_by=staff, client_name=f'Client {index}', client_email='client@example.com',
+                client_phone='254700000000', service_description='Benchmark contract', amount=amount(),
+                status=rng.choice(['DRAFT', 'SENT', 'SIGNED']),
+            )
+            ContractInvoice.objects.create(
+                contract=contract, client_name=contract.client_name, client_email=contract.client_email,
+                client_phone=contract.client_phone, service_description='Benchmark invoice',
+                amount=contract.amount, due_date=now + timedelta(days=rng.randint(-10, 30)),
+            )
+            Invoice.objects.create(
+                created_by=staff, client_name=f'Client {index}', client_email='client@example.com',
+                client_phone='254700000000', service_description='Benchmark invoice', amount=amount(),
+                status=rng.choice(['SENT', 'PENDING', 'PAID']), due_date=now + timedelta(days=rng.randint(-10, 30)),
+            )
+            Notification.objects.create(
+                recipient=staff, notification_type='PAYMENT_COMPLETED', title='Payment completed',
+                message='Benchmark notification', is_read=rng.random() < 0.5,
+            )
+
+        AuditLog.objects.bulk_create([
+            AuditLog(
+                user=staff, action=rng.choice(['LOGIN', 'PAYMENT_COMPLETED', 'CONTRACT_SIGNED']),
+                description='Benchmark entry', ip_address='127.0.0.1', timestamp=moment(),
+            )
+            for _ in range(per_user)
+        ])
+        UserSession.objects.create(
+            user=staff, session_key=f'bench-{staff.id}', ip_address='127.0.0.1', is_active=True,
+        )
+
+    for index in range(per_user):
+        Payout.objects.create(
+            admin_user=admin, recipient_name=f'Recipient {index}', recipient_phone='254700000000',
+            amount=amount(), reason='Benchmark payout', status=rng.choice(['COMPLETED', 'FAILED', 'PROCESSING']),
+        )
+        AdminNotification.objects.create(
+            notification_type='SECURITY_ALERT', title='Benchmark alert', message='Benchmark admin notification',
+            resolved_by=rng.choice([None, admin]),
+        )
+        VerificationLog.objects.create(
+            document_code=f'DR{index:08d}', ip_address='127.0.0.1', is_valid=rng.random() < 0.8,
+        )
+        ReconciliationRun.objects.create(started_at=now, finished_at=now)
+
+    # The report tables are kept up to date on commit; seeded rows are
+    # usually rolled back, so fill them directly.
+    first = timezone.localdate(now) - timedelta(days=days)
+    rebuild_transaction_facts(first, timezone.localdate(now))
+    rebuild_audit_facts(first, timezone.localdate(now))
+    rebuild_performance(days + 1)
+    return admin, staff_users[0]
+
+
+def endpoint_fixtures(staff):
+    """Ids the endpoint paths are formatted with: the newest objects `staff` owns."""
+    from audit.models import AuditLog
+    from contracts.models import Contract, Invoice as ContractInvoice
+    from invoices.models import Invoice
+    from notifications.models import AdminNotification, Notification
+    from payouts.models import Payout
+    from quotes.models import Quote
+    from receipts.models import Receipt
+
+    receipt = Receipt.objects.filter(transaction__user=staff).select_related('transaction').latest('generated_at')
+    return {
+        'staff_id': staff.id,
+        'transaction_id': receipt.transaction.id,
+        'transaction_ref': receipt.transaction.reference_code,
+        'receipt_id': receipt.id,
+        'audit_log_id': AuditLog.objects.filter(user=staff).values_list('id', flat=True).first(),
+        'payout_id': Payout.objects.values_list('id', flat=True).first(),
+        'quote_id': Quote.objects.filter(created_by=staff).values_list('id', flat=True).first(),
+        'contract_id': Contract.objects.filter(created_by=staff).values_list('id', flat=True).first(),
+        'contract_invoice_id': ContractInvoice.objects.filter(
+            contract__created_by=staff
+        ).values_list('id', flat=True).first(),
+        'invoice_id': Invoice.objects.filter(created_by=staff).values_list('id', flat=True).first(),
+        'notification_id': Notification.objects.filter(recipient=staff).values_list('id', flat=True).first(),
+        'admin_notification_id': AdminNotification.objects.values_list('id', flat=True).first(),
+    }
+
+
+def response_rows(data):
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return len(data['results'])
+    return 1
+
+
+def measure(client, path, repeat=1, warm=True):
+    """
+    (status, queries, ms, rows) for GET `path`. With `warm`, the request
+    runs once unmeasured so per-process and cache warm-up is not counted.
+    Queries are those of the first measured run, ms the median of `repeat`.
+    """
+    if warm:
+        client.get(path)
+    timings = []
+    for run in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - started) * 1000)
+        if run == 0:
+            status, query_count = response.status_code, len(queries)
+            rows = response_rows(getattr(response, 'data', None))
+    return status, query_count, statistics.median(timings), rows
+
+
+def measure_endpoints(admin, staff, endpoints=ENDPOINTS, repeat=1):
+    """One row per endpoint and role, with the endpoint's budget."""
+    fixtures = endpoint_fixtures(staff)
+    clients = {}
+    # STAFF first: endpoints with side effects then still find the staff
+    # user's rows before ADMIN's call touches everyone's.
+    for user in (staff, admin):
+        clients[user.role] = APIClient()
+        clients[user.role].force_authenticate(user)
+
+    results = []
+    # Response caching would turn every measured call into a cache hit.
+    with override_settings(API_CACHE_ENABLED=False):
+        for item in endpoints:
+            path = item.path.format(**fixtures)
+            for role, client in clients.items():
+                status, queries, ms, rows = measure(client, path, repeat, item.warm)
+                results.append({
+                    'endpoint': item.name, 'app': item.app, 'role': role, 'path': path, 'status': status,
+                    'expected_status': 200 if role in item.roles else 403,
+                    'queries': queries, 'max_queries': item.max_queries,
+                    'ms': round(ms, 2), 'max_ms': item.max_ms, 'rows': rows,
+                })
+    return results
+
+
+def format_table(results, baseline=None):
+    """Fixed-width table; with a baseline run, query and ms changes are shown."""
+    previous = {(row['endpoint'], row['role']): row for row in baseline or []}
+    lines = [f'{"endpoint":<28}{"role":<7}{"status":>7}{"queries":>9}{"budget":>8}{"ms":>10}{"rows":>7}'
+             + (f'{"Δ queries":>11}{"Δ ms":>10}' if baseline else '')]
+    for row in results:
+        line = (
+            f'{row["endpoint"]:<28}{row["role"]:<7}{row["status"]:>7}{row["queries"]:>9}'
+            f'{row["max_queries"]:>8}{row["ms"]:>10.1f}{row["rows"]:>7}'
+        )
+        before = previous.get((row['endpoint'], row['role']))
+        if before:
+            line += f'{row["queries"] - before["queries"]:>+11}{row["ms"] - before["ms"]:>+10.1f}'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def budget_failures(results, latency_factor=None):
+    """Rows that broke their budget or returned an unexpected status, with the reason."""
+    factor = settings.ENDPOINT_BUDGET_LATENCY_FACTOR if latency_factor is None else latency_factor
+    failures = []
+    for row in results:
+        if row['status'] != row['expected_status']:
+            failures.append((row, f'status {row["status"]}, expected {row["expected_status"]}'))
+        elif row['queries'] > row['max_queries']:
+            failures.append((row, f'{row["queries"]} queries, budget {row["max_queries"]}'))
+        elif row['ms'] > row['max_ms'] * factor:
+            failures.append((row, f'{row["ms"]:.0f}ms, budget {row["max_ms"] * factor:.0f}ms'))
+    return failures
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class EndpointBudgetMixin:
+    """
+    Mixed into a TestCase with `app` set: checks every ENDPOINTS entry of
+    that app as ADMIN and STAFF against its query and latency budget.
+    """
+    app = None
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin, cls.staff = seed_endpoint_data()
+
+    def test_endpoint_budgets(self):
+        endpoints = [item for item in ENDPOINTS if item.app == self.app]
+        self.assertTrue(endpoints, f'No endpoints listed for {self.app}')
+        results = measure_endpoints(self.admin, self.staff, endpoints)
+        for row, reason in budget_failures(results):
+            with self.subTest(endpoint=row['endpoint'], role=row['role']):
+                self.fail(f'{row["path"]}: {reason}')
@@ -0,0 +1,147 @@
+import hashlib
+import logging
+from functools import wraps
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_VERSION_KEY = 'api:ns:{namespace}'
+STATS_KEY = 'api:cache:stats'
+
+
+def namespace_key(namespace):
+    return NAMESPACE_VERSION_KEY.format(namespace=namespace)
+
+
+def namespace_versions(namespaces):
+    keys = [namespace_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys) if keys else {}
+    return [versions.get(key, 0) for key in keys]
+
+
+def invalidate_cache(*namespaces):
+    """
+    Bumps the version of each namespace once the current transaction
+    commits. Cached responses embed the versions they were built under, so
+    every entry of a bumped namespace is missed from then on and simply
+    expires. A namespace such as 'notifications:5' scopes one user's data.
+    """
+    def bump():
+        for namespace in namespaces:
+            key = namespace_key(namespace)
+            cache.add(key, 0, timeout=None)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Evicted between add() and incr().
+                cache.set(key, 1, timeout=None)
+    transaction.on_commit(bump)
+
+
+def response_cache_key(request, namespaces, scope='user'):
+    """
+    Key for a GET response: the versions of its namespaces, who is asking
+    (the role, plus the user unless scope='role') and the URL with its
+    query parameters in a stable order.
+    """
+    user = request.user
+    who = f'role:{user.role}' if scope == 'role' else f'role:{user.role}:user:{user.pk}'
+    namespaces = [namespace.format(user_id=user.pk) for namespace in namespaces]
+    versions = ':'.join(
+        f'{namespace}.{version}' for namespace, version in zip(namespaces, namespace_versions(namespaces))
+    )
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.sha1(f'{request.get_host()}{request.path}?{query}'.encode()).hexdigest()
+    return f'api:resp:{versions}:{who}:{digest}'
+
+
+def record_cache_access(name, hit):
+    try:
+        get_redis_connection('default').hincrby(STATS_KEY, f'{name}:{"hits" if hit else "misses"}', 1)
+    except Exception as e:
+        logger.debug('Could not record cache stats: %s', e)
+
+
+def cache_stats():
+    """Hit and miss counts per cached view since the counters were last reset."""
+    try:
+        raw = get_redis_connection('default').hgetall(STATS_KEY)
+    except Exception as e:
+        logger.warning('Could not read cache stats: %s', e)
+        raw = {}
+    views = {}
+    for field, value in raw.items():
+        name, kind = field.decode().rsplit(':', 1)
+        views.setdefault(name, {'hits': 0, 'misses': 0})[kind] = int(value)
+    for counts in views.values():
+        total = counts['hits'] + counts['misses']
+        counts['hit_ratio'] = round(counts['hits'] / total, 4) if total else 0
+    hits = sum(counts['hits'] for counts in views.values())
+    misses = sum(counts['misses'] for counts in views.values())
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0,
+        'views': dict(sorted(views.items())),
+    }
+
+
+def reset_cache_stats():
+    get_redis_connection('default').delete(STATS_KEY)
+
+
+def _cached(view, request, namespaces, scope, timeout, compute):
+    if not settings.API_CACHE_ENABLED or not request.user.is_authenticated:
+        return compute()
+    name = f'{type(view).__module__.split(".")[0]}.{type(view).__name__}'
+    key = response_cache_key(request, namespaces, scope)
+    data = cache.get(key)
+    if data is not None:
+        record_cache_access(name, hit=True)
+        return Response(data, headers={'X-Cache': 'HIT'})
+
+    record_cache_access(name, hit=False)
+    response = compute()
+    if response.status_code == 200:
+        cache.set(key, response.data, settings.API_CACHE_TTL if timeout is None else timeout)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cache_response(namespaces, scope='user', timeout=None):
+    """
+    Caches a view's GET handler in the default cache. `namespaces` lists
+    what the response is built from ('transactions', 'notifications:{user_id}');
+    invalidate_cache() on any of them drops it. scope='role' shares one
+    entry between users of the same role, for responses that do not
+    depend on who asks.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            return _cached(
+                view, request, namespaces, scope, timeout, lambda: method(view, request, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+
+class CachedResponseMixin:
+    """
+    cache_response() for generic views: set cache_namespaces (and
+    optionally cache_scope / cache_timeout) on the view.
+    """
+    cache_namespaces = ()
+    cache_scope = 'user'
+    cache_timeout = None
+
+    def get(self, request, *args, **kwargs):
+        return _cached(
+            self, request, self.cache_namespaces, self.cache_scope, self.cache_timeout,
+            lambda: super(CachedResponseMixin, self).get(request, *args, **kwargs)
+        )
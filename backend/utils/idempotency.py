@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+from functools import wraps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import status
+from redis.exceptions import RedisError
+from rest_framework.response import Response
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(f'{request.method}:{request.path}:{body}'.encode()).hexdigest()
+
+
+def idempotent(scope):
+    """
+    Decorator for APIView.post methods that honours an Idempotency-Key header.
+
+    The first request with a key claims it in Redis; successful (2xx)
+    responses are stored and replayed verbatim for retries with the same key
+    and body, so a retried POST never creates a second record or provider
+    call. Keys are scoped per user and per endpoint.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get('Idempotency-Key')
+            if not key:
+                return view_method(self, request, *args, **kwargs)
+            if len(key) > 255:
+                return Response({'detail': 'Idempotency-Key must be at most 255 characters.'}, status=status.HTTP_400_BAD_REQUEST)
+
+            redis_client = get_redis()
+            cache_key = f'idempotency:{scope}:{request.user.pk}:{key}'
+            fingerprint = request_fingerprint(request)
+
+            claimed = redis_client.set(
+                cache_key,
+                json.dumps({'state': 'processing', 'fingerprint': fingerprint}),
+                nx=True,
+                ex=settings.IDEMPOTENCY_LOCK_TTL,
+            )
+            if not claimed:
+                stored = redis_client.get(cache_key)
+                stored = json.loads(stored) if stored else None
+                if stored is None or stored['state'] == 'processing':
+                    return Response(
+                        {'detail': 'A request with this Idempotency-Key is already being processed.'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                if stored['fingerprint'] != fingerprint:
+                    return Response(
+                        {'detail': 'Idempotency-Key was already used with a different request.'},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                return Response(stored['data'], status=stored['status'], headers={'Idempotent-Replayed': 'true'})
+
+            try:
+                response = view_method(self, request, *args, **kwargs)
+            except Exception:
+                redis_client.delete(cache_key)
+                raise
+
+            if 200 <= response.status_code < 300:
+                redis_client.set(
+                    cache_key,
+                    json.dumps({
+                        'state': 'done',
+                        'fingerprint': fingerprint,
+                        'status': response.status_code,
+                        'data': response.data,
+                    }, cls=DjangoJSONEncoder),
+                    ex=settings.IDEMPOTENCY_KEY_TTL,
+                )
+            else:
+                # Nothing was created, so the client may correct the request and retry.
+                redis_client.delete(cache_key)
+            return response
+        return wrapper
+    return decorator
+
+
+def claim_callback(provider, external_id):
+    """
+    Records that a provider callback has been received. Returns False when the
+    same CheckoutRequestID / reference / OriginatorConversationID was already
+    seen, in which case the caller should acknowledge without doing any work.
+    The claim is only a fast path: if Redis is unavailable the callback is
+    let through, and the inbox's unique (provider, external_id) constraint
+    and the handlers' settled-status checks catch duplicates.
+    """
+    if not external_id:
+        return True
+    try:
+        return bool(get_redis().set(
+            f'callback-seen:{provider}:{external_id}', 1,
+            nx=True, ex=settings.CALLBACK_DEDUP_TTL,
+        ))
+    except RedisError as e:
+        logger.warning('Could not claim %s callback %s: %s', provider, external_id, e)
+        return True
+
+
+def release_callback(provider, external_id):
+    """
+    Forgets a claimed callback so the provider's retry is accepted again,
+    used when the callback could not be stored or applied.
+    """
+    if not external_id:
+        return
+    try:
+        get_redis().delete(f'callback-seen:{provider}:{external_id}')
+    except RedisError as e:
+        logger.warning('Could not release %s callback %s: %s', provider, external_id, e)
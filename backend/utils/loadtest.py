@@ -0,0 +1,445 @@
+"""
+End-to-end load tests of the payment flow (`manage.py loadtest_payments`).
+
+A scenario is started `rate` times a second for `duration` seconds, on a
+fixed schedule that does not wait for earlier iterations (open loop), so a
+slow server shows up as latency instead of a lower request rate. Latencies
+are measured from the scheduled start, which also charges the time an
+iteration waited for a free worker.
+
+Each payment iteration, as a seeded STAFF user (manage.py seed_portal):
+  initiate -> poll status until COMPLETED/FAILED (provider callback applied)
+  -> ledger entry written -> receipt generated -> receipt PDF ready
+  -> receipt emailed (optional)
+and each payout iteration, as an ADMIN: initiate -> poll until settled ->
+ledger debit written. The app should talk to the simulators from
+utils.simulators (manage.py simulate_providers).
+
+Besides per-step HTTP latencies and per-stage times, the report gives the
+task-queue lag seen from the database for the rows the run created (e.g.
+transaction completed -> ledger entry written) and the broker queue depth
+sampled during the run.
+"""
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import requests
+from django.db import close_old_connections
+
+TERMINAL_STATUSES = ('COMPLETED', 'FAILED', 'CANCELLED')
+SCENARIOS = ('mpesa', 'paystack', 'mixed', 'payout')
+# Share of M-Pesa payments in the mixed scenario.
+MIXED_MPESA_SHARE = 0.8
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+class Recorder:
+    """Latency samples (ms) and errors per step, from many threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = Counter()
+        self.outcomes = Counter()
+
+    def record(self, name, ms, ok=True):
+        with self.lock:
+            self.samples[name].append(ms)
+            if not ok:
+                self.errors[name] += 1
+
+    def error(self, name):
+        with self.lock:
+            self.errors[name] += 1
+
+    def outcome(self, name):
+        with self.lock:
+            self.outcomes[name] += 1
+
+    def rows(self):
+        with self.lock:
+            names = sorted(set(self.samples) | set(self.errors), key=lambda name: (name.split(':')[0], name))
+            rows = []
+            for name in names:
+                values = sorted(self.samples.get(name, []))
+                rows.append({
+                    'name': name,
+                    'count': len(values),
+                    'errors': self.errors.get(name, 0),
+                    'p50': percentile(values, 50),
+                    'p95': percentile(values, 95),
+                    'p99': percentile(values, 99),
+                    'max': values[-1] if values else None,
+                })
+            return rows
+
+
+class ApiClient:
+    """JWT-authenticated calls to the app, one requests.Session per thread."""
+
+    def __init__(self, base_url, recorder, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.timeout = timeout
+        self.local = threading.local()
+        self.tokens = {}
+        self.token_lock = threading.Lock()
+
+    def session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def login(self, username, password):
+        try:
+            response = self.session().post(
+                f'{self.base_url}/api/auth/login/', json={'username': username, 'password': password},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise RuntimeError(f'Login as {username} failed: {e}')
+        if response.status_code != 200:
+            raise RuntimeError(f'Login as {username} failed ({response.status_code}): {response.text[:200]}')
+        with self.token_lock:
+            self.tokens[username] = (password, response.json()['access'])
+
+    def call(self, step, method, path, username, payload=None, headers=None):
+        """
+        One API call recorded under `step` ('http: <step>'). Returns
+        (status code, JSON body); status 0 means the request itself failed.
+        """
+        password, token = self.tokens[username]
+        for attempt in range(2):
+            started = time.perf_counter()
+            try:
+                response = self.session().request(
+                    method, f'{self.base_url}{path}', json=payload, timeout=self.timeout,
+                    headers={'Authorization': f'Bearer {token}', **(headers or {})},
+                )
+            except requests.RequestException:
+                self.recorder.record(f'http: {step}', (time.perf_counter() - started) * 1000, ok=False)
+                return 0, {}
+            if response.status_code == 401 and attempt == 0:
+                # The access token expired during a long run.
+                self.login(username, password)
+                password, token = self.tokens[username]
+                continue
+            ms = (time.perf_counter() - started) * 1000
+            self.recorder.record(f'http: {step}', ms, ok=response.status_code < 400)
+            try:
+                return response.status_code, response.json()
+            except ValueError:
+                return response.status_code, {}
+
+
+class LoadTest:
+    """
+    Runs one scenario. `users` are (username, password) pairs of STAFF
+    users for payments; `admin` is one ADMIN (username, password) pair for
+    payouts.
+    """
+
+    def __init__(self, base_url, scenario, rate, duration, users, admin=None, concurrency=50,
+                 settle_timeout=60, poll_interval=0.5, receipts=True, email=False, seed=0):
+        if scenario not in SCENARIOS:
+            raise ValueError(f'Unknown scenario {scenario}; use one of {", ".join(SCENARIOS)}.')
+        self.recorder = Recorder()
+        self.client = ApiClient(base_url, self.recorder)
+        self.scenario = scenario
+        self.rate = rate
+        self.duration = duration
+        self.users = users
+        self.admin = admin
+        self.concurrency = concurrency
+        self.settle_timeout = settle_timeout
+        self.poll_interval = poll_interval
+        self.receipts = receipts
+        self.email = email
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.transaction_ids = []
+        self.payout_ids = []
+        self.ids_lock = threading.Lock()
+        self.queue_depths = []
+
+    # Helpers
+
+    def choice(self, values):
+        with self.rng_lock:
+            return self.rng.choice(values)
+
+    def amount(self):
+        with self.rng_lock:
+            return str(Decimal(self.rng.randint(10, 5_000)))
+
+    def phone(self):
+        with self.rng_lock:
+            return f'2547{self.rng.randrange(10 ** 8):08d}'
+
+    def since(self, started):
+        return (time.perf_counter() - started) * 1000
+
+    def wait_for(self, stage, check):
+        """
+        Polls `check()` until it returns a truthy value or settle_timeout
+        passes; records the wait as 'stage: <stage>'. Returns the value.
+        """
+        started = time.perf_counter()
+        deadline = started + self.settle_timeout
+        while True:
+            value = check()
+            if value:
+                self.recorder.record(f'stage: {stage}', self.since(started))
+                return value
+            if time.perf_counter() >= deadline:
+                self.recorder.error(f'stage: {stage}')
+                self.recorder.outcome(f'timeout: {stage}')
+                return None
+            time.sleep(self.poll_interval)
+
+    # Scenarios
+
+    def payment(self, method):
+        from payments.models import LedgerEntry
+
+        username = self.choice(self.users)[0]
+        payload = {'amount': self.amount(), 'payment_method': method, 'description': 'Load test payment'}
+        if method == 'MPESA':
+            payload['phone_number'] = self.phone()
+        else:
+            payload['email'] = f'{username}@example.com'
+        status, data = self.client.call(
+            'initiate', 'POST', '/api/payments/initiate/', username, payload,
+            headers={'Idempotency-Key': str(uuid.uuid4())},
+        )
+        if status != 202:
+            self.recorder.outcome('initiate rejected')
+            return False
+        transaction = data['transaction']
+        with self.ids_lock:
+            self.transaction_ids.append(transaction['id'])
+
+        def settled():
+            status, data = self.client.call(
+                'status', 'GET', f'/api/payments/status/{transaction["reference_code"]}/', username
+            )
+            return data.get('status') if data.get('status') in TERMINAL_STATUSES else None
+
+        final = self.wait_for('settled', settled)
+        if final != 'COMPLETED':
+            self.recorder.outcome(f'payment {final.lower()}' if final else 'payment unsettled')
+            return False
+
+        ledger = self.wait_for('ledger', lambda: LedgerEntry.objects.filter(
+            transaction_id=transaction['id'], entry_type='CREDIT'
+        ).exists())
+        if not ledger or not self.receipts:
+            self.recorder.outcome('payment completed')
+            return bool(ledger)
+
+        status, receipt = self.client.call(
+            'receipt generate', 'POST', '/api/receipts/generate/', username, {'transaction_id': transaction['id']}
+        )
+        if status not in (200, 201):
+            self.recorder.outcome('receipt rejected')
+            return False
+        pdf = self.wait_for('receipt pdf', lambda: self.client.call(
+            'receipt detail', 'GET', f'/api/receipts/{receipt["id"]}/', username
+        )[1].get('pdf_file'))
+        if pdf and self.email:
+            status, _ = self.client.call('receipt email', 'POST', f'/api/receipts/{receipt["id"]}/email/', username)
+            if status != 200:
+                self.recorder.outcome('email rejected')
+                return False
+        self.recorder.outcome('payment completed' if pdf else 'receipt pdf missing')
+        return bool(pdf)
+
+    def payout(self):
+        from payments.models import LedgerEntry
+
+        username = self.admin[0]
+        status, data = self.client.call('payout initiate', 'POST', '/api/payouts/initiate/', username, {
+            'recipient_name': 'Load Test Recipient',
+            'recipient_phone': self.phone(),
+            'amount': self.amount(),
+            'reason': 'Load test payout',
+        }, headers={'Idempotency-Key': str(uuid.uuid4())})
+        if status != 202:
+            self.recorder.outcome('payout rejected')
+            return False
+        payout = data['payout']
+        with self.ids_lock:
+            self.payout_ids.append(payout['id'])
+
+        def settled():
+            status, data = self.client.call('payout detail', 'GET', f'/api/payouts/{payout["id"]}/', username)
+            return data.get('status') if data.get('status') in TERMINAL_STATUSES else None
+
+        final = self.wait_for('payout settled', settled)
+        if final != 'COMPLETED':
+            self.recorder.outcome(f'payout {final.lower()}' if final else 'payout unsettled')
+            return False
+        ledger = self.wait_for('payout ledger', lambda: LedgerEntry.objects.filter(
+            reference=f'LE-{payout["reference_code"]}'
+        ).exists())
+        self.recorder.outcome('payout completed' if ledger else 'payout ledger missing')
+        return bool(ledger)
+
+    def iteration(self, scheduled):
+        lag = self.since(scheduled)
+        self.recorder.record('harness: start delay', lag)
+        try:
+            if self.scenario == 'payout':
+                ok = self.payout()
+            elif self.scenario == 'mixed':
+                with self.rng_lock:
+                    method = 'MPESA' if self.rng.random() < MIXED_MPESA_SHARE else 'PAYSTACK'
+                ok = self.payment(method)
+            else:
+                ok = self.payment(self.scenario.upper())
+            self.recorder.record('flow: total', self.since(scheduled), ok=ok)
+        except Exception as e:
+            self.recorder.error('flow: total')
+            self.recorder.outcome(f'harness error: {type(e).__name__}')
+        finally:
+            close_old_connections()
+
+    # Queue depth
+
+    def sample_queues(self, stop):
+        from config.celery import app
+
+        try:
+            with app.connection_for_read() as connection:
+                channel = connection.default_channel
+                queues = list(app.amqp.queues) or [app.conf.task_default_queue]
+                while not stop.wait(1):
+                    depth = sum(channel.queue_declare(queue=name, passive=True).message_count for name in queues)
+                    self.queue_depths.append(depth)
+        except Exception as e:
+            self.recorder.outcome(f'queue sampling failed: {type(e).__name__}')
+
+    # Running
+
+    def run(self, progress=None):
+        progress = progress or (lambda message: None)
+        for username, password in set(self.users) | ({self.admin} if self.admin else set()):
+            self.client.login(username, password)
+
+        stop = threading.Event()
+        sampler = threading.Thread(target=self.sample_queues, args=(stop,), daemon=True)
+        sampler.start()
+        total = max(1, round(self.rate * self.duration))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='loadtest') as pool:
+            for index in range(total):
+                scheduled = started + index / self.rate
+                pause = scheduled - time.perf_counter()
+                if pause > 0:
+                    time.sleep(pause)
+                pool.submit(self.iteration, scheduled)
+                if index and index % max(1, round(self.rate * 10)) == 0:
+                    progress(f'{index}/{total} iterations started')
+        elapsed = time.perf_counter() - started
+        stop.set()
+        sampler.join(timeout=5)
+        return self.report(total, elapsed)
+
+    def report(self, total, elapsed):
+        depths = self.queue_depths
+        return {
+            'scenario': self.scenario,
+            'target_rate': self.rate,
+            'iterations': total,
+            'elapsed_seconds': round(elapsed, 1),
+            'achieved_rate': round(total / elapsed, 2) if elapsed else None,
+            'steps': self.recorder.rows(),
+            'task_lag': task_lag(self.transaction_ids, self.payout_ids),
+            'queue_depth': {
+                'samples': len(depths),
+                'mean': round(sum(depths) / len(depths), 1) if depths else None,
+                'max': max(depths) if depths else None,
+            },
+            'outcomes': dict(self.recorder.outcomes.most_common()),
+        }
+
+
+def task_lag(transaction_ids, payout_ids=()):
+    """
+    Time between a row and the one a Celery task or the callback consumer
+    wrote in response, for the rows a run created: how long work waited in
+    the queue plus how long it took. Rows as in Recorder.rows().
+    """
+    from payments.models import CallbackInbox, LedgerEntry, MpesaSTKRequest, PaystackTransaction, Transaction
+    from payouts.models import Payout, PayoutRequest
+
+    lags = defaultdict(list)
+
+    def collect(name, pairs):
+        for later, earlier in pairs:
+            if later and earlier:
+                lags[name].append((later - earlier).total_seconds() * 1000)
+
+    collect('task: initiate stk', MpesaSTKRequest.objects.filter(
+        transaction_id__in=transaction_ids).values_list('created_at', 'transaction__created_at'))
+    collect('task: initiate paystack', PaystackTransaction.objects.filter(
+        transaction_id__in=transaction_ids).values_list('created_at', 'transaction__created_at'))
+    collect('task: ledger credit', LedgerEntry.objects.filter(
+        transaction_id__in=transaction_ids, entry_type='CREDIT').values_list('created_at', 'transaction__completed_at'))
+    collect('task: initiate b2c', PayoutRequest.objects.filter(
+        payout_id__in=payout_ids).values_list('created_at', 'payout__created_at'))
+    collect('task: payout settled', Payout.objects.filter(
+        id__in=payout_ids).exclude(completed_at=None).values_list('completed_at', 'created_at'))
+    if transaction_ids:
+        first = Transaction.objects.filter(id__in=transaction_ids).order_by('created_at').values_list(
+            'created_at', flat=True).first()
+        collect('task: callback inbox', CallbackInbox.objects.filter(
+            received_at__gte=first, processed_at__isnull=False).values_list('processed_at', 'received_at'))
+        collect('task: transaction settled', Transaction.objects.filter(
+            id__in=transaction_ids).exclude(completed_at=None).values_list('completed_at', 'created_at'))
+
+    rows = []
+    for name, values in sorted(lags.items()):
+        values.sort()
+        rows.append({
+            'name': name, 'count': len(values), 'errors': 0,
+            'p50': percentile(values, 50), 'p95': percentile(values, 95), 'p99': percentile(values, 99),
+            'max': values[-1],
+        })
+    return rows
+
+
+def format_report(report):
+    def ms(value):
+        return '-' if value is None else f'{value:,.0f}'
+
+    lines = [
+        f'Scenario {report["scenario"]}: {report["iterations"]} iterations in {report["elapsed_seconds"]}s '
+        f'(target {report["target_rate"]}/s, achieved {report["achieved_rate"]}/s)',
+        '',
+        f'{"step":<28} {"count":>7} {"errors":>7} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"max ms":>9}',
+    ]
+    for row in report['steps'] + report['task_lag']:
+        lines.append(
+            f'{row["name"]:<28} {row["count"]:>7} {row["errors"]:>7} {ms(row["p50"]):>9} '
+            f'{ms(row["p95"]):>9} {ms(row["p99"]):>9} {ms(row["max"]):>9}'
+        )
+    depth = report['queue_depth']
+    lines += ['', f'Broker queue depth: mean {depth["mean"]}, max {depth["max"]} ({depth["samples"]} samples)']
+    lines += ['Outcomes: ' + ', '.join(f'{name} {count}' for name, count in report['outcomes'].items())]
+    if report.get('simulators'):
+        lines += ['Simulators: ' + json.dumps(report['simulators'])]
+    return '\n'.join(lines)
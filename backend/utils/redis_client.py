@@ -0,0 +1,63 @@
+import logging
+import os
+import redis
+import redis.asyncio
+from django.conf import settings
+from redis.exceptions import LockNotOwnedError
+
+logger = logging.getLogger(__name__)
+
+_connections = {}
+
+
+def _client_options():
+    options = {
+        'socket_connect_timeout': settings.REDIS_SOCKET_TIMEOUT,
+        'socket_timeout': settings.REDIS_SOCKET_TIMEOUT,
+        'health_check_interval': 30,
+    }
+    if settings.REDIS_URL.startswith('rediss://'):
+        options['ssl_cert_reqs'] = settings.CELERY_REDIS_SSL_CERT_REQS
+        ca_certs = os.environ.get('CELERY_REDIS_SSL_CA_CERTS')
+        if ca_certs:
+            options['ssl_ca_certs'] = ca_certs
+    return options
+
+
+def get_redis():
+    """
+    Returns a Redis client for the current process.
+    Clients are created lazily per PID so forked Celery/Gunicorn workers
+    never share a socket with their parent.
+    """
+    pid = os.getpid()
+    client = _connections.get(pid)
+    if client is None:
+        client = redis.Redis.from_url(settings.REDIS_URL, **_client_options())
+        _connections.clear()
+        _connections[pid] = client
+    return client
+
+
+def get_async_redis():
+    """
+    Returns a new asyncio Redis client for long-lived async consumers
+    (pub/sub streams). asyncio clients are bound to the event loop that
+    created them, so callers own the client and must aclose() it.
+    Reads block for as long as the caller waits, so no socket_timeout.
+    """
+    options = _client_options()
+    options['socket_timeout'] = None
+    return redis.asyncio.Redis.from_url(settings.REDIS_URL, **options)
+
+
+def release_lock(lock):
+    """
+    Releases a task lock. A task that outlived the lock's timeout no longer
+    owns it (it expired, and may have been taken by another run), which is
+    logged rather than raised from the task's finally block.
+    """
+    try:
+        lock.release()
+    except LockNotOwnedError:
+        logger.warning('Lock %s expired before it was released', lock.name)
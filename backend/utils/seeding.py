@@ -0,0 +1,655 @@
+"""
+Synthetic data at production volumes, for benchmarking the hot paths
+(`manage.py seed_portal --scale N`).
+
+One unit of scale is roughly a busy year of one office: VOLUMES lists the
+rows it adds. Activity is skewed towards a few users (Zipf weights), grows
+over the window, dips at weekends and follows office hours, and every table
+is written in time order so ids and timestamps correlate as they do in
+production. Rows are streamed a day at a time into COPY ... FROM STDIN, so
+memory stays flat however large the scale.
+
+Everything is drawn from one random.Random(seed): the same seed, scale,
+window and starting database give the same rows. Reference codes are not
+random but a permutation of a counter (see ReferenceCodes), so they never
+collide with each other, and a lookup per block skips any already taken.
+Ledger entries continue the account's running totals in the order they are
+appended, exactly as payments.ledger.append_entries writes them, so
+`manage.py verify_ledger_totals` passes afterwards.
+
+Signals are bypassed: nothing is queued, notified or cached while loading.
+"""
+import csv
+import io
+import json
+import random
+import string
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from utils.timewindow import day_start
+
+# Rows per unit of --scale. Ledger entries, receipts and contract invoices
+# follow from the completed transactions, payouts and signed contracts.
+VOLUMES = {
+    'admins': 2,
+    'staff': 25,
+    'transactions': 100_000,
+    'payouts': 2_000,
+    'quotes': 2_000,
+    'contracts': 2_000,
+    'invoices': 2_000,
+    'audit_logs': 200_000,
+    'sessions': 20_000,
+    'notifications': 50_000,
+}
+
+COPY_CHUNK = 20_000
+ID_BLOCK = 10_000
+CODE_BLOCK = 1_000
+
+# Seeded reference codes are prefix + SEED_MARKER + 7 base-36 digits, the
+# same length as generate_reference_code() output.
+SEED_MARKER = 'S'
+CODE_CHARS = string.digits + string.ascii_uppercase
+CODE_SPACE = 36 ** 7
+# Odd and not a multiple of 3, so n -> n * CODE_STEP % CODE_SPACE is a bijection.
+CODE_STEP = 25_214_903_917
+
+# Relative activity per local hour of the day, and on Saturdays and Sundays.
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 4, 8, 14, 18, 20, 20, 17, 18, 20, 19, 16, 12, 9, 7, 5, 4, 2, 1]
+WEEKEND_SHARE = 0.4
+
+TRANSACTION_STATUSES = (('COMPLETED', 85), ('FAILED', 9), ('CANCELLED', 4), ('PENDING', 2))
+PAYOUT_STATUSES = (('COMPLETED', 88), ('FAILED', 8), ('CANCELLED', 4))
+CONTRACT_STATUSES = (('SIGNED', 45), ('SENT', 20), ('VIEWED', 10), ('DRAFT', 10), ('EXPIRED', 10), ('CANCELLED', 5))
+QUOTE_STATUSES = (('SENT', 35), ('ACCEPTED', 25), ('VIEWED', 10), ('DRAFT', 10), ('REJECTED', 10), ('EXPIRED', 10))
+INVOICE_STATUSES = (('PAID', 60), ('SENT', 15), ('PENDING', 10), ('OVERDUE', 8), ('DRAFT', 4), ('CANCELLED', 3))
+AUDIT_ACTIONS = (
+    ('LOGIN', 30), ('LOGOUT', 20), ('PAYMENT_INITIATED', 15), ('PAYMENT_COMPLETED', 12), ('PAYMENT_FAILED', 2),
+    ('RECEIPT_GENERATED', 8), ('QUOTE_CREATED', 3), ('QUOTE_SENT', 2), ('CONTRACT_CREATED', 2),
+    ('CONTRACT_SIGNED', 1), ('INVOICE_CREATED', 2), ('INVOICE_SENT', 2), ('DOCUMENT_VERIFIED', 3),
+    ('USER_UPDATED', 1), ('PASSWORD_CHANGED', 1),
+)
+NOTIFICATION_TYPES = (
+    ('PAYMENT_COMPLETED', 55), ('PAYMENT_FAILED', 8), ('CONTRACT_SIGNED', 10), ('INVOICE_OVERDUE', 7),
+    ('PAYOUT_COMPLETED', 8), ('PAYOUT_FAILED', 2), ('SYSTEM_ALERT', 10),
+)
+PRIORITIES = (('LOW', 20), ('MEDIUM', 60), ('HIGH', 17), ('CRITICAL', 3))
+
+FIRST_NAMES = ['Amina', 'Brian', 'Cynthia', 'David', 'Esther', 'Felix', 'Grace', 'Hassan', 'Irene', 'James',
+               'Kevin', 'Lucy', 'Mercy', 'Njeri', 'Otieno', 'Peter', 'Rose', 'Samuel', 'Wanjiru', 'Zawadi']
+LAST_NAMES = ['Achieng', 'Barasa', 'Chege', 'Kamau', 'Kariuki', 'Kiptoo', 'Mutua', 'Mwangi', 'Njoroge',
+              'Ochieng', 'Odhiambo', 'Omondi', 'Otieno', 'Wafula', 'Wambui']
+COMPANIES = ['Savanna Foods', 'Rift Logistics', 'Lakeview Clinic', 'Jua Kali Works', 'Mombasa Traders',
+             'Highland Dairy', 'Nairobi Print House', 'Kilima Builders', 'Pwani Tours', 'Tana Agro']
+SERVICES = ['Website redesign', 'Monthly IT support', 'Network installation', 'Mobile app development',
+            'Hosting renewal', 'Security audit', 'Staff training', 'Software licence', 'Data migration']
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15',
+    'Mozilla/5.0 (Linux; Android 14; SM-A546E) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Mobile Safari/537.36',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148',
+]
+
+
+def volumes(scale):
+    """Row counts for a scale factor; fractional scales give small data sets."""
+    return {name: max(1, round(count * scale)) for name, count in VOLUMES.items()}
+
+
+def cumulative(weighted):
+    """(values, cumulative weights) of ((value, weight), ...) pairs, for rng.choices()."""
+    values, weights = zip(*weighted)
+    total, cum_weights = 0, []
+    for weight in weights:
+        total += weight
+        cum_weights.append(total)
+    return list(values), cum_weights
+
+
+def skewed(rng, items, exponent=1.1):
+    """
+    `items` in a random order with Zipf weights: the first is picked
+    about twice as often as the second, and so on down a long tail.
+    """
+    items = list(items)
+    rng.shuffle(items)
+    return cumulative([(item, 1 / (rank + 1) ** exponent) for rank, item in enumerate(items)])
+
+
+class Timeline:
+    """
+    The local days first..last with a weight each: activity grows by
+    `growth` (1.5 = 150%) from the first day to the last and drops at
+    weekends. moments() spreads rows over the days and hours accordingly.
+    """
+
+    def __init__(self, rng, first, last, growth=1.5):
+        self.rng = rng
+        self.days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+        span = max(len(self.days) - 1, 1)
+        self.weights = [
+            (1 + growth * index / span) * (WEEKEND_SHARE if day.weekday() >= 5 else 1)
+            for index, day in enumerate(self.days)
+        ]
+        self.starts = [day_start(day) for day in self.days]
+        self.start = self.starts[0]
+        self.end = day_start(last + timedelta(days=1))
+        self.hours, self.hour_weights = cumulative(enumerate(HOUR_WEIGHTS))
+
+    def per_day(self, total):
+        """`total` split over the days by weight, with +/-20% noise per day."""
+        raw = [weight * self.rng.uniform(0.8, 1.2) for weight in self.weights]
+        share = total / sum(raw)
+        counts = [int(value * share) for value in raw]
+        remainders = sorted(range(len(raw)), key=lambda i: raw[i] * share - counts[i], reverse=True)
+        for index in remainders[:total - sum(counts)]:
+            counts[index] += 1
+        return counts
+
+    def moments(self, total):
+        """Yields one sorted list of aware datetimes per day, `total` in all."""
+        for start, count in zip(self.starts, self.per_day(total)):
+            if not count:
+                continue
+            hours = self.rng.choices(self.hours, cum_weights=self.hour_weights, k=count)
+            yield sorted(start + timedelta(hours=hour, seconds=self.rng.random() * 3600) for hour in hours)
+
+
+class ReferenceCodes:
+    """
+    Unique reference codes for one prefix across the given (model, field)
+    pairs. Code n is prefix + SEED_MARKER + n * CODE_STEP mod 36**7 in
+    base 36: distinct for every n, random-looking, and numbered on from
+    the seeded codes already stored, so repeated runs do not collide
+    either. Codes that exist anyway are skipped a block at a time.
+    """
+
+    def __init__(self, prefix, *targets):
+        self.prefix = prefix + SEED_MARKER
+        self.targets = targets
+        self.counter = sum(
+            model.objects.filter(**{f'{field}__startswith': self.prefix}).count() for model, field in targets
+        )
+        self.pending = []
+
+    def encode(self, number):
+        value = number * CODE_STEP % CODE_SPACE
+        digits = []
+        for _ in range(7):
+            value, digit = divmod(value, 36)
+            digits.append(CODE_CHARS[digit])
+        return self.prefix + ''.join(reversed(digits))
+
+    def __next__(self):
+        while not self.pending:
+            codes = [self.encode(self.counter + offset) for offset in range(CODE_BLOCK)]
+            self.counter += CODE_BLOCK
+            taken = set()
+            for model, field in self.targets:
+                taken.update(model.objects.filter(**{f'{field}__in': codes}).values_list(field, flat=True))
+            self.pending = [code for code in reversed(codes) if code not in taken]
+        return self.pending.pop()
+
+    def __iter__(self):
+        return self
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+class CopyWriter:
+    """
+    Buffers rows for one model and loads them with COPY ... FROM STDIN.
+    Ids are drawn from the table's sequence up front, so add() can return
+    the id a row will get and children can reference it straight away.
+    """
+
+    def __init__(self, cursor, model, fields):
+        self.cursor = cursor
+        self.table = model._meta.db_table
+        self.columns = ', '.join(
+            f'"{column}"' for column in ['id'] + [model._meta.get_field(name).column for name in fields]
+        )
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [self.table])
+        self.sequence = cursor.fetchone()[0]
+        self.ids = []
+        self.rows = []
+        self.count = 0
+
+    def next_id(self):
+        if not self.ids:
+            self.cursor.execute("SELECT nextval(%s) FROM generate_series(1, %s)", [self.sequence, ID_BLOCK])
+            self.ids = [row[0] for row in reversed(self.cursor.fetchall())]
+        return self.ids.pop()
+
+    def add(self, *values):
+        row_id = self.next_id()
+        self.rows.append((row_id,) + values)
+        if len(self.rows) >= COPY_CHUNK:
+            self.flush()
+        return row_id
+
+    def flush(self):
+        if not self.rows:
+            return
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([copy_value(value) for value in row] for row in self.rows)
+        buffer.seek(0)
+        self.cursor.cursor.copy_expert(
+            f"""COPY "{self.table}" ({self.columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')""", buffer
+        )
+        self.count += len(self.rows)
+        self.rows = []
+
+
+class PortalSeeder:
+    """
+    Generates and loads one data set. run() does everything inside a single
+    database transaction and returns {table: rows written}.
+    """
+
+    def __init__(self, scale=1, days=365, end=None, seed=0, password='portal-seed'):
+        self.rng = random.Random(seed)
+        self.counts = volumes(scale)
+        last = end or timezone.localdate() - timedelta(days=1)
+        self.timeline = Timeline(self.rng, last - timedelta(days=days - 1), last)
+        self.password = password
+        self.written = {}
+
+    # Random values
+
+    def pick(self, weighted, k=None):
+        values, cum_weights = weighted
+        if k is None:
+            return self.rng.choices(values, cum_weights=cum_weights)[0]
+        return self.rng.choices(values, cum_weights=cum_weights, k=k)
+
+    def amount(self, mu=7.6, sigma=1.1, low=50, high=1_000_000):
+        return Decimal(min(max(round(self.rng.lognormvariate(mu, sigma)), low), high))
+
+    def phone(self):
+        return f'2547{self.rng.randrange(10 ** 8):08d}'
+
+    def person(self):
+        return f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+
+    def client(self):
+        name = self.person()
+        company = self.rng.choice(COMPANIES)
+        email = f'{name.split()[0].lower()}@{company.split()[0].lower()}.co.ke'
+        return name, email, self.phone(), company
+
+    def ip(self):
+        return f'41.{self.rng.randrange(60, 240)}.{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}'
+
+    def after(self, moment, low, high):
+        """A moment `low` to `high` seconds after `moment`."""
+        return moment + timedelta(seconds=self.rng.uniform(low, high))
+
+    # Loading
+
+    def writer(self, model, fields):
+        return CopyWriter(self.cursor, model, fields)
+
+    def close(self, name, *writers):
+        for writer in writers:
+            writer.flush()
+        self.written[name] = sum(writer.count for writer in writers)
+
+    def run(self, progress=None):
+        from audit.partitions import ensure_partitions_between
+
+        self.progress = progress or (lambda message: None)
+        ensure_partitions_between(self.timeline.start, timezone.now())
+        with transaction.atomic(), connection.cursor() as cursor:
+            self.cursor = cursor
+            for step in (self.seed_users, self.seed_payments, self.seed_documents, self.seed_activity):
+                started = time.monotonic()
+                step()
+                self.progress(f'{step.__name__}: {time.monotonic() - started:.1f}s')
+            self.invalidate()
+        return self.written
+
+    def invalidate(self):
+        from utils.cache import invalidate_cache
+        from utils.summary import invalidate_summary
+
+        invalidate_summary('transactions', self.staff_ids + self.admin_ids)
+        invalidate_summary('payouts')
+        invalidate_cache('transactions', 'payouts', 'contracts', 'invoices')
+
+    # Users
+
+    def seed_users(self):
+        User = get_user_model()
+        existing = User.objects.filter(username__startswith='seed-').count()
+        password = make_password(self.password)
+        joined = self.timeline.start - timedelta(days=30)
+        writer = self.writer(User, [
+            'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email', 'is_staff',
+            'is_active', 'date_joined', 'role', 'phone_number', 'is_locked', 'failed_login_attempts',
+            'must_change_password',
+        ])
+
+        def create(role, count):
+            candidates = [
+                (f'seed-{role.lower()}-{number:05d}', f'2541{number:08d}')
+                for number in range(existing, existing + count * 2)
+            ]
+            taken_names = set(User.objects.filter(
+                username__in=[name for name, _ in candidates]).values_list('username', flat=True))
+            taken_phones = set(User.objects.filter(
+                phone_number__in=[phone for _, phone in candidates]).values_list('phone_number', flat=True))
+            free = [
+                (name, phone) for name, phone in candidates if name not in taken_names and phone not in taken_phones
+            ]
+            ids = []
+            for username, phone in free[:count]:
+                first, last = self.person().split()
+                ids.append(writer.add(
+                    password, False, username, first, last, f'{username}@example.com', False,
+                    True, joined, role, phone, False, 0, False,
+                ))
+            return ids
+
+        self.admin_ids = create('ADMIN', self.counts['admins'])
+        existing += self.counts['admins'] * 2
+        self.staff_ids = create('STAFF', self.counts['staff'])
+        self.close('users', writer)
+        self.users = skewed(self.rng, self.staff_ids + self.admin_ids)
+        self.staff = skewed(self.rng, self.staff_ids)
+        self.admins = skewed(self.rng, self.admin_ids)
+
+    # Money: payouts, transactions, receipts and the ledger
+
+    def seed_payments(self):
+        from payments.models import LedgerAccount, LedgerEntry, Transaction
+        from payments.ledger import DEFAULT_ACCOUNT
+        from payouts.models import Payout
+        from receipts.models import Receipt
+
+        debits = self.seed_payouts(Payout)
+
+        transactions = self.writer(Transaction, [
+            'user', 'reference_code', 'provider_reference', 'amount', 'payment_method', 'status', 'description',
+            'phone_number', 'email', 'callback_data', 'created_at', 'updated_at', 'completed_at',
+            'failed_reason', 'is_immutable',
+        ])
+        receipts = self.writer(Receipt, [
+            'transaction', 'reference_code', 'status', 'generated_at', 'downloaded_at', 'downloaded_by',
+            'download_count', 'is_immutable',
+        ])
+        entries = self.writer(LedgerEntry, [
+            'transaction', 'account', 'entry_type', 'amount', 'balance_after', 'description', 'reference',
+            'created_at', 'is_immutable',
+        ])
+        transaction_codes = ReferenceCodes('DP', (Transaction, 'reference_code'))
+        receipt_codes = ReferenceCodes('DR', (Receipt, 'reference_code'))
+        entry_codes = ReferenceCodes('LE', (LedgerEntry, 'reference'))
+        statuses = cumulative(TRANSACTION_STATUSES)
+
+        LedgerAccount.objects.get_or_create(code=DEFAULT_ACCOUNT)
+        account = LedgerAccount.objects.select_for_update().get(code=DEFAULT_ACCOUNT)
+        totals = {'CREDIT': account.total_credits, 'DEBIT': account.total_debits}
+        appended = 0
+        last_entry_at = account.last_entry_at
+
+        for moments in self.timeline.moments(self.counts['transactions']):
+            credits = []
+            users = self.pick(self.users, k=len(moments))
+            for user_id, created in zip(users, moments):
+                code = next(transaction_codes)
+                status = self.pick(statuses)
+                method = 'MPESA' if self.rng.random() < 0.8 else 'PAYSTACK'
+                amount = self.amount()
+                finished = self.after(created, 5, 180) if status != 'PENDING' else None
+                completed = finished if status == 'COMPLETED' else None
+                provider_reference = None
+                if completed:
+                    provider_reference = (
+                        ''.join(self.rng.choices(CODE_CHARS[10:] + CODE_CHARS[:10], k=10)) if method == 'MPESA'
+                        else f'{self.rng.randrange(10 ** 9, 10 ** 10)}'
+                    )
+                transaction_id = transactions.add(
+                    user_id, code, provider_reference, amount, method, status,
+                    f'Payment for {self.rng.choice(SERVICES).lower()}',
+                    self.phone() if method == 'MPESA' else None,
+                    f'customer{self.rng.randrange(10 ** 6)}@example.com' if method == 'PAYSTACK' else None,
+                    {}, created, finished or created, completed,
+                    'Request cancelled by user' if status == 'FAILED' else None, True,
+                )
+                if completed:
+                    credits.append((completed, 'CREDIT', amount, transaction_id, f'Payment completed: {code}', None))
+                    if self.rng.random() < 0.9:
+                        downloads = self.rng.choice((0, 0, 1, 1, 2, 5))
+                        receipts.add(
+                            transaction_id, next(receipt_codes), 'DOWNLOADED' if downloads else 'GENERATED',
+                            self.after(completed, 1, 10), self.after(completed, 60, 86400) if downloads else None,
+                            user_id if downloads else None, downloads, True,
+                        )
+
+            day_end = moments[-1]
+            while debits and debits[0][0] <= day_end:
+                credits.append(debits.popleft())
+            credits.sort(key=lambda entry: entry[0])
+            for moment, entry_type, amount, transaction_id, description, reference in credits:
+                totals[entry_type] += amount
+                entries.add(
+                    transaction_id, DEFAULT_ACCOUNT, entry_type, amount, totals[entry_type], description,
+                    reference or next(entry_codes), moment, True,
+                )
+                appended += 1
+                last_entry_at = moment if last_entry_at is None else max(last_entry_at, moment)
+
+        for moment, entry_type, amount, transaction_id, description, reference in debits:
+            totals[entry_type] += amount
+            entries.add(
+                None, DEFAULT_ACCOUNT, entry_type, amount, totals[entry_type], description, reference, moment, True
+            )
+            appended += 1
+            last_entry_at = moment if last_entry_at is None else max(last_entry_at, moment)
+
+        self.close('transactions', transactions)
+        self.close('receipts', receipts)
+        self.close('ledger_entries', entries)
+        LedgerAccount.objects.filter(pk=account.pk).update(
+            total_credits=totals['CREDIT'], total_debits=totals['DEBIT'],
+            net_balance=totals['CREDIT'] - totals['DEBIT'], entry_count=account.entry_count + appended,
+            last_entry_at=last_entry_at, updated_at=timezone.now(),
+        )
+
+    def seed_payouts(self, Payout):
+        """Loads the payouts; returns their ledger debits, oldest first."""
+        writer = self.writer(Payout, [
+            'admin_user', 'reference_code', 'provider_reference', 'recipient_name', 'recipient_phone', 'amount',
+            'reason', 'status', 'conversation_id', 'originator_conversation_id', 'callback_data', 'created_at',
+            'updated_at', 'completed_at', 'failed_reason', 'is_immutable',
+        ])
+        codes = ReferenceCodes('DD', (Payout, 'reference_code'))
+        statuses = cumulative(PAYOUT_STATUSES)
+        debits = []
+        for moments in self.timeline.moments(self.counts['payouts']):
+            for created in moments:
+                code = next(codes)
+                status = self.pick(statuses)
+                amount = self.amount(mu=9, sigma=0.9, low=500)
+                recipient = self.person()
+                finished = self.after(created, 20, 600)
+                completed = finished if status == 'COMPLETED' else None
+                conversation = f'AG_{created:%Y%m%d}_{self.rng.getrandbits(64):016x}'
+                writer.add(
+                    self.pick(self.admins), code, f'{self.rng.getrandbits(40):010X}' if completed else None,
+                    recipient, self.phone(), amount, f'Payment to {recipient}', status, conversation,
+                    f'{self.rng.randrange(10 ** 5)}-{self.rng.randrange(10 ** 8)}-1', {}, created, finished,
+                    completed, 'The initiator information is invalid.' if status == 'FAILED' else None, True,
+                )
+                if completed:
+                    debits.append((
+                        completed, 'DEBIT', amount, None, f'Payout completed: {code} to {recipient}', f'LE-{code}'
+                    ))
+        self.close('payouts', writer)
+        debits.sort(key=lambda entry: entry[0])
+        return deque(debits)
+
+    # Documents: quotes, contracts with their invoices, invoices
+
+    def seed_documents(self):
+        from contracts.models import Contract, Invoice as ContractInvoice
+        from invoices.models import Invoice
+        from quotes.models import Quote
+
+        invoice_codes = ReferenceCodes('DV', (Invoice, 'reference_code'), (ContractInvoice, 'reference_code'))
+        end = self.timeline.end
+
+        quotes = self.writer(Quote, [
+            'created_by', 'reference_code', 'client_name', 'client_email', 'client_phone', 'service_description',
+            'amount', 'valid_until', 'status', 'created_at', 'updated_at', 'is_immutable',
+        ])
+        codes = ReferenceCodes('DQ', (Quote, 'reference_code'))
+        statuses = cumulative(QUOTE_STATUSES)
+        for moments in self.timeline.moments(self.counts['quotes']):
+            for created, user_id in zip(moments, self.pick(self.staff, k=len(moments))):
+                name, email, phone, company = self.client()
+                quotes.add(
+                    user_id, next(codes), name, email, phone, self.rng.choice(SERVICES), self.amount(mu=10),
+                    created + timedelta(days=30), self.pick(statuses), created, self.after(created, 0, 86400 * 3), True,
+                )
+        self.close('quotes', quotes)
+
+        contracts = self.writer(Contract, [
+            'created_by', 'reference_code', 'client_name', 'client_email', 'client_phone', 'service_description',
+            'amount', 'signing_token', 'status', 'signed_at', 'place_of_signing', 'ip_address_signed',
+            'created_at', 'updated_at', 'expires_at', 'is_immutable',
+        ])
+        contract_invoices = self.writer(ContractInvoice, [
+            'contract', 'reference_code', 'client_name', 'client_email', 'client_phone', 'service_description',
+            'amount', 'due_date', 'status', 'created_at', 'updated_at', 'paid_at', 'is_immutable',
+        ])
+        codes = ReferenceCodes('DC', (Contract, 'reference_code'))
+        statuses = cumulative(CONTRACT_STATUSES)
+        for moments in self.timeline.moments(self.counts['contracts']):
+            for created, user_id in zip(moments, self.pick(self.staff, k=len(moments))):
+                name, email, phone, company = self.client()
+                status = self.pick(statuses)
+                service = self.rng.choice(SERVICES)
+                amount = self.amount(mu=10.5)
+                signed = self.after(created, 3600, 86400 * 10) if status == 'SIGNED' else None
+                if signed and signed >= end:
+                    status, signed = 'SENT', None
+                code = next(codes)
+                # Prefixed with the unique reference so a rerun with the same seed cannot repeat a token.
+                contract_id = contracts.add(
+                    user_id, code, name, email, phone, service, amount,
+                    f'{code.lower()}{self.rng.getrandbits(192):048x}',
+                    status, signed, 'Nairobi' if signed else None, self.ip() if signed else None,
+                    created, signed or created, created + timedelta(days=30), True,
+                )
+                if signed:
+                    due = signed + timedelta(days=14)
+                    paid = self.after(signed, 86400, 86400 * 20) if self.rng.random() < 0.7 else None
+                    if paid and paid >= end:
+                        paid = None
+                    invoice_status = 'PAID' if paid else ('OVERDUE' if due < end else 'PENDING')
+                    contract_invoices.add(
+                        contract_id, next(invoice_codes), name, email, phone, service, amount, due,
+                        invoice_status, signed, paid or signed, paid, True,
+                    )
+        self.close('contracts', contracts)
+        self.close('contract_invoices', contract_invoices)
+
+        invoices = self.writer(Invoice, [
+            'created_by', 'reference_code', 'client_name', 'client_email', 'client_phone', 'client_company',
+            'service_description', 'amount', 'tax_amount', 'total_amount', 'due_date', 'status', 'paid_at',
+            'payment_reference', 'notes', 'created_at', 'updated_at', 'is_immutable',
+        ])
+        statuses = cumulative(INVOICE_STATUSES)
+        for moments in self.timeline.moments(self.counts['invoices']):
+            for created, user_id in zip(moments, self.pick(self.staff, k=len(moments))):
+                name, email, phone, company = self.client()
+                status = self.pick(statuses)
+                amount = self.amount(mu=10)
+                tax = (amount * Decimal('0.16')).quantize(Decimal('0.01'))
+                paid = self.after(created, 86400, 86400 * 30) if status == 'PAID' else None
+                invoices.add(
+                    user_id, next(invoice_codes), name, email, phone, company, self.rng.choice(SERVICES), amount,
+                    tax, amount + tax, created + timedelta(days=30), status, paid,
+                    f'{self.rng.getrandbits(40):010X}' if paid else None, None, created, paid or created, True,
+                )
+        self.close('invoices', invoices)
+
+    # Activity: audit trail, sessions, notifications
+
+    def seed_activity(self):
+        from audit.models import AuditLog, UserSession
+        from notifications.models import Notification
+
+        logs = self.writer(AuditLog, [
+            'user', 'action', 'description', 'ip_address', 'user_agent', 'timestamp', 'is_immutable', 'metadata',
+        ])
+        actions = cumulative(AUDIT_ACTIONS)
+        for moments in self.timeline.moments(self.counts['audit_logs']):
+            for moment, user_id in zip(moments, self.pick(self.users, k=len(moments))):
+                action = self.pick(actions)
+                logs.add(
+                    user_id if self.rng.random() < 0.97 else None, action, action.replace('_', ' ').capitalize(),
+                    self.ip(), self.rng.choice(USER_AGENTS), moment, True, {},
+                )
+        self.close('audit_logs', logs)
+
+        sessions = self.writer(UserSession, [
+            'user', 'session_key', 'ip_address', 'user_agent', 'created_at', 'last_seen', 'is_active',
+        ])
+        active_after = self.timeline.end - timedelta(hours=12)
+        for moments in self.timeline.moments(self.counts['sessions']):
+            for created, user_id in zip(moments, self.pick(self.users, k=len(moments))):
+                last_seen = self.after(created, 300, 8 * 3600)
+                sessions.add(
+                    user_id, f'{self.rng.getrandbits(160):040x}', self.ip(), self.rng.choice(USER_AGENTS),
+                    created, last_seen, last_seen >= active_after,
+                )
+        self.close('sessions', sessions)
+
+        notifications = self.writer(Notification, [
+            'recipient', 'notification_type', 'priority', 'title', 'message', 'is_read', 'metadata',
+            'created_at', 'read_at', 'expires_at',
+        ])
+        types = cumulative(NOTIFICATION_TYPES)
+        priorities = cumulative(PRIORITIES)
+        recent = self.timeline.end - timedelta(days=7)
+        for moments in self.timeline.moments(self.counts['notifications']):
+            for created, user_id in zip(moments, self.pick(self.users, k=len(moments))):
+                kind = self.pick(types)
+                is_read = self.rng.random() < (0.4 if created >= recent else 0.95)
+                title = kind.replace('_', ' ').capitalize()
+                notifications.add(
+                    user_id, kind, self.pick(priorities), title, f'{title}.', is_read, {}, created,
+                    self.after(created, 60, 86400 * 2) if is_read else None, None,
+                )
+        self.close('notifications', notifications)
+
+
+def rebuild_rollups(first):
+    """Recomputes the daily facts and performance rollups from local date `first` to today."""
+    from reports.facts import rebuild_facts
+    from reports.performance import rebuild_performance
+
+    days = (timezone.localdate() - first).days + 1
+    transaction_rows, audit_rows = rebuild_facts(days)
+    written, _ = rebuild_performance(days)
+    return {'transaction_facts': transaction_rows, 'audit_facts': audit_rows, 'performance_rows': written}
@@ -0,0 +1,627 @@
+"""
+Local stand-ins for Daraja (M-Pesa), Paystack and an SMTP server, for load
+tests that must not touch the real providers (`manage.py simulate_providers`).
+
+Each simulator answers the calls payments.mpesa.MpesaClient,
+payments.paystack.PaystackClient and Django's SMTP backend make, after a
+random delay, and fails a share of them, as set by its Behaviour. Payment
+outcomes are delivered the way the providers deliver them: STK and B2C
+results are POSTed to the CallBackURL / ResultURL in the request, Paystack
+events to the configured webhook URL, after `callback_delay_ms`. A callback
+the app does not accept with a 2xx is retried with backoff.
+
+Point the app (web and Celery workers) at them with MPESA_BASE_URL,
+PAYSTACK_BASE_URL, EMAIL_HOST / EMAIL_PORT and EMAIL_USE_TLS=False.
+GET /__sim__/stats on either HTTP simulator returns the counters of all of
+them.
+"""
+import hashlib
+import heapq
+import hmac
+import itertools
+import json
+import logging
+import random
+import re
+import secrets
+import socketserver
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+
+logger = logging.getLogger(__name__)
+
+# latency_ms: median response time, spread log-normally by `jitter`.
+# error_rate: share of calls answered with a provider error (HTTP 5xx, SMTP 451).
+# failure_rate: share of payments whose outcome is a failure (cancelled, declined).
+# callback_delay_ms: time from the request to its callback or webhook.
+# callback_loss_rate: share of callbacks never sent (left to reconciliation).
+# duplicate_rate: share of callbacks sent twice.
+Behaviour = namedtuple(
+    'Behaviour', 'latency_ms jitter error_rate failure_rate callback_delay_ms callback_loss_rate duplicate_rate'
+)
+DEFAULT_BEHAVIOUR = Behaviour(
+    latency_ms=150, jitter=0.5, error_rate=0.0, failure_rate=0.1, callback_delay_ms=1500,
+    callback_loss_rate=0.0, duplicate_rate=0.0,
+)
+
+CALLBACK_RETRIES = 3
+STATS_PATH = '/__sim__/stats'
+
+
+def parse_behaviour(spec, base=DEFAULT_BEHAVIOUR):
+    """'latency_ms=300,error_rate=0.05' -> `base` with those fields replaced."""
+    changes = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        name, _, value = item.partition('=')
+        if name not in Behaviour._fields or not value:
+            raise ValueError(f'Unknown behaviour setting "{item}"; use {", ".join(Behaviour._fields)}.')
+        changes[name] = float(value)
+    return base._replace(**changes)
+
+
+class Stats:
+    """Thread-safe counters."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+
+    def incr(self, name, amount=1):
+        with self.lock:
+            self.counts[name] += amount
+
+    def snapshot(self):
+        with self.lock:
+            return dict(sorted(self.counts.items()))
+
+
+class CallbackDispatcher:
+    """
+    Sends scheduled callbacks from a background thread, each POST on a
+    small pool so a slow endpoint does not hold the others back.
+    """
+    name = 'callbacks'
+
+    def __init__(self, stats, workers=8, timeout=10):
+        self.stats = stats
+        self.timeout = timeout
+        self.queue = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sim-callback')
+        self.local = threading.local()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='sim-dispatcher', daemon=True)
+        self.thread.start()
+
+    def schedule(self, delay, url, payload, headers=None, attempt=0):
+        with self.condition:
+            heapq.heappush(
+                self.queue, (time.monotonic() + delay, next(self.counter), url, payload, headers or {}, attempt)
+            )
+            self.condition.notify()
+
+    def pending(self):
+        with self.condition:
+            return len(self.queue)
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and (not self.queue or self.queue[0][0] > time.monotonic()):
+                    self.condition.wait(timeout=self.queue[0][0] - time.monotonic() if self.queue else None)
+                if not self.running:
+                    return
+                _, _, url, payload, headers, attempt = heapq.heappop(self.queue)
+            self.pool.submit(self.send, url, payload, headers, attempt)
+
+    def session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def send(self, url, payload, headers, attempt):
+        body = json.dumps(payload).encode()
+        try:
+            response = self.session().post(
+                url, data=body, headers={'Content-Type': 'application/json', **headers}, timeout=self.timeout
+            )
+            ok = response.status_code < 300
+        except requests.RequestException as e:
+            logger.debug('Callback to %s failed: %s', url, e)
+            ok = False
+        if ok:
+            self.stats.incr('callbacks_delivered')
+        elif attempt < CALLBACK_RETRIES:
+            self.stats.incr('callbacks_retried')
+            self.schedule(2 ** attempt, url, payload, headers, attempt + 1)
+        else:
+            self.stats.incr('callbacks_failed')
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.pool.shutdown(wait=False)
+
+
+class Simulator:
+    """
+    A provider API. `routes` maps (method, path regex) to a method name;
+    handlers take (headers, body, *groups) and return (status, payload).
+    """
+    name = ''
+    routes = ()
+
+    def __init__(self, behaviour=DEFAULT_BEHAVIOUR, dispatcher=None, seed=None, registry=None):
+        self.behaviour = behaviour
+        self.stats = Stats()
+        self.dispatcher = dispatcher or CallbackDispatcher(self.stats)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.registry = registry if registry is not None else [self]
+        self.server = None
+
+    def chance(self, rate):
+        with self.lock:
+            return self.rng.random() < rate
+
+    def delay(self):
+        """One response time, in seconds."""
+        if not self.behaviour.latency_ms:
+            return 0
+        with self.lock:
+            factor = self.rng.lognormvariate(0, self.behaviour.jitter) if self.behaviour.jitter else 1
+        return self.behaviour.latency_ms * factor / 1000
+
+    def callback(self, url, payload, headers=None):
+        """Schedules a callback, dropped or doubled as the behaviour says."""
+        if not url or self.chance(self.behaviour.callback_loss_rate):
+            self.stats.incr('callbacks_lost')
+            return
+        delay = self.behaviour.callback_delay_ms / 1000
+        self.dispatcher.schedule(delay, url, payload, headers)
+        self.stats.incr('callbacks_scheduled')
+        if self.chance(self.behaviour.duplicate_rate):
+            self.dispatcher.schedule(delay + 0.5, url, payload, headers)
+            self.stats.incr('callbacks_duplicated')
+
+    def error_response(self):
+        return 503, {'message': 'Service unavailable'}
+
+    def dispatch(self, method, path, headers, body):
+        if method == 'GET' and path == STATS_PATH:
+            return 200, {simulator.name: simulator.stats.snapshot() for simulator in self.registry}
+        time.sleep(self.delay())
+        for route_method, pattern, handler in self.routes:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                self.stats.incr(f'{handler}_calls')
+                if self.chance(self.behaviour.error_rate):
+                    self.stats.incr(f'{handler}_errors')
+                    return self.error_response()
+                return getattr(self, handler)(headers, body, *match.groups())
+        return 404, {'message': f'No route for {method} {path}'}
+
+    def start(self, host='127.0.0.1', port=0):
+        """Serves on a background thread; returns the base URL."""
+        self.server = ThreadingHTTPServer((host, port), SimulatorHandler)
+        self.server.daemon_threads = True
+        self.server.simulator = self
+        threading.Thread(target=self.server.serve_forever, name=f'sim-{self.name}', daemon=True).start()
+        return f'http://{host}:{self.server.server_address[1]}'
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def handle_method(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = None
+        path = self.path.split('?', 1)[0]
+        if body is None:
+            status, payload = 400, {'message': 'Body is not valid JSON'}
+        else:
+            status, payload = self.server.simulator.dispatch(method, path, self.headers, body)
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.handle_method('GET')
+
+    def do_POST(self):
+        self.handle_method('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def mpesa_timestamp():
+    return datetime.now().strftime('%Y%m%d%H%M%S')
+
+
+class DarajaSimulator(Simulator):
+    """OAuth, STK push and query, B2C and transaction status, with result callbacks."""
+    name = 'daraja'
+    routes = (
+        ('GET', r'/oauth/v1/generate', 'oauth'),
+        ('POST', r'/mpesa/stkpush/v1/processrequest', 'stk_push'),
+        ('POST', r'/mpesa/stkpushquery/v1/query', 'stk_query'),
+        ('POST', r'/mpesa/b2c/v1/paymentrequest', 'b2c_payment'),
+        ('POST', r'/mpesa/transactionstatus/v1/query', 'transaction_status'),
+    )
+    STK_FAILURES = (
+        (1032, 'Request cancelled by user'),
+        (1037, 'DS timeout user cannot be reached'),
+        (1, 'The balance is insufficient for the transaction'),
+    )
+    B2C_FAILURES = (
+        (2001, 'The initiator information is invalid.'),
+        (2040, 'Credit Party customer type (Unregistered or Registered Customer) can\'t be supported by the service.'),
+    )
+
+    def __init__(self, *args, token_ttl=3599, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.token_ttl = token_ttl
+        self.tokens = {}
+        self.stk_requests = {}
+        self.b2c_requests = {}
+
+    def error_response(self):
+        return 503, {
+            'requestId': secrets.token_hex(8), 'errorCode': '503.001.1001',
+            'errorMessage': 'Service is currently unavailable',
+        }
+
+    def receipt_number(self):
+        with self.lock:
+            return ''.join(self.rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=10))
+
+    def outcome(self, failures):
+        if self.chance(self.behaviour.failure_rate):
+            with self.lock:
+                return self.rng.choice(failures)
+        return 0, 'The service request is processed successfully.'
+
+    def authorised(self, headers):
+        token = (headers.get('Authorization') or '').removeprefix('Bearer ')
+        expires = self.tokens.get(token)
+        return expires is not None and expires > time.monotonic()
+
+    def unauthorised(self):
+        self.stats.incr('invalid_token')
+        return 401, {'requestId': secrets.token_hex(8), 'errorCode': '404.001.03', 'errorMessage': 'Invalid Access Token'}
+
+    def bad_request(self, message):
+        return 400, {'requestId': secrets.token_hex(8), 'errorCode': '400.002.02', 'errorMessage': f'Bad Request - {message}'}
+
+    def oauth(self, headers, body):
+        if not (headers.get('Authorization') or '').startswith('Basic '):
+            return 400, {'errorCode': '400.008.01', 'errorMessage': 'Invalid Authentication passed'}
+        token = secrets.token_urlsafe(24)
+        self.tokens[token] = time.monotonic() + self.token_ttl
+        return 200, {'access_token': token, 'expires_in': str(self.token_ttl)}
+
+    def stk_push(self, headers, body):
+        if not self.authorised(headers):
+            return self.unauthorised()
+        for field in ('BusinessShortCode', 'Amount', 'PhoneNumber', 'CallBackURL', 'AccountReference'):
+            if not body.get(field):
+                return self.bad_request(f'Invalid {field}')
+        merchant_request_id = f'{secrets.randbelow(10 ** 5)}-{secrets.randbelow(10 ** 8)}-1'
+        checkout_request_id = f'ws_CO_{datetime.now():%d%m%Y%H%M%S}{secrets.randbelow(10 ** 9):09d}'
+        result_code, result_desc = self.outcome(self.STK_FAILURES)
+        self.stk_requests[checkout_request_id] = {
+            'due': time.monotonic() + self.behaviour.callback_delay_ms / 1000,
+            'merchant_request_id': merchant_request_id,
+            'result_code': result_code,
+            'result_desc': result_desc,
+        }
+        callback = {
+            'MerchantRequestID': merchant_request_id,
+            'CheckoutRequestID': checkout_request_id,
+            'ResultCode': result_code,
+            'ResultDesc': result_desc,
+        }
+        if result_code == 0:
+            callback['CallbackMetadata'] = {'Item': [
+                {'Name': 'Amount', 'Value': body['Amount']},
+                {'Name': 'MpesaReceiptNumber', 'Value': self.receipt_number()},
+                {'Name': 'TransactionDate', 'Value': int(mpesa_timestamp())},
+                {'Name': 'PhoneNumber', 'Value': int(body['PhoneNumber'])},
+            ]}
+        self.callback(body['CallBackURL'], {'Body': {'stkCallback': callback}})
+        return 200, {
+            'MerchantRequestID': merchant_request_id,
+            'CheckoutRequestID': checkout_request_id,
+            'ResponseCode': '0',
+            'ResponseDescription': 'Success. Request accepted for processing',
+            'CustomerMessage': 'Success. Request accepted for processing',
+        }
+
+    def stk_query(self, headers, body):
+        if not self.authorised(headers):
+            return self.unauthorised()
+        checkout_request_id = body.get('CheckoutRequestID')
+        request = self.stk_requests.get(checkout_request_id)
+        if request is None:
+            return self.bad_request('Invalid CheckoutRequestID')
+        if request['due'] > time.monotonic():
+            return 500, {
+                'requestId': secrets.token_hex(8), 'errorCode': '500.001.1001',
+                'errorMessage': 'The transaction is being processed',
+            }
+        return 200, {
+            'ResponseCode': '0',
+            'ResponseDescription': 'The service request has been accepted successsfully',
+            'MerchantRequestID': request['merchant_request_id'],
+            'CheckoutRequestID': checkout_request_id,
+            'ResultCode': str(request['result_code']),
+            'ResultDesc': request['result_desc'],
+        }
+
+    def b2c_payment(self, headers, body):
+        if not self.authorised(headers):
+            return self.unauthorised()
+        for field in ('Amount', 'PartyB', 'ResultURL'):
+            if not body.get(field):
+                return self.bad_request(f'Invalid {field}')
+        conversation_id = f'AG_{mpesa_timestamp()}_{secrets.token_hex(10)}'
+        originator_conversation_id = f'{secrets.randbelow(10 ** 5)}-{secrets.randbelow(10 ** 8)}-1'
+        result_code, result_desc = self.outcome(self.B2C_FAILURES)
+        receipt = self.receipt_number()
+        self.b2c_requests[originator_conversation_id] = {'result_code': result_code, 'receipt': receipt}
+        result = {
+            'ResultType': 0,
+            'ResultCode': result_code,
+            'ResultDesc': result_desc,
+            'OriginatorConversationID': originator_conversation_id,
+            'ConversationID': conversation_id,
+            'TransactionID': receipt,
+            'ReferenceData': {'ReferenceItem': {'Key': 'QueueTimeoutURL', 'Value': body.get('QueueTimeOutURL', '')}},
+        }
+        if result_code == 0:
+            result['ResultParameters'] = {'ResultParameter': [
+                {'Key': 'TransactionAmount', 'Value': body['Amount']},
+                {'Key': 'TransactionReceipt', 'Value': receipt},
+                {'Key': 'ReceiverPartyPublicName', 'Value': f'{body["PartyB"]} - Simulated Recipient'},
+                {'Key': 'TransactionCompletedDateTime', 'Value': datetime.now().strftime('%d.%m.%Y %H:%M:%S')},
+                {'Key': 'B2CRecipientIsRegisteredCustomer', 'Value': 'Y'},
+            ]}
+        self.callback(body['ResultURL'], {'Result': result})
+        return 200, {
+            'ConversationID': conversation_id,
+            'OriginatorConversationID': originator_conversation_id,
+            'ResponseCode': '0',
+            'ResponseDescription': 'Accept the service request successfully.',
+        }
+
+    def transaction_status(self, headers, body):
+        if not self.authorised(headers):
+            return self.unauthorised()
+        originator_conversation_id = body.get('OriginatorConversationID')
+        payment = self.b2c_requests.get(originator_conversation_id)
+        result = {
+            'ResultType': 0,
+            'OriginatorConversationID': originator_conversation_id,
+            'ConversationID': f'AG_{mpesa_timestamp()}_{secrets.token_hex(10)}',
+            'ReferenceData': {'ReferenceItem': [{'Key': 'Occasion', 'Value': body.get('Occasion')}]},
+        }
+        if payment is None:
+            result.update(ResultCode=2001, ResultDesc='The transaction could not be found.')
+        else:
+            result.update(
+                ResultCode=0, ResultDesc='The service request is processed successfully.',
+                TransactionID=payment['receipt'],
+                ResultParameters={'ResultParameter': [
+                    {'Key': 'TransactionStatus', 'Value': 'Completed' if payment['result_code'] == 0 else 'Failed'},
+                    {'Key': 'ReceiptNo', 'Value': payment['receipt']},
+                ]},
+            )
+        self.callback(body.get('ResultURL'), {'Result': result})
+        return 200, {
+            'OriginatorConversationID': originator_conversation_id,
+            'ConversationID': result['ConversationID'],
+            'ResponseCode': '0',
+            'ResponseDescription': 'Accept the service request successfully.',
+        }
+
+
+class PaystackSimulator(Simulator):
+    """transaction/initialize and transaction/verify, with signed charge.* webhooks."""
+    name = 'paystack'
+    routes = (
+        ('POST', r'/transaction/initialize', 'initialize'),
+        ('GET', r'/transaction/verify/([^/]+)', 'verify'),
+    )
+
+    def __init__(self, *args, webhook_url='', secret_key='', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.webhook_url = webhook_url
+        self.secret_key = secret_key
+        self.transactions = {}
+
+    def error_response(self):
+        return 503, {'status': False, 'message': 'An error occurred, please try again'}
+
+    def authorised(self, headers):
+        token = (headers.get('Authorization') or '').removeprefix('Bearer ')
+        return bool(token) and (not self.secret_key or token == self.secret_key)
+
+    def signature(self, body):
+        return hmac.new(self.secret_key.encode(), body, hashlib.sha512).hexdigest()
+
+    def initialize(self, headers, body):
+        if not self.authorised(headers):
+            return 401, {'status': False, 'message': 'Invalid key'}
+        reference = body.get('reference') or secrets.token_hex(8)
+        if not body.get('email') or not body.get('amount'):
+            return 400, {'status': False, 'message': 'Invalid email or amount'}
+        if reference in self.transactions:
+            return 400, {'status': False, 'message': 'Duplicate Transaction Reference'}
+        success = not self.chance(self.behaviour.failure_rate)
+        access_code = secrets.token_urlsafe(12)
+        data = {
+            'id': secrets.randbelow(10 ** 10),
+            'domain': 'test',
+            'status': 'success' if success else 'failed',
+            'reference': reference,
+            'amount': body['amount'],
+            'currency': 'KES',
+            'channel': 'card',
+            'gateway_response': 'Successful' if success else 'Declined',
+            'paid_at': datetime.now().isoformat() if success else None,
+            'customer': {'email': body['email']},
+            'metadata': body.get('metadata') or {},
+        }
+        self.transactions[reference] = {'due': time.monotonic() + self.behaviour.callback_delay_ms / 1000, 'data': data}
+        event = {'event': 'charge.success' if success else 'charge.failed', 'data': data}
+        self.callback(self.webhook_url, event, {'x-paystack-signature': self.signature(json.dumps(event).encode())})
+        return 200, {
+            'status': True,
+            'message': 'Authorization URL created',
+            'data': {
+                'authorization_url': f'https://checkout.paystack.com/{access_code}',
+                'access_code': access_code,
+                'reference': reference,
+            },
+        }
+
+    def verify(self, headers, body, reference):
+        if not self.authorised(headers):
+            return 401, {'status': False, 'message': 'Invalid key'}
+        transaction = self.transactions.get(reference)
+        if transaction is None:
+            return 400, {'status': False, 'message': 'Transaction reference not found'}
+        data = transaction['data']
+        if transaction['due'] > time.monotonic():
+            data = {**data, 'status': 'ongoing', 'gateway_response': 'The transaction is ongoing', 'paid_at': None}
+        return 200, {'status': True, 'message': 'Verification successful', 'data': data}
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough ESMTP for smtplib: EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def readline(self):
+        return self.rfile.readline(65536).decode('utf-8', 'replace').rstrip('\r\n')
+
+    def handle(self):
+        simulator = self.server.simulator
+        simulator.stats.incr('connections')
+        self.reply('220 localhost ESMTP simulator')
+        recipients = 0
+        while True:
+            line = self.readline()
+            command, _, argument = line.partition(' ')
+            command = command.upper()
+            if command == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250-SIZE 35882577')
+                self.reply('250-8BITMIME')
+                self.reply('250 AUTH PLAIN LOGIN')
+            elif command == 'HELO':
+                self.reply('250 localhost')
+            elif command == 'AUTH':
+                mechanism, _, initial = argument.partition(' ')
+                if mechanism.upper() == 'LOGIN':
+                    for prompt in ('VXNlcm5hbWU6', 'UGFzc3dvcmQ6'):
+                        self.reply(f'334 {prompt}')
+                        self.readline()
+                elif not initial:
+                    self.reply('334 ')
+                    self.readline()
+                self.reply('235 2.7.0 Authentication successful')
+            elif command == 'MAIL':
+                recipients = 0
+                self.reply('250 2.1.0 Ok')
+            elif command == 'RCPT':
+                recipients += 1
+                self.reply('250 2.1.5 Ok')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                while True:
+                    data = self.rfile.readline(65536)
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    size += len(data)
+                time.sleep(simulator.delay())
+                if simulator.chance(simulator.behaviour.error_rate):
+                    simulator.stats.incr('messages_rejected')
+                    self.reply('451 4.3.0 Temporary failure, try again later')
+                else:
+                    simulator.stats.incr('messages')
+                    simulator.stats.incr('recipients', recipients)
+                    simulator.stats.incr('bytes', size)
+                    self.reply(f'250 2.0.0 Ok: queued as {secrets.token_hex(5).upper()}')
+            elif command in ('RSET', 'NOOP'):
+                self.reply('250 2.0.0 Ok')
+            elif command == 'STARTTLS':
+                self.reply('454 4.7.0 TLS not available; set EMAIL_USE_TLS=False')
+            elif command == 'QUIT':
+                self.reply('221 2.0.0 Bye')
+                return
+            elif not line:
+                return
+            else:
+                self.reply('500 5.5.2 Error: command not recognized')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSimulator(Simulator):
+    """An SMTP server that accepts (or, at error_rate, defers) every message and discards it."""
+    name = 'smtp'
+
+    def start(self, host='127.0.0.1', port=0):
+        self.server = SMTPServer((host, port), SMTPHandler)
+        self.server.simulator = self
+        threading.Thread(target=self.server.serve_forever, name='sim-smtp', daemon=True).start()
+        return f'smtp://{host}:{self.server.server_address[1]}'
+
+
+def start_simulators(host='127.0.0.1', ports=None, behaviours=None, webhook_url='', paystack_secret='', seed=None):
+    """
+    Starts the three simulators sharing one callback dispatcher. `ports`
+    and `behaviours` are dicts keyed by simulator name. Returns
+    {name: (simulator, url)}.
+    """
+    ports = ports or {}
+    behaviours = behaviours or {}
+    registry = []
+    dispatcher = CallbackDispatcher(Stats())
+    simulators = {
+        'daraja': DarajaSimulator(behaviours.get('daraja', DEFAULT_BEHAVIOUR), dispatcher, seed, registry),
+        'paystack': PaystackSimulator(
+            behaviours.get('paystack', DEFAULT_BEHAVIOUR), dispatcher, seed, registry,
+            webhook_url=webhook_url, secret_key=paystack_secret,
+        ),
+        'smtp': SMTPSimulator(behaviours.get('smtp', DEFAULT_BEHAVIOUR), dispatcher, seed, registry),
+    }
+    registry.extend(simulators.values())
+    registry.append(dispatcher)
+    return {name: (simulator, simulator.start(host, ports.get(name, 0))) for name, simulator in simulators.items()}
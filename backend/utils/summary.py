@@ -0,0 +1,65 @@
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from redis.exceptions import RedisError
+from utils.redis_client import get_redis
+
+SUMMARY_STATUSES = ('COMPLETED', 'PENDING', 'PROCESSING', 'FAILED', 'CANCELLED')
+
+
+def status_summary(queryset, amount_field='amount'):
+    """
+    Completed amount plus a count per status, in a single aggregate query.
+    """
+    aggregates = {'completed_amount': Sum(amount_field, filter=Q(status='COMPLETED'))}
+    for status in SUMMARY_STATUSES:
+        aggregates[status.lower()] = Count('id', filter=Q(status=status))
+    summary = queryset.aggregate(**aggregates)
+    summary['completed_amount'] = summary['completed_amount'] or 0
+    return summary
+
+
+def summary_cache_key(namespace, scope):
+    return f'summary:{namespace}:{scope}'
+
+
+def cached_summary(namespace, scope, queryset, amount_field='amount'):
+    """
+    status_summary() cached in Redis per namespace ('transactions', 'payouts')
+    and scope ('all' or 'user:<id>'). Entries are dropped by invalidate_summary
+    whenever a row in the namespace changes status; the TTL is only a safety net.
+    If Redis is unavailable the summary is computed directly.
+    """
+    key = summary_cache_key(namespace, scope)
+    try:
+        cached = get_redis().get(key)
+        if cached:
+            return json.loads(cached)
+    except RedisError:
+        return status_summary(queryset, amount_field)
+
+    summary = status_summary(queryset, amount_field)
+    try:
+        get_redis().set(key, json.dumps(summary, cls=DjangoJSONEncoder), ex=settings.SUMMARY_CACHE_TTL)
+    except RedisError:
+        pass
+    return summary
+
+
+def invalidate_summary(namespace, user_ids=()):
+    """
+    Drops the global summary for a namespace and the per-user summaries of
+    the given users once the current transaction commits, so a concurrent
+    reader cannot re-cache the pre-commit numbers.
+    """
+    keys = [summary_cache_key(namespace, 'all')]
+    keys += [summary_cache_key(namespace, f'user:{user_id}') for user_id in set(user_ids) if user_id]
+
+    def delete_keys():
+        try:
+            get_redis().delete(*keys)
+        except RedisError:
+            pass
+    transaction.on_commit(delete_keys)
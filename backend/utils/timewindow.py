@@ -0,0 +1,75 @@
+"""
+Date parameters to half-open ranges of aware datetimes.
+
+A lookup such as created_at__date__gte='2026-09-01' makes PostgreSQL
+convert every row's timestamp to TIME_ZONE before comparing it, so no index
+on created_at can be used. Comparing the column itself with the bounds of
+the local days selects the same rows and keeps the index usable:
+
+    first, last = date_window(request.query_params)
+    queryset = filter_window(queryset, 'created_at', first, last)
+"""
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+
+def day_start(day):
+    """Aware datetime at which the local date `day` begins."""
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def day_bounds(first, last):
+    """
+    [start, end) covering the local dates first..last, inclusive. Either
+    date may be None for a range open on that side.
+    """
+    start = day_start(first) if first is not None else None
+    end = day_start(last + timedelta(days=1)) if last is not None else None
+    return start, end
+
+
+def filter_window(queryset, field, first, last):
+    """Rows whose `field` falls on the local dates first..last, inclusive."""
+    start, end = day_bounds(first, last)
+    if start is not None:
+        queryset = queryset.filter(**{f'{field}__gte': start})
+    if end is not None:
+        queryset = queryset.filter(**{f'{field}__lt': end})
+    return queryset
+
+
+def parse_day(value, param):
+    day = parse_date(value) if value else None
+    if value and day is None:
+        raise ValidationError({param: 'Use YYYY-MM-DD.'})
+    return day
+
+
+def date_window(params, start_param='start_date', end_param='end_date'):
+    """(first, last) local dates from two YYYY-MM-DD query parameters; None where absent."""
+    first = parse_day(params.get(start_param), start_param)
+    last = parse_day(params.get(end_param), end_param)
+    if first and last and first > last:
+        raise ValidationError({end_param: f'Must not be before {start_param}.'})
+    return first, last
+
+
+def positive_int(params, param, default, maximum):
+    """?days= style parameter: an integer between 1 and `maximum`."""
+    value = params.get(param)
+    if value in (None, ''):
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({param: 'Must be a whole number.'})
+    if not 1 <= number <= maximum:
+        raise ValidationError({param: f'Must be between 1 and {maximum}.'})
+    return number
+
+
+def days_ago(days):
+    """Local date `days` days before today."""
+    return timezone.localdate() - timedelta(days=days)
@@ -0,0 +1,14 @@
+from django_filters import rest_framework as filters
+from .models import VerificationLog
+
+
+class VerificationLogFilter(filters.FilterSet):
+    """
+    ?verified_at_after= / ?verified_at_before= limit the scan to the
+    monthly partitions in that range.
+    """
+    verified_at = filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = VerificationLog
+        fields = ['document_code', 'is_valid', 'verified_at']
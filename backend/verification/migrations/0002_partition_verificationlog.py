@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def partition_verificationlog(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from audit.partitions import convert_to_partitioned
+    with schema_editor.connection.cursor() as cursor:
+        convert_to_partitioned(cursor, 'verification_verificationlog', 'verified_at')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verification', '0001_initial'),
+        ('audit', '0005_partition_auditlog'),
+    ]
+
+    operations = [
+        # Monthly range partitions on verified_at (PostgreSQL only); see
+        # audit.partitions.
+        migrations.RunPython(partition_verificationlog, migrations.RunPython.noop),
+    ]
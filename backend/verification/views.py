@@ -3,8 +3,10 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.utils import timezone
 from .models import VerificationLog
+from .filters import VerificationLogFilter
+from django_filters.rest_framework import DjangoFilterBackend
 from .serializers import VerificationRequestSerializer, VerificationResponseSerializer, VerificationLogSerializer
-from audit.tasks import log_action
+from audit.buffer import record_action
 from django.apps import apps
 
 class VerifyDocumentView(views.APIView):
@@ -27,9 +29,9 @@ class VerifyDocumentView(views.APIView):
             )
 
             if result['is_valid']:
-                log_action.delay(None, 'DOCUMENT_VERIFIED', f'Document verified: {code}', ip_address=ip_address)
+                record_action(None, 'DOCUMENT_VERIFIED', f'Document verified: {code}', ip_address=ip_address)
             else:
-                log_action.delay(None, 'DOCUMENT_VERIFICATION_FAILED', f'Invalid document: {code}', ip_address=ip_address)
+                record_action(None, 'DOCUMENT_VERIFICATION_FAILED', f'Invalid document: {code}', ip_address=ip_address)
 
             return Response(VerificationResponseSerializer(result).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -124,6 +126,8 @@ class VerificationLogListView(generics.ListAPIView):
     serializer_class = VerificationLogSerializer
     permission_classes = [IsAuthenticated]
     ordering = ['-verified_at']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = VerificationLogFilter
 
     def get_queryset(self):
         return VerificationLog.objects.all()
\ No newline at end of file
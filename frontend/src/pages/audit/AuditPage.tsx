@@ -19,7 +19,7 @@ interface AuditLog {
 }
 
 interface PaginatedResponse<T> {
-  count: number;
+  count?: number;
   next: string | null;
   previous: string | null;
   results: T[];
@@ -33,7 +33,9 @@ export function AuditPage() {
   const [searchTerm, setSearchTerm] = useState('');
   const [actionFilter, setActionFilter] = useState<string>('all');
   const [currentPage, setCurrentPage] = useState(1);
-  const [totalPages, setTotalPages] = useState(1);
+  const [cursor, setCursor] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [previousCursor, setPreviousCursor] = useState<string | null>(null);
   const [totalCount, setTotalCount] = useState(0);
   
   if (!isAdmin) {
@@ -42,21 +44,29 @@ export function AuditPage() {
   
   useEffect(() => {
     fetchLogs();
-  }, [currentPage, actionFilter]);
+  }, [cursor, actionFilter]);
+  
+  // The API paginates by cursor; pull it out of the next/previous links.
+  const cursorFrom = (link: string | null) =>
+    link ? new URL(link, window.location.origin).searchParams.get('cursor') : null;
   
   const fetchLogs = async () => {
     try {
       setLoading(true);
       const params = new URLSearchParams({
-        page: currentPage.toString(),
+        ...(cursor ? { cursor } : { include_count: 'estimate' }),
         ...(actionFilter !== 'all' && { action: actionFilter }),
         ...(searchTerm && { search: searchTerm }),
       });
       
       const response = await apiService.get<PaginatedResponse<AuditLog>>(`/audit/logs/?${params}`);
       setLogs(response.results);
-      setTotalCount(response.count);
-      setTotalPages(Math.ceil(response.count / 20));
+      setNextCursor(cursorFrom(response.next));
+      setPreviousCursor(cursorFrom(response.previous));
+      // The (estimated) total is only requested for the first page.
+      if (response.count !== undefined) {
+        setTotalCount(response.count);
+      }
     } catch (err: unknown) {
       const errorMessage = err instanceof Error ? err.message : 'Failed to load audit logs';
       setError(errorMessage);
@@ -67,7 +77,11 @@ export function AuditPage() {
   
   const handleSearch = () => {
     setCurrentPage(1);
-    fetchLogs();
+    if (cursor) {
+      setCursor(null);
+    } else {
+      fetchLogs();
+    }
   };
   
   const getActionBadge = (action: string) => {
@@ -148,6 +162,7 @@ export function AuditPage() {
               onChange={(e) => {
                 setActionFilter(e.target.value);
                 setCurrentPage(1);
+                setCursor(null);
               }}
               className="input"
             >
@@ -175,7 +190,7 @@ export function AuditPage() {
       <div className="card bg-primary text-white">
         <div className="card-body">
           <p className="text-sm text-white/80">Total Audit Logs</p>
-          <p className="text-3xl font-bold mt-1">{totalCount}</p>
+          <p className="text-3xl font-bold mt-1">~{totalCount.toLocaleString()}</p>
         </div>
       </div>
       
@@ -235,22 +250,28 @@ export function AuditPage() {
         </div>
         
         {/* Pagination */}
-        {totalPages > 1 && (
+        {(nextCursor || previousCursor) && (
           <div className="card-footer flex items-center justify-between">
             <p className="text-sm text-foreground-muted">
-              Showing {(currentPage - 1) * 20 + 1} to {Math.min(currentPage * 20, totalCount)} of {totalCount} results
+              Showing {(currentPage - 1) * 20 + 1} to {(currentPage - 1) * 20 + logs.length} of about {totalCount.toLocaleString()} results
             </p>
             <div className="flex gap-2">
               <button
-                onClick={() => setCurrentPage((p) => Math.max(1, p - 1))}
-                disabled={currentPage === 1}
+                onClick={() => {
+                  setCurrentPage((p) => Math.max(1, p - 1));
+                  setCursor(previousCursor);
+                }}
+                disabled={!previousCursor}
                 className="btn btn-sm btn-secondary disabled:opacity-50"
               >
                 Previous
               </button>
               <button
-                onClick={() => setCurrentPage((p) => Math.min(totalPages, p + 1))}
-                disabled={currentPage === totalPages}
+                onClick={() => {
+                  setCurrentPage((p) => p + 1);
+                  setCursor(nextCursor);
+                }}
+                disabled={!nextCursor}
                 className="btn btn-sm btn-secondary disabled:opacity-50"
               >
                 Next
@@ -1,6 +1,6 @@
 import { useState, FormEvent, useEffect } from 'react';
 import { useAuth } from '@/hooks/useAuth';
-import { apiService } from '@/config/api';
+import { apiService, API_BASE_URL } from '@/config/api';
 import { CreditCardIcon, CurrencyBangladeshiIcon, PhoneIcon, EnvelopeIcon } from '@heroicons/react/24/outline';
 import { CheckCircleIcon, XCircleIcon } from '@heroicons/react/24/solid';
 import { Transaction, TransactionInitiateRequest, PaymentMethod } from '@/types';
@@ -14,7 +14,7 @@ interface PaymentFormData {
 }
 
 export function PaymentsPage() {
-  const { user } = useAuth();
+  const { user, accessToken } = useAuth();
   const [formData, setFormData] = useState<PaymentFormData>({
     amount: '',
     payment_method: 'MPESA',
@@ -29,44 +29,70 @@ export function PaymentsPage() {
   const [pollingTransaction, setPollingTransaction] = useState<Transaction | null>(null);
   const [pollingStatus, setPollingStatus] = useState<'idle' | 'polling' | 'completed' | 'failed'>('idle');
   
-  // Poll for Mpesa transaction status
+  // Follow the Mpesa transaction over the server-sent status stream, falling
+  // back to polling if the stream cannot be opened or drops.
   useEffect(() => {
-    let pollInterval: NodeJS.Timeout;
-    
-    if (pollingTransaction && pollingStatus === 'polling') {
+    if (!pollingTransaction || pollingStatus !== 'polling') return;
+
+    let pollInterval: NodeJS.Timeout | undefined;
+    let source: EventSource | undefined;
+
+    const handleUpdate = (update: Transaction) => {
+      if (update.status === 'COMPLETED') {
+        setPollingStatus('completed');
+        setSuccess(update);
+        setTimeout(() => {
+          setPollingTransaction(null);
+          setPollingStatus('idle');
+          setSuccess(null);
+        }, 3000);
+      } else if (update.status === 'FAILED' || update.status === 'CANCELLED') {
+        setPollingStatus('failed');
+        setError(update.failed_reason || 'Payment failed');
+        setTimeout(() => {
+          setPollingTransaction(null);
+          setPollingStatus('idle');
+          setError(null);
+        }, 5000);
+      }
+    };
+
+    const startPolling = () => {
+      if (pollInterval) return;
       pollInterval = setInterval(async () => {
         try {
           const response = await apiService.get<Transaction>(
             `/payments/status/${pollingTransaction.reference_code}/`
           );
-          
-          if (response.status === 'COMPLETED') {
-            setPollingStatus('completed');
-            setSuccess(response);
-            setTimeout(() => {
-              setPollingTransaction(null);
-              setPollingStatus('idle');
-              setSuccess(null);
-            }, 3000);
-          } else if (response.status === 'FAILED') {
-            setPollingStatus('failed');
-            setError(response.failed_reason || 'Payment failed');
-            setTimeout(() => {
-              setPollingTransaction(null);
-              setPollingStatus('idle');
-              setError(null);
-            }, 5000);
-          }
+          handleUpdate(response);
         } catch (err) {
           console.error('Polling error:', err);
         }
       }, 3000); // Poll every 3 seconds
+    };
+
+    if (typeof EventSource !== 'undefined' && accessToken) {
+      source = new EventSource(
+        `${API_BASE_URL}/payments/status/${pollingTransaction.reference_code}/stream/?token=${encodeURIComponent(accessToken)}`
+      );
+      source.addEventListener('status', (event) => {
+        handleUpdate(JSON.parse((event as MessageEvent).data) as Transaction);
+      });
+      const fallBack = () => {
+        source?.close();
+        startPolling();
+      };
+      source.addEventListener('timeout', fallBack);
+      source.onerror = fallBack;
+    } else {
+      startPolling();
     }
-    
+
     return () => {
+      source?.close();
       if (pollInterval) clearInterval(pollInterval);
     };
-  }, [pollingTransaction, pollingStatus]);
+  }, [pollingTransaction, pollingStatus, accessToken]);
   
   const validateForm = (): boolean => {
     if (!formData.amount || parseFloat(formData.amount) <= 0) {